@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import sys
+
+import Source.__config__ as cfg
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        # the baseline was computed with the numerical Jacobian
+        self.baseline = "{0}.gold".format(os.path.join(self.tdir, self.name))
+        self.keywords = ["fast", "verification", "plastic", "tangent",
+                         "builtin"]
+        self.runcommand = ["payette", "--no-writeprops", "--check-tangent",
+                           self.infile]
+        self.material = "plastic"
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    A plastic material under a confining stress of 50 MPa is driven through
+    a cycle of stress controlled and mixed legs:
+
+    Step 1 (t=0.-1.): prescribed hydrostatic stress of -50 MPa
+    Step 2 (t=1.-2.): prescribed eps_11 = -0.01, sig_22 = sig_33 = -50 MPa
+    Step 3 (t=2.-3.): prescribed eps_11 = 0.0, sig_22 = sig_33 = -50 MPa
+    Step 4 (t=3.-4.): prescribed hydrostatic stress of -50 MPa
+
+    The material yields in compression in step 2 and again in tension in
+    step 3.  The consistent tangent is checked against the numerically
+    computed Jacobian on every iteration of the stress solver.  Results must
+    match those computed with the numerical Jacobian and the largest
+    difference between the tangent and the Jacobian must be within the
+    solver's tolerance.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def compare_method(self):
+        retcode = self.compare_out_to_baseline_rms()
+        if retcode != self.passcode:
+            return retcode
+        return self.compare_tangent_to_jacobian()
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
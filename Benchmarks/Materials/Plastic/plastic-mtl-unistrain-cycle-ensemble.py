@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+
+import Source.__config__ as cfg
+import Source.Payette_utils as pu
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        self.ensfile = "{0}.ensemble".format(self.name)
+        # point 0 of the ensemble has unit amplitude and must reproduce the
+        # single point benchmark, the last point has amplitude 2 and must
+        # reproduce a single point run with the strains of the legs doubled
+        self.baseline = [
+            "{0}.gold".format(
+                os.path.join(self.tdir, "plastic-mtl-unistrain-cycle")),
+            "{0}.gold".format(os.path.join(self.tdir, self.name))]
+        self.keywords = [
+            "medium", "verification", "plastic", "uniaxial strain",
+            "ensemble", "builtin"]
+        self.runcommand = ["payette", "--no-writeprops",
+                           self.infile]
+        self.material = "plastic"
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    An ensemble of 50 plastic material points is driven through a uniaxial
+    strain cycle with strain amplitudes scaled linearly from 1 to 2:
+
+    Step 1 (t=0.-1.): prescribed uniaxial strain to eps_11 = ampl * 0.01
+    Step 2 (t=1.-2.): prescribed uniaxial strain to eps_11 = 0.0
+
+    The first point of the ensemble is written to the output file and is
+    compared against the single point benchmark.  The last point is taken
+    from the ensemble file and compared against a single point run with
+    eps_11 = 0.02.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def compare_method(self):
+        retcode = self.compare_out_to_baseline_rms(baselinef=self.baseline[0])
+        if retcode != self.passcode:
+            return retcode
+
+        # write the history of the last point of the ensemble in the format
+        # of the output file and compare it to its single point baseline
+        head = pu.get_header(self.ensfile)
+        data = pu.read_data(self.ensfile)
+        data = data[data[:, 0] == data[:, 0].max()][:, 1:]
+        lastf = "{0}.last.out".format(self.name)
+        with open(lastf, "w") as fobj:
+            fobj.write("".join(pu.textformat(x) for x in head[1:]) + "\n")
+            for row in data:
+                fobj.write("".join(pu.textformat(x) for x in row) + "\n")
+                continue
+        return self.compare_out_to_baseline_rms(
+            baselinef=self.baseline[1], outf=lastf)
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
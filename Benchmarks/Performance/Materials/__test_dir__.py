@@ -0,0 +1 @@
+DIRECTORY = "Performance/Materials"
@@ -0,0 +1 @@
+DIRECTORY = "Performance/Startup"
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+
+import os
+import sys
+import time
+import subprocess
+
+import Source.__config__ as cfg
+import Source.Payette_utils as pu
+import Source.Payette_input_parser as pip
+from Source.Payette_test import PayettePerformanceTest
+
+
+class Test(PayettePerformanceTest):
+
+    repeat = 5
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.keywords = ["long", "performance", "startup", "elastic",
+                         "idealgas", "builtin"]
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Times launching the payette script for single step simulations, so that
+    the cost of starting payette, dominated by the modules it imports, is
+    tracked.  The steps per second of a workload are its launches per second.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def time_workloads(self):
+        """Time launching payette for each simulation in the input file
+
+        Each simulation is run by a new payette process, always through a
+        subprocess, even when the tests are run in process.
+
+        """
+        cmd, error = self.build_command("payette")
+        if error:
+            pu.report_and_raise_error("payette executable not found")
+
+        workloads = pip.parse_user_input(open(self.infile, "r").read())
+        record = {"host": os.uname()[1], "date": time.time(),
+                  "version": cfg.VERSION, "workloads": {}}
+        for name in sorted(workloads):
+            best = None
+            for i in range(self.repeat):
+                t0 = time.time()
+                with open(self.name + ".echo", "w") as fobj:
+                    retcode = subprocess.call(
+                        cmd + [self.infile, "-v0", "-N", "^{0}$".format(name)],
+                        stdout=fobj, stderr=subprocess.STDOUT)
+                dt = time.time() - t0
+                if retcode != 0:
+                    pu.report_and_raise_error(
+                        "workload {0} failed to run".format(name))
+                best = dt if best is None else min(best, dt)
+                continue
+
+            record["workloads"][name] = {
+                "time": best, "steps": 1,
+                "steps per second": 1. / best,
+                "calls per step": 0.}
+            continue
+        return record
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+"""Micro-benchmark of the curve comparisons in Payette_utils.
+
+Two curves of NPTS points with different abscissae are compared by
+compute_rms and compute_rms_closest_point_residual and by the point by point
+loops they replaced, which are kept here as references.  The references
+scale as NPTS**2 and are timed on a sample of the points of the compared
+curve, the sampled results are checked against the vectorized results for
+the same points and the reference times are scaled to all NPTS points.
+
+usage: compute_rms.py [-n NPTS] [--sample NSAMPLE]
+
+The script imports Payette, the directory holding __user_config__.py must be
+on the PYTHONPATH, as it is for the payette script.
+
+"""
+
+import os
+import sys
+import math
+import time
+import optparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                "../.."))
+
+import Source.Payette_utils as pu
+
+
+def main(argv):
+    """Time the vectorized and reference curve comparisons"""
+    usage = "usage: %prog [options]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option(
+        "-n",
+        dest="NPTS",
+        action="store",
+        type=int,
+        default=100000,
+        help="Number of points of each curve [default: %default]")
+    parser.add_option(
+        "--sample",
+        dest="NSAMPLE",
+        action="store",
+        type=int,
+        default=20,
+        help=("Number of points the references are timed on "
+              "[default: %default]"))
+    (opts, args) = parser.parse_args(argv)
+
+    rng = np.random.RandomState(12)
+    npts = opts.NPTS
+    set1x = np.linspace(0., 10., npts)
+    set1y = np.sin(set1x) + .1 * np.sin(20. * set1x)
+    set2x = np.sort(rng.uniform(0., 10., npts))
+    set2y = np.sin(set2x) + .1 * np.sin(20. * set2x) + 1.e-3 * rng.randn(npts)
+    sample = np.sort(rng.choice(npts, min(opts.NSAMPLE, npts), replace=False))
+
+    sys.stdout.write("{0:d} point curves\n".format(npts))
+    for name, fcn, ref in (
+            ("compute_rms", pu.compute_rms, reference_compute_rms),
+            ("compute_rms_closest_point_residual",
+             pu.compute_rms_closest_point_residual,
+             reference_closest_point_residual)):
+        tim0 = time.time()
+        fcn(set1x, set1y, set2x, set2y)
+        vectorized = time.time() - tim0
+
+        tim0 = time.time()
+        expected = ref(set1x, set1y, set2x[sample], set2y[sample])
+        reference = (time.time() - tim0) * npts / float(sample.shape[0])
+        result = fcn(set1x, set1y, set2x[sample], set2y[sample])
+        sys.stdout.write(
+            "{0}\n"
+            "  vectorized:             {1:10.4f} s\n"
+            "  reference (estimated):  {2:10.4f} s\n"
+            "  speedup:                {3:10.1f}\n"
+            "  identical on sample:    {4}\n"
+            .format(name, vectorized, reference, reference / vectorized,
+                    result == expected))
+        continue
+    return 0
+
+
+def reference_compute_rms(set1x, set1y, set2x, set2y, step=1):
+    """The loop compute_rms used when the abscissae of the sets differ"""
+    lset1x, lset2x = len(set1x), len(set2x)
+    err = 0.0
+    for i in range(0, lset2x, step):
+        for j in range(0, lset1x - 1, step):
+            if set1x[j] <= set2x[i] <= set1x[j + 1]:
+                x_0 = set1x[j]
+                y_0 = set1y[j]
+                x_1 = set1x[j + 1]
+                y_1 = set1y[j + 1]
+                y_f = y_0 + (set2x[i] - x_0) * (y_1 - y_0) / (x_1 - x_0)
+                err += (set2y[i] - y_f) ** 2
+                break
+            continue
+        continue
+    rmsd = math.sqrt(err / float(lset1x))
+    dnom = abs(np.amax(set1y) - np.amin(set1y))
+    nrmsd = rmsd / dnom if dnom >= 2.e-16 else rmsd
+    return rmsd, nrmsd
+
+
+def reference_closest_point_residual(set1x, set1y, set2x, set2y):
+    """The loop compute_rms_closest_point_residual used"""
+    lset1x, lset2x = len(set1x), len(set2x)
+    dx = max(set1x) - min(set1x)
+    dy = max(set1y) - min(set1y)
+    dd = math.sqrt(dx * dx + dy * dy)
+
+    dist_pt_to_pt = lambda x0, y0, x1, y1: math.sqrt(
+        (x1 - x0) ** 2 + (y1 - y0) ** 2)
+    err = 0.0
+    for idx in range(0, lset2x):
+        tmp_arr = []
+        for jdx in range(0, lset1x - 1):
+            kdx = jdx + 1
+            dist_from_pt0 = dist_pt_to_pt(
+                set1x[jdx], set1y[jdx], set2x[idx], set2y[idx])
+            dist_from_pt1 = dist_pt_to_pt(
+                set1x[kdx], set1y[kdx], set2x[idx], set2y[idx])
+            vec_a_x = set1x[jdx] - set1x[kdx]
+            vec_a_y = set1y[jdx] - set1y[kdx]
+            vec_b_x = set2x[idx] - set1x[kdx]
+            vec_b_y = set2y[idx] - set1y[kdx]
+            mag_a = math.sqrt(vec_a_x ** 2 + vec_a_y ** 2)
+            mag_b = math.sqrt(vec_b_x ** 2 + vec_b_y ** 2)
+            if mag_a == 0.0 or mag_b == 0.0:
+                tmp_arr.append(min(dist_from_pt0, dist_from_pt1))
+                continue
+            costheta = (vec_a_x * vec_b_x + vec_a_y * vec_b_y) / mag_a / mag_b
+            if costheta < 0.0 or mag_b * costheta > mag_a:
+                tmp_arr.append(min(dist_from_pt0, dist_from_pt1))
+                continue
+            theta = math.acos(max(min(1.0, costheta), -1.0))
+            dist_from_line = mag_b * math.sin(theta)
+            dist = min(dist_from_line, min(dist_from_pt0, dist_from_pt1))
+            tmp_arr.append(dist)
+            continue
+        err += min(tmp_arr)
+        continue
+    return err, err / dd
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
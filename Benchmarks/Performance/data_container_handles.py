@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Micro-benchmark of the per step overhead of DataContainer access.
+
+The data accessed by the solid driver and a material model each step are
+retrieved and stored, first by name through DataContainer.get and
+DataContainer.store, and then through DataHandle objects.  No material model
+is evaluated, so the times are the data access overhead alone.
+
+usage: data_container_handles.py [-n NSTEPS] [--history {full,ring}]
+
+The script imports Payette, the directory holding __user_config__.py must be
+on the PYTHONPATH, as it is for the payette script.
+
+"""
+
+import os
+import sys
+import time
+import optparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                "../.."))
+
+import Source.__runopts__ as ro
+from Source.Payette_data_container import DataContainer
+
+# (container, name) of the data retrieved and stored each step
+STORED = [("simdat", "time"), ("simdat", "time step"),
+          ("matdat", "rate of deformation"), ("matdat", "vorticity"),
+          ("matdat", "deformation gradient"), ("matdat", "strain"),
+          ("matdat", "vstrain"), ("matdat", "equivalent strain"),
+          ("simdat", "payette density"), ("matdat", "stress"),
+          ("matdat", "__xtra__"), ("matdat", "stress rate"),
+          ("matdat", "pressure")]
+RETRIEVED = [("matdat", "rate of deformation"), ("simdat", "payette density"),
+             ("simdat", "time step"), ("matdat", "stress"),
+             ("matdat", "__xtra__"), ("matdat", "stress")]
+
+
+def main(argv):
+    """Time nsteps steps of data access by name and by handle"""
+    usage = "usage: %prog [options]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option(
+        "-n",
+        dest="NSTEPS",
+        action="store",
+        type=int,
+        default=20000,
+        help="Number of steps [default: %default]")
+    parser.add_option(
+        "--history",
+        dest="HISTORY",
+        action="store",
+        type="choice",
+        choices=("full", "ring"),
+        default="full",
+        help="History mode of the data containers [default: %default]")
+    (opts, args) = parser.parse_args(argv)
+
+    ro.NSTEPS, ro.HISTORY = opts.NSTEPS, opts.HISTORY
+    dat = setup_containers()
+    values = dict((x, np.array(dat[c].get(x, copy=True)))
+                  for c, x in STORED)
+
+    by_name = time_steps(dat, values, step_by_name)
+    by_handle = time_steps(dat, values, step_by_handle)
+    sys.stdout.write(
+        "{0:d} steps, {1} history\n"
+        "  get/store by name:   {2:8.3f} us/step\n"
+        "  get/store by handle: {3:8.3f} us/step\n"
+        "  speedup:             {4:8.2f}\n"
+        .format(opts.NSTEPS, opts.HISTORY, by_name, by_handle,
+                by_name / by_handle))
+    return 0
+
+
+def setup_containers():
+    """Set up simulation and material data containers holding the data a
+    solid simulation of the plastic model registers
+
+    """
+    simdat = DataContainer("simulation")
+    simdat.register("time", "Scalar", iv=0., plot_key="time")
+    simdat.register("time step", "Scalar", iv=0., plot_key="timestep")
+    simdat.register("payette density", "Scalar", iv=1.)
+    simdat.register("leg number", "Scalar", iv=0)
+
+    matdat = DataContainer("material")
+    for name, dtype, iv in (("stress", "SymTensor", None),
+                            ("stress rate", "SymTensor", None),
+                            ("strain", "SymTensor", None),
+                            ("vstrain", "Scalar", 0.),
+                            ("deformation gradient", "Tensor", "Identity"),
+                            ("rate of deformation", "SymTensor", None),
+                            ("vorticity", "Tensor", None),
+                            ("equivalent strain", "Scalar", 0.),
+                            ("pressure", "Scalar", 0.)):
+        matdat.register(name, dtype, iv=iv, plot_key=name.replace(" ", ""))
+    nxtra = 8
+    matdat.register_xtra(nxtra, ["xtra{0}".format(i) for i in range(nxtra)],
+                         ["X{0}".format(i) for i in range(nxtra)],
+                         np.zeros(nxtra))
+
+    for dat in (simdat, matdat):
+        dat.setup_data_container()
+    return {"simdat": simdat, "matdat": matdat}
+
+
+def step_by_name(dat, values):
+    """Access the data of one step by name"""
+    for c, name in STORED:
+        dat[c].store(name, values[name])
+    for c, name in RETRIEVED:
+        dat[c].get(name)
+    dat["matdat"].get("stress", "-")
+    return
+
+
+def step_by_handle(dat, values):
+    """Access the data of one step through handles"""
+    for c, name in STORED:
+        dat[c].handle(name).store(values[name])
+    for c, name in RETRIEVED:
+        dat[c].handle(name).get()
+    dat["matdat"].handle("stress").get("-")
+    return
+
+
+def time_steps(dat, values, step):
+    """Return the time, in microseconds, per step of step"""
+    ro.ISTEP = 0
+    tim0 = time.time()
+    for n in range(ro.NSTEPS):
+        for c in ("matdat", "simdat"):
+            dat[c].advance()
+        ro.ISTEP += 1
+        step(dat, values)
+        continue
+    return (time.time() - tim0) / ro.NSTEPS * 1.e6
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
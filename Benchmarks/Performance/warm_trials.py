@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Benchmark of the trial throughput of permutation jobs.
+
+The trials of the regression permutation inputs are run serially, first
+creating a new Payette object for each trial, as permutation and optimization
+jobs did before warm simulations, and then through the warm simulations of
+Payette_worker.  The trials are run in a temporary directory that is removed
+when done.
+
+usage: warm_trials.py [-r REPEAT] [inputs]
+
+The script imports Payette, the directory holding __user_config__.py must be
+on the PYTHONPATH, as it is for the payette script.
+
+"""
+
+import os
+import re
+import sys
+import time
+import shutil
+import tempfile
+import optparse
+
+D = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(D, "../.."))
+
+import Source.__runopts__ as ro
+import Source.Payette_container as pc
+import Source.Payette_input_parser as pip
+import Source.Payette_permutate as pp
+import Source.Payette_worker as pw
+
+REGRESSION = os.path.join(D, "../Regression")
+INPUTS = ["payette-test-permutation-combo.inp",
+          "payette-test-permutation-zip.inp",
+          "payette-test-permutation-distr_1.inp"]
+
+
+def main(argv):
+    """Time the trials of each input run cold and warm"""
+    usage = "usage: %prog [options] [inputs]"
+    parser = optparse.OptionParser(usage=usage)
+    parser.add_option(
+        "-r",
+        dest="REPEAT",
+        action="store",
+        type=int,
+        default=1,
+        help="Number of times to run the trials [default: %default]")
+    (opts, args) = parser.parse_args(argv)
+    inputs = args or [os.path.join(REGRESSION, x) for x in INPUTS]
+
+    cwd = os.getcwd()
+    tmpd = tempfile.mkdtemp()
+    ro.set_global_option("VERBOSITY", 0, default=True)
+    try:
+        for fpath in inputs:
+            name, baseinp, trials = get_trials(fpath)
+            os.chdir(tmpd)
+            cold = time_trials(baseinp, trials, opts.REPEAT, cold_simulation)
+            warm = time_trials(baseinp, trials, opts.REPEAT, pw.simulation)
+            pw.clear()
+            os.chdir(cwd)
+            sys.stdout.write(
+                "{0}: {1:d} trials\n"
+                "  new simulation per trial: {2:8.2f} trials/s\n"
+                "  warm simulation:          {3:8.2f} trials/s\n"
+                "  speedup:                  {4:8.2f}\n"
+                .format(name, len(trials), cold, warm, warm / cold))
+            continue
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmpd)
+    return 0
+
+
+def get_trials(fpath):
+    """Return the name, base input, and trial inputs of the permutation job
+    in fpath"""
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(os.path.realpath(fpath)))
+    try:
+        name, ilines = pip.parse_user_input(open(fpath).read()).items()[0]
+        perm = pp.Permutate(ilines)
+    finally:
+        os.chdir(cwd)
+    pw.clear()
+    baseinp = perm.data["baseinp"]
+    trials = []
+    for job_id, xcall in perm.param_ranges:
+        preprocessor = "".join("{0} = {1}\n".format(nam, val)
+                               for nam, val in zip(perm.param_names, xcall))
+        ui = pip.preprocess(baseinp, preprocessor=preprocessor)
+        ui = re.sub(r"(?i)\bname\s.*", "name {0}.{1}".format(name, job_id), ui)
+        trials.append(ui)
+        continue
+    return name, baseinp, trials
+
+
+def cold_simulation(ilines, key):
+    """Return a new Payette object for ilines"""
+    return pc.Payette(ilines)
+
+
+def time_trials(baseinp, trials, repeat, simulation):
+    """Return the number of trials run per second"""
+    tim0 = time.time()
+    for i in range(repeat):
+        for ui in trials:
+            the_model = simulation(ui, baseinp)
+            the_model.run_job()
+            the_model.finish(wipeall=True)
+            continue
+        continue
+    return repeat * len(trials) / (time.time() - tim0)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
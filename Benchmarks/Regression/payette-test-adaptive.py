@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import time
+
+import Source.__config__ as cfg
+from Source.Payette_test import PayetteTest
+
+SYM = ("11", "22", "33", "12", "23", "13")
+TENS = ("11", "12", "13", "21", "22", "23", "31", "32", "33")
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        self.baseline = os.path.join(self.tdir, "payette-test-legs.gold")
+        self.keywords = ["fast", "regression", "elastic", "adaptive",
+                         "instrument", "python model", "builtin"]
+        self.runcommand = ["payette", "--no-writeprops", "--adaptive",
+                           "--adaptive-tol=1.e-5", self.infile]
+        self.tol = 1.e-5
+        # the time step and rates are those of the steps taken
+        self.items_to_skip = (
+            ["TIMESTEP"] + ["DSIGDT{0}".format(x) for x in SYM] +
+            ["D{0}".format(x) for x in SYM] + ["W{0}".format(x) for x in TENS])
+        self.material = "elastic"
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Runs the payette-test-legs simulation with adaptive time stepping.  The
+    simulation is run in process, with uniform and then with adaptive time
+    steps, and instrumented: the adaptive run must take fewer steps,
+    counting those rejected, and make fewer update_state calls than the
+    uniform run.  The output, interpolated to the same print points, must
+    match the payette-test-legs baseline.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def run_test(self):
+        """ run the test """
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        t0 = time.time()
+        uniform, _ = self.run_simulation({"INSTRUMENT": True})
+        adaptive, _ = self.run_simulation(
+            {"INSTRUMENT": True, "ADAPTIVE": True, "ADAPTIVE_TOL": self.tol})
+        if uniform["retcode"] != 0 or adaptive["retcode"] != 0:
+            retcode = self.failtoruncode
+        else:
+            uniform = uniform["stats"]["total"]
+            adaptive = adaptive["stats"]["total"]
+            if (adaptive["steps"] + adaptive["rejected steps"] >=
+                    uniform["steps"] or
+                    adaptive["update_state calls"] >=
+                    uniform["update_state calls"]):
+                retcode = self.failcode
+            else:
+                retcode = self.compare_method()
+        self.retcode = retcode
+        self.status = self.get_status()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        os.chdir(d)
+        return
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import numpy as np
+
+import Source.__config__ as cfg
+import Source.Payette_utils as pu
+import Source.Payette_binary_output as pbo
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        self.baseline = os.path.join(self.tdir, "payette-test-legs.gold")
+        self.keywords = ["fast", "regression", "elastic", "output", "binary",
+                         "python model", "builtin"]
+        self.runcommand = ["payette", "--no-writeprops", self.infile]
+        self.material = "elastic"
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Runs the payette-test-legs simulation with binary output requested in
+    the output block.  The output, read back from the binary file written
+    alongside the .out file, must match the payette-test-legs baseline.
+    The binary file must have a row for each row of the .out file, with
+    the same values as the .out file.  Values whose 12th significant digit
+    is a 5, that are rounded to 11 digits in the text file one way or the
+    other depending on their exact binary value, are then written as text
+    and binary output: the binary file must hold the values read from the
+    text.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def compare_method(self):
+        bpath = pbo.find_binary_file(self.outfile)
+        if bpath is None:
+            return self.failcode
+        head, bdata = pbo.load(bpath)
+        lines = open(self.outfile).readlines()
+        if head != lines[0].split():
+            return self.diffcode
+        tdata = np.array([[float(x) for x in line.split()]
+                          for line in lines[1:]])
+        if bdata.shape != tdata.shape:
+            return self.diffcode
+        if not np.array_equal(bdata, tdata):
+            return self.diffcode
+        if not self.check_halfway():
+            return self.diffcode
+        return self.compare_out_to_baseline_rms()
+
+    def check_halfway(self):
+        """Write values halfway between 11 digit values as text and binary
+        output, the binary values must be those read from the text
+
+        """
+        ncol = 8
+        rand = np.random.RandomState(11)
+        vals = ["{0}.{1}5E{2:+d}".format(x // 10 ** 10, x % 10 ** 10, y)
+                for x, y in zip(rand.randint(10 ** 10, 10 ** 11, 998),
+                                rand.randint(-30, 30, 998))]
+        vals = [89391.392843499998, 7.17078196565e+22] + [
+            float(x) * y for x, y in zip(vals, (1., -1.) * 499)]
+        text = "".join("".join(pu.textformat(x) for x in vals[i:i + ncol])
+                       + "\n" for i in range(0, len(vals), ncol))
+        fnam = self.name + ".halfway.out"
+        bfile = pbo.BinaryOutputFile(
+            fnam, ["V{0}".format(i) for i in range(ncol)])
+        bfile.write_text(text)
+        bfile.close()
+        head, bdata = pbo.load(fnam, mmap_mode=None)
+        tdata = np.array([[float(x) for x in line.split()]
+                          for line in text.splitlines()])
+        return np.array_equal(bdata, tdata)
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
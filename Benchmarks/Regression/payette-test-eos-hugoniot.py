@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+
+import Source.__config__ as cfg
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.hugoniot".format(self.name)
+        self.baseline = "{0}.gold".format(os.path.join(self.tdir, self.name))
+        self.keywords = ["fast", "regression", "eos", "idealgas",
+                         "python model", "builtin"]
+        self.runcommand = ["payette", "--no-writeprops", self.infile]
+        self.rms_sets = [["RHO", "ENRG"], ["RHO", "PRES"], ["RHO", "TEMP"]]
+        self.material = "idealgas"
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Solves the ideal gas Hugoniot from 2 to 10 kg/m^3 at 500 points, all
+    points at once, converting from MKSK to CGSEV units.  The energy,
+    pressure, and temperature along the Hugoniot must match the baseline
+    solved one point at a time.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def compare_method(self):
+        # the eos output has no time history to compare over
+        return self.compare_out_to_baseline_rms_general()
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import time
+import numpy as np
+
+import Source.__config__ as cfg
+import Source.Payette_driver as pd
+from Source.Payette_data_container import DataContainer
+from Source.Payette_test import PayetteTest
+
+
+class StiffEOS(object):
+    """EOS whose pressure P = rho * (E - atan((E - EC) / W)) has a steep
+    step in E, so that the Hugoniot energy equation, monotone in E for
+    densities less than three times the initial density, has a single root
+    that Newton steps from far from it overshoot
+
+    """
+    EC, W = 2., .05
+
+    def __init__(self):
+        self.evaluations = {}
+
+    def pressure(self, rho, enrg):
+        """Return the pressure and its derivative with respect to energy"""
+        x = (enrg - self.EC) / self.W
+        return (rho * (enrg - np.arctan(x)),
+                rho * (1. - 1. / self.W / (1. + x ** 2)))
+
+    def evaluate_eos_ensemble(self, simdat, edat, unit_system,
+                              rho=None, temp=None, enrg=None):
+        """Evaluate the eos at each point, recording the energies at which
+        each density is evaluated"""
+        pres, dpde = self.pressure(rho, enrg)
+        edat.store("density", rho)
+        edat.store("energy", enrg)
+        edat.store("pressure", pres)
+        edat.store("dpdt", dpde)
+        edat.store("dedt", np.ones_like(rho))
+        for r, e in zip(rho, enrg):
+            self.evaluations.setdefault(r, []).append(e)
+            continue
+        return
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.keywords = ["fast", "regression", "eos", "hugoniot", "builtin"]
+
+        self.rho0, self.enrg0 = 1., 1.
+        self.rho = np.linspace(1.1, 2.9, 40)
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Solves the Hugoniot of an eos with a steep step in its pressure as a
+    function of energy, from 1.1 to 2.9 times the initial density at 40
+    points, with solve_hugoniot.  Newton steps overshoot the root of the
+    Hugoniot energy equation, so that each point must take more than one
+    iteration, some of them bisection steps, and every point must converge
+    to the root found by bisection one point at a time.  Solved again with
+    a maximum of 3 iterations, the points that do not converge must stop
+    after 3 iterations and be reported as not converged.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def run_test(self):
+        """ run the test """
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        t0 = time.time()
+        if not self.check_safeguard():
+            retcode = self.failcode
+        elif not self.check_maxiter():
+            retcode = self.failcode
+        else:
+            retcode = self.passcode
+        self.retcode = retcode
+        self.status = self.get_status()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        os.chdir(d)
+        return
+
+    def solve(self, eos_model, maxiter=100):
+        """Solve the Hugoniot of eos_model with solve_hugoniot"""
+        matdat = DataContainer("stiff eos")
+        for name in ("density", "energy", "pressure", "dpdt", "dedt"):
+            matdat.register(name, "Scalar", iv=0.)
+            continue
+        matdat.setup_data_container()
+        simdat = DataContainer("hugoniot")
+        simdat.setup_data_container()
+        pres0 = eos_model.pressure(self.rho0, self.enrg0)[0]
+        mdata, niter, converged, npass = pd.solve_hugoniot(
+            eos_model, simdat, matdat, None, self.rho, self.rho0,
+            self.enrg0, pres0, maxiter=maxiter)
+        enrg = mdata[:, matdat._columns("energy")[0]]
+        return enrg, niter, converged
+
+    def hugoniot(self, eos_model, rho, enrg):
+        """Return the Hugoniot energy equation at rho and enrg, and its
+        derivative with respect to enrg"""
+        pres0 = eos_model.pressure(self.rho0, self.enrg0)[0]
+        a = (1. / self.rho0 - 1. / rho) / 2.
+        pres, dpde = eos_model.pressure(rho, enrg)
+        return (pres + pres0) * a - enrg + self.enrg0, dpde * a - 1.
+
+    def reference(self, eos_model, rho):
+        """Return the root of the Hugoniot energy equation at rho found by
+        bisection"""
+        lo, hi = -100., 100.
+        while hi - lo > 1.e-13 * max(abs(lo), abs(hi)):
+            mid = .5 * (lo + hi)
+            if self.hugoniot(eos_model, rho, mid)[0] > 0.:
+                lo = mid
+            else:
+                hi = mid
+            continue
+        return .5 * (lo + hi)
+
+    def check_safeguard(self):
+        """Every point must converge to the reference root, taking more than
+        one iteration, and the solve must take bisection steps"""
+        eos_model = StiffEOS()
+        enrg, niter, converged = self.solve(eos_model)
+        if not converged.all() or not (niter > 1).all():
+            return False
+        ref = np.array([self.reference(eos_model, x) for x in self.rho])
+        if not np.allclose(enrg, ref, rtol=1.e-7, atol=0.):
+            return False
+
+        # energies that are not the Newton step from the last energy of a
+        # point were taken by bisection
+        nbisect = 0
+        for rho in self.rho:
+            evals = eos_model.evaluations[rho]
+            for e_old, e_new in zip(evals[:-1], evals[1:]):
+                f, df = self.hugoniot(eos_model, rho, e_old)
+                if not np.isclose(e_new, e_old - f / df, rtol=1.e-10):
+                    nbisect += 1
+                continue
+            continue
+        return nbisect > 0
+
+    def check_maxiter(self):
+        """Points that run out of iterations must stop and be reported as not
+        converged"""
+        maxiter = 3
+        eos_model = StiffEOS()
+        enrg, niter, converged = self.solve(eos_model, maxiter=maxiter)
+        if converged.all() or (niter > maxiter).any():
+            return False
+        return all(len(eos_model.evaluations[x]) == niter[i]
+                   for i, x in enumerate(self.rho))
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
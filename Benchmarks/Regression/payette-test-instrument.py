@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import re
+import sys
+import time
+
+import Source.__config__ as cfg
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        self.baseline = os.path.join(self.tdir, "payette-test-legs.gold")
+        self.keywords = ["fast", "regression", "elastic", "instrument",
+                         "python model", "builtin"]
+        self.runcommand = ["payette", "--no-writeprops", "--instrument",
+                           self.infile]
+        self.material = "elastic"
+
+        # the legs and their number of steps, and the stress controlled legs
+        self.legs = dict((x, 100) for x in range(1, 11))
+        self.stress_legs = (3, 4, 7, 8)
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Runs the payette-test-legs simulation with the hot paths of the driver
+    instrumented.  The simulation is run in process so that the statistics
+    returned by the run can be checked: each leg must have its number of
+    steps, strain controlled legs one update_state call per step, and stress
+    controlled legs Newton iterations and more than one call per step.  The
+    log file must hold the summary of each leg.  Counting and timing must
+    not change the output, which must match the payette-test-legs baseline.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def run_test(self):
+        """ run the test """
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        t0 = time.time()
+        siminfo, _ = self.run_simulation({"INSTRUMENT": True})
+        if siminfo["retcode"] != 0:
+            retcode = self.failtoruncode
+        elif not self.check_stats(siminfo.get("stats")):
+            retcode = self.failcode
+        else:
+            retcode = self.compare_method()
+        self.retcode = retcode
+        self.status = self.get_status()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        os.chdir(d)
+        return
+
+    def check_stats(self, stats):
+        """check the statistics of each leg and their summaries in the log"""
+        if stats is None:
+            return False
+        legs = dict((x["leg"], x) for x in stats["legs"])
+        if sorted(legs) != sorted(self.legs):
+            return False
+        for lnum, leg in legs.items():
+            if leg["steps"] != self.legs[lnum]:
+                return False
+            if lnum in self.stress_legs:
+                if (not leg["newton iterations"] or
+                        leg["update_state calls"] <= leg["steps"]):
+                    return False
+            elif (leg["newton iterations"] or
+                  leg["update_state calls"] != leg["steps"]):
+                return False
+            continue
+        if stats["total"]["steps"] != sum(self.legs.values()):
+            return False
+
+        log = open(self.name + ".log").read()
+        summaries = re.findall(r"leg (\d+) statistics: (\d+) steps", log)
+        return sorted((int(x), int(y)) for x, y in summaries) == \
+            sorted(self.legs.items())
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import sys
+import time
+import shutil
+import cPickle as pickle
+
+import Source.__config__ as cfg
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.opt/{0}.opt".format(self.name)
+        self.baseline = "{0}.gold".format(os.path.join(self.tdir, self.name))
+        self.keywords = ["builtin", "medium", "regression", "optimization",
+                         "cobyla", "resume"]
+        self.runcommand = ["payette", "--no-writeprops",
+                           self.infile]
+        self.resumecommand = ["payette", "--no-writeprops", "--resume",
+                              self.infile]
+        self.material = "elastic"
+        self.aux_files = [os.path.join(self.tdir, "optimization_tests.tbl"),
+                          os.path.join(self.tdir, "regression_tests.tbl")]
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """ Test of resuming an interrupted optimization
+        job.  The job is run, interrupted after half of its trials are
+        journaled by removing the index file and the directories of the
+        others, and run again with --resume.  The journaled trials may not
+        be run again, the others must be run with the same iteration numbers
+        and the optimum found must not change. """
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def run_test(self):
+        """ run the test """
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        t0 = time.time()
+        perform_calcs = self.run_command(self.runcommand)
+        if perform_calcs != 0:
+            retcode = self.failcode
+        else:
+            keys, completed = self.interrupt()
+            perform_calcs = self.run_command(self.resumecommand)
+            if perform_calcs != 0:
+                retcode = self.failcode
+            else:
+                retcode = self.check_resumed(keys, completed)
+                if retcode == self.passcode:
+                    retcode = self.compare_method()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        self.retcode = retcode
+        self.status = self.get_status()
+        os.chdir(d)
+        return
+
+    def index_file(self):
+        return os.path.join(self.name + ".opt", "index.pkl")
+
+    def interrupt(self):
+        """Leave the optimization directory as an interrupted job would, and
+        return the trials of the job and the modification times of the
+        output of the journaled trials
+
+        """
+        index = pickle.load(open(self.index_file(), "rb"))
+        os.remove(self.index_file())
+        keys = sorted(index)
+        completed = {}
+        with open(self.index_file() + ".journal", "wb") as fobj:
+            for key in keys[:len(keys) // 2]:
+                pickle.dump((key, index[key]), fobj, pickle.HIGHEST_PROTOCOL)
+                outfile = index[key]["outfile"]
+                completed[outfile] = os.path.getmtime(outfile)
+                continue
+        for key in keys[len(keys) // 2:]:
+            shutil.rmtree(index[key]["directory"])
+            continue
+        return keys, completed
+
+    def check_resumed(self, keys, completed):
+        index = pickle.load(open(self.index_file(), "rb"))
+        # the trials run again have the iteration numbers of the first run
+        if sorted(index) != keys:
+            return self.failcode
+        for entry in index.values():
+            outfile = entry["outfile"]
+            if not os.path.isfile(outfile):
+                return self.failcode
+            # journaled trials are not run again
+            if outfile in completed:
+                if os.path.getmtime(outfile) != completed[outfile]:
+                    return self.failcode
+            continue
+        return self.passcode
+
+    def compare_method(self):
+        return self.compare_opt_params()
+
+
+if __name__ == '__main__':
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
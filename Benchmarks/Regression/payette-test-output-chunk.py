@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import time
+
+import Source.__config__ as cfg
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        self.baseline = os.path.join(self.tdir, "payette-test-legs.gold")
+        self.keywords = ["fast", "regression", "elastic", "output",
+                         "python model", "builtin"]
+        self.runcommand = ["payette", "--no-writeprops", "--output-chunk=8",
+                           self.infile]
+        self.chunk = 8
+        self.material = "elastic"
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Runs the payette-test-legs simulation with the output buffer flushed
+    every 8 rows, so that the number of rows written (1001) is not a
+    multiple of the flush size.  The simulation is run in process so that
+    the output buffer can be checked: it must hold 8 rows and be empty at
+    the end of the run.  The output must have every row of, and match, the
+    payette-test-legs baseline.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def run_test(self):
+        """ run the test """
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        t0 = time.time()
+        siminfo, buf = self.run_simulation(
+            {"OUTPUT_CHUNK": self.chunk},
+            check=lambda x: (x._out_block.shape[0], x._out_nrows))
+        if siminfo["retcode"] != 0:
+            retcode = self.failtoruncode
+        elif buf != (self.chunk, 0):
+            # the buffer was not sized to the chunk or was not flushed
+            retcode = self.failcode
+        else:
+            retcode = self.compare_method()
+        self.retcode = retcode
+        self.status = self.get_status()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        os.chdir(d)
+        return
+
+    def compare_method(self):
+        # rows left in the buffer at the end of the run would be missing
+        # from the end of the output
+        nrows = len(open(self.outfile).readlines())
+        if nrows != len(open(self.baseline[0]).readlines()):
+            return self.diffcode
+        return self.compare_out_to_baseline_rms()
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
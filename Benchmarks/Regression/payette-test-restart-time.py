@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import glob
+import time
+import filecmp
+import shutil
+
+import Source.__config__ as cfg
+import Source.Payette_binary_output as pbo
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        self.baseline = "{0}.gold".format(os.path.join(self.tdir, self.name))
+        self.restartfile = self.name + ".3.5000E+00.prf"
+        self.runcommand = ["payette", "--no-writeprops", "--restart-time",
+                           "3.45", self.infile]
+        self.restartcommand = ["payette", "--no-writeprops", self.restartfile]
+        self.adaptivecommand = ["payette", "--no-writeprops", "--adaptive",
+                                "--restart-time", "3.45", self.infile]
+        self.binarycommand = ["payette", "--no-writeprops",
+                              "--output-format=binary",
+                              "--restart-time", "3.45", self.infile]
+        self.material = "elastic"
+
+        self.keywords = ["builtin", "payette", "restart", "regression", "fast"]
+        self.owner = "Tim Fuller"
+        self.date = "October 18, 2026"
+        self.description = """ Test of restarting in the middle of a leg from
+        the restart file written at the restart time.  The simulation is run
+        to completion and then continued from the restart file, which must
+        reproduce the output written after it.  The same is then done with
+        adaptive time stepping, restarting without the --adaptive flag, and
+        with binary output, restarting without the --output-format flag. """
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def run_test(self):
+        """ run the test """
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        t0 = time.time()
+        perform_calcs = self.run_command(self.runcommand)
+        if perform_calcs != 0:
+            retcode = self.failcode
+        else:
+            # now run the restart file
+            perform_calcs = self.run_command(self.restartcommand)
+            if perform_calcs != 0:
+                retcode = self.failcode
+            else:
+                # now check the output
+                retcode = self.compare_method()
+        if retcode == self.passcode:
+            retcode = self.run_adaptive()
+        if retcode == self.passcode:
+            retcode = self.run_binary()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        self.retcode = retcode
+        self.status = self.get_status()
+        os.chdir(d)
+        return
+
+    def compare_method(self):
+        # a restart that did not truncate the output to the restart step
+        # writes the steps after it twice
+        nrows = len(open(self.outfile).readlines())
+        if nrows != len(open(self.baseline[0]).readlines()):
+            return self.diffcode
+        return self.compare_out_to_baseline_rms()
+
+    def run_adaptive(self):
+        """Restart from a checkpoint written with adaptive time stepping,
+        the restart must continue with adaptive steps without the flag
+
+        """
+        for fnam in glob.glob(self.name + ".*.prf"):
+            os.remove(fnam)
+            continue
+        if self.run_command(self.adaptivecommand) != 0:
+            return self.failcode
+        restartfile = glob.glob(self.name + ".*.prf")
+        if len(restartfile) != 1:
+            return self.failcode
+        adaptive_out = self.name + ".adaptive.out"
+        shutil.copyfile(self.outfile, adaptive_out)
+        if self.run_command(["payette", "--no-writeprops",
+                             restartfile[0]]) != 0:
+            return self.failcode
+        if not filecmp.cmp(self.outfile, adaptive_out, shallow=False):
+            return self.diffcode
+        return self.passcode
+
+    def run_binary(self):
+        """Restart from a checkpoint written with binary output, the restart
+        must continue the binary file without the flag
+
+        """
+        for fnam in glob.glob(self.name + ".*.prf"):
+            os.remove(fnam)
+            continue
+        if self.run_command(self.binarycommand) != 0:
+            return self.failcode
+        restartfile = glob.glob(self.name + ".*.prf")
+        binfile = pbo.find_binary_file(self.outfile)
+        if len(restartfile) != 1 or binfile is None:
+            return self.failcode
+        binary_out = self.name + ".binary.out"
+        shutil.copyfile(self.outfile, binary_out)
+        shutil.copyfile(binfile, pbo.binary_file_name(binary_out))
+        if self.run_command(["payette", "--no-writeprops",
+                             restartfile[0]]) != 0:
+            return self.failcode
+        if not filecmp.cmp(self.outfile, binary_out, shallow=False):
+            return self.diffcode
+        if not filecmp.cmp(binfile, pbo.binary_file_name(binary_out),
+                           shallow=False):
+            return self.diffcode
+        return self.passcode
+
+
+if __name__ == "__main__":
+
+    import time
+
+    test = Test()
+
+    t0 = time.time()
+    print("{0} RUNNING".format(test.name))
+    run_test = test.run_command(test.runcommand)
+    dtp = time.time() - t0
+    if run_test != 0:
+        print("{0} FAILED TO RUN TO COMPLETION".format(test.name))
+        sys.exit()
+        pass
+    # now run the restart file
+    run_test = test.run_command(test.restartcommand)
+    t1 = time.time()
+    dta = time.time() - t1
+    if run_test == test.passcode:
+        print("{0} PASSED({1}s)".format(test.name, dtp + dta))
+    elif run_test == test.diffcode:
+        print("{0} DIFFED({1}s)".format(test.name, dtp + dta))
+    else:
+        print("{0} FAILED({1}s)".format(test.name, dtp + dta))
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import time
+
+import Source.__config__ as cfg
+import Source.__runopts__ as ro
+from Source.Payette_data_container import RING_LENGTH
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        self.baseline = os.path.join(self.tdir, "payette-test-legs.gold")
+        self.keywords = ["fast", "regression", "elastic", "history",
+                         "python model", "builtin"]
+        self.runcommand = ["payette", "--no-writeprops", "--history=ring",
+                           "--snapshot-interval=100", self.infile]
+        self.interval = 100
+        self.material = "elastic"
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Runs the payette-test-legs simulation with the simulation data held in
+    ring history rather than for every step.  The simulation is run in
+    process so that the history can be checked: the simulation and material
+    data must hold RING_LENGTH rows, and a snapshot must have been taken
+    every 100 steps.  The output must match the payette-test-legs baseline.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def run_test(self):
+        """ run the test """
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        t0 = time.time()
+        siminfo, hist = self.run_simulation(
+            {"HISTORY": "ring", "SNAPSHOT_INTERVAL": self.interval},
+            check=lambda x: (x.simdat._data.shape[0],
+                             x.matdat._data.shape[0],
+                             x.simdat.dump().shape[0], ro.ISTEP))
+        nsim, nmat, nsnap, nsteps = hist
+        if siminfo["retcode"] != 0:
+            retcode = self.failtoruncode
+        elif (nsim, nmat) != (RING_LENGTH, RING_LENGTH):
+            # the data were held for every step
+            retcode = self.failcode
+        elif nsnap != nsteps // self.interval:
+            retcode = self.failcode
+        else:
+            retcode = self.compare_method()
+        self.retcode = retcode
+        self.status = self.get_status()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        os.chdir(d)
+        return
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
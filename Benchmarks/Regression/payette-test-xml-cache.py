@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import time
+
+import Source.__config__ as cfg
+from Source.Payette_test import PayetteTest
+
+
+class Test(PayetteTest):
+
+    def __init__(self, check=True):
+        super(Test, self).__init__(check)
+
+        self.enabled = True
+
+        self.name = os.path.splitext(os.path.basename(__file__))[0]
+        self.tdir = os.path.dirname(os.path.realpath(__file__))
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.outfile = "{0}.out".format(self.name)
+        self.baseline = os.path.join(self.tdir, "payette-test-legs.gold")
+        self.keywords = ["fast", "regression", "elastic", "xml cache",
+                         "python model", "builtin"]
+        self.runcommand = ["payette", "--no-writeprops", "--xml-cache",
+                           self.infile]
+        self.material = "elastic"
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = """
+    Runs the payette-test-legs simulation with the parsed material control
+    files kept on disk.  The output must match the payette-test-legs
+    baseline whether the control file is parsed or read from the cache.  The
+    first run must write the cache and the second must read it rather than
+    parse the control file and write the cache again.
+"""
+
+        if check:
+            self.check_setup()
+
+        pass
+
+    def run_test(self):
+        """ run the test twice, without and with the cache on disk """
+        t0 = time.time()
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        cache_file = os.path.join(os.path.dirname(cfg.MTLDB), "xml_cache.pkl")
+        if os.path.isfile(cache_file):
+            os.remove(cache_file)
+        retcode = self.failtoruncode
+        if self.run_command(self.runcommand) == 0:
+            retcode = self.compare_method()
+        if retcode == self.passcode:
+            retcode = self.failcode
+            if os.path.isfile(cache_file):
+                stat = os.stat(cache_file)
+                retcode = self.failtoruncode
+                if self.run_command(self.runcommand) == 0:
+                    retcode = self.compare_method()
+                # the cache file is replaced only if it was not read
+                new = os.stat(cache_file)
+                if (new.st_ino, new.st_mtime) != (stat.st_ino, stat.st_mtime):
+                    retcode = self.failcode
+        self.retcode = retcode
+        self.status = self.get_status()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        os.chdir(d)
+        return
+
+
+if __name__ == '__main__':
+    import time
+
+    test = Test()
+
+    test.runFromTerminal(sys.argv[1:])
@@ -130,12 +130,16 @@ class ElasticPlastic(ConstitutiveModelPrototype):
         if cfg.F2PY["callback"]:
             a.extend([report_and_raise_error, log_message])
         a.append(self.nsv)
-        signew, svnew, usm = mtllib.diamm_calc(*a)
+        signew, svnew, usm, jac = mtllib.diamm_calc(*a)
 
         # update data
         matdat.store("stress", signew)
         matdat.store("__xtra__", svnew)
 
+        # diamm_calc returns the tangent stiffness of the quasistatic stress
+        # update
+        self._tangent = jac
+
         return
 
     # Private method
@@ -26,11 +26,11 @@
 # DEALINGS IN THE SOFTWARE.
 
 import sys
-from numpy import array
+from numpy import array, sum as npsum
 
 import Source.__config__ as cfg
 from Source.Payette_utils import log_warning, log_message, report_and_raise_error
-from Source.Payette_tensor import iso, dev
+from Source.Payette_tensor import iso, dev, I6
 from Source.Payette_constitutive_model import ConstitutiveModelPrototype
 from Toolset.elastic_conversion import compute_elastic_constants
 
@@ -96,9 +96,10 @@ class Elastic(ConstitutiveModelPrototype):
            update the material state based on current state and strain increment
         """
         # get passed arguments
-        dt = simdat.get("time step")
-        d = matdat.get("rate of deformation")
-        sigold = matdat.get("stress")
+        h_sig = matdat.handle("stress")
+        dt = simdat.handle("time step").get()
+        d = matdat.handle("rate of deformation").get()
+        sigold = h_sig.get()
 
         if self.code == "python":
             sig = _py_update_state(self.mui, dt, d, sigold)
@@ -110,7 +111,28 @@ class Elastic(ConstitutiveModelPrototype):
             sig = mtllib.elast_calc(*a)
 
         # store updated data
-        matdat.store("stress", sig)
+        h_sig.store(sig)
+
+    def update_state_ensemble(self, simdat, edat):
+        """
+           update the material state of every point in the ensemble
+        """
+        # get passed arguments
+        dt = simdat.get("time step")
+        d = edat.get("rate of deformation")
+        sigold = edat.get("stress")
+
+        if self.code == "python":
+            sig = _py_update_state_blk(self.mui, dt, d, sigold)
+
+        else:
+            a = [dt, self.mui, sigold.T, d.T]
+            if cfg.F2PY["callback"]:
+                a.extend([report_and_raise_error, log_message])
+            sig = mtllib.elast_calc_blk(*a).T
+
+        # store updated data
+        edat.store("stress", sig)
 
     def _py_set_up(self, mui):
 
@@ -152,3 +174,18 @@ def _py_update_state(ui, dt, d, sigold):
 
     # elastic stress update
     return sigold + threek * iso(de) + twomu * dev(de)
+
+
+def _py_update_state_blk(ui, dt, d, sigold):
+
+    # strain increment
+    de = d * dt
+
+    # user properties
+    k, mu = ui
+    twomu = 2. * mu
+    threek = 3. * k
+
+    # elastic stress update
+    isode = npsum(de[:, :3], axis=1)[:, None] / 3. * I6
+    return sigold + threek * isode + twomu * (de - isode)
@@ -25,11 +25,12 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-from numpy import array, zeros
+from numpy import array, zeros, dot, asarray
 
 import Source.__config__ as cfg
 from Source.Payette_utils import log_warning, report_and_raise_error, log_message
-from Source.Payette_tensor import ata, push, I6
+from Source.Payette_tensor import (
+    ata, push, det, inv, to_matrix, to_array, SYMTENS_MAP, I6)
 from Source.Payette_constitutive_model import ConstitutiveModelPrototype
 from Toolset.elastic_conversion import compute_elastic_constants
 
@@ -110,7 +111,8 @@ class FiniteElastic(ConstitutiveModelPrototype):
            update the material state based on current state and strain increment
         """
         # deformation gradient and its determinant
-        F = matdat.get("deformation gradient")
+        h_F = matdat.handle("deformation gradient")
+        F = h_F.get()
 
         if self.code == "python":
             E, pk2, sig = _py_update_state(self.mui, F)
@@ -121,12 +123,39 @@ class FiniteElastic(ConstitutiveModelPrototype):
                 a.extend([report_and_raise_error, log_message])
             E, pk2, sig = mtllib.finite_elast_calc(*a)
 
-        matdat.store("stress", sig)
-        matdat.store("pk2 stress", pk2)
-        matdat.store("green strain", E)
+        matdat.handle("stress").store(sig)
+        matdat.handle("pk2 stress").store(pk2)
+        matdat.handle("green strain").store(E)
+        F0 = h_F.get("-")
+        self._tangent = None
+        self._tangent_args = (array(F), array(F0), pk2, sig)
 
         return
 
+    def update_state_ensemble(self, simdat, edat):
+        """
+           update the material state of every point in the ensemble
+        """
+        if self.code == "python":
+            # the python implementation updates one point at a time
+            return super(FiniteElastic, self).update_state_ensemble(
+                simdat, edat)
+
+        F = edat.get("deformation gradient")
+        a = [self.mui, F.T]
+        if cfg.F2PY["callback"]:
+            a.extend([report_and_raise_error, log_message])
+        E, pk2, sig = mtllib.finite_elast_calc_blk(*a)
+
+        edat.store("stress", sig.T)
+        edat.store("pk2 stress", pk2.T)
+        edat.store("green strain", E.T)
+
+        return
+
+    def consistent_tangent(self, F, F0, pk2, sig):
+        return _tangent(self.mui, F, F0, pk2, sig)
+
     def _py_set_up(self, mui):
 
         mu, nu, k = mui
@@ -154,19 +183,59 @@ class FiniteElastic(ConstitutiveModelPrototype):
 
 def _py_update_state(ui, F):
 
-    # user input
-    c11, c12, c44 = ui
-
     # green lagrange strain
     E = 0.5 * (ata(F) - I6)
 
     # PK2 stress
+    pk2 = _pk2(ui, E)
+
+    sig = push(pk2, F)
+
+    return E, pk2, sig
+
+
+def _pk2(ui, E):
+
+    # user input
+    c11, c12, c44 = ui
+
     pk2 = zeros(6)
     pk2[0] = c11 * E[0] + c12 * E[1] + c12 * E[2]
     pk2[1] = c12 * E[0] + c11 * E[1] + c12 * E[2]
     pk2[2] = c12 * E[0] + c12 * E[1] + c11 * E[2]
     pk2[3:] = c44 * E[3:]
 
-    sig = push(pk2, F)
+    return pk2
 
-    return E, pk2, sig
+
+def _tangent(ui, F, F0, pk2, sig):
+    """Tangent dsig / dE of the Cauchy stress sig = push(pk2, F) =
+    Ft.pk2.F / J for a strain increment dE applied to the deformation
+    gradient at the beginning of the step, i.e., dF = dE.F0, for which
+
+        dsig = (F0t.dE.pk2.F + Ft.pk2.dE.F0) / J - tr(dE.F0.inv(F)) sig
+               + push(C:dG, F)
+
+    where dG = sym(Ft.dE.F0) is the increment in the Green strain.
+
+    """
+    jac = det(F)
+    h = dot(asarray(to_matrix(F0)), asarray(to_matrix(inv(F))))
+    f0 = asarray(to_matrix(F0))
+    f = asarray(to_matrix(F))
+    pk2 = asarray(to_matrix(pk2))
+    sig = asarray(to_matrix(sig))
+
+    J = zeros((6, 6))
+    for j, (k, l) in SYMTENS_MAP.items():
+        # unit strain increment in the jth component
+        de = zeros((3, 3))
+        de[k, l] = de[l, k] = 1.
+        dpk2 = _pk2(ui, to_array(dot(f.T, dot(de, f0))))
+        dsig = ((dot(f0.T, dot(de, dot(pk2, f))) +
+                 dot(f.T, dot(pk2, dot(de, f0)))) / jac -
+                dot(de, h).trace() * sig)
+        J[:, j] = to_array(dsig) + push(dpk2, F)
+        continue
+
+    return J
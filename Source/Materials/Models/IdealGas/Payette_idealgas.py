@@ -117,6 +117,44 @@ class IdealGas(ConstitutiveModelPrototype):
         matdat.store("soundspeed", (R * temp / M) ** 2)
         return
 
+    def evaluate_eos_ensemble(self, simdat, edat, unit_system,
+                              rho=None, temp=None, enrg=None):
+        """Evaluate the eos at every point of the ensemble edat
+
+        rho, and temp or enrg, are arrays with a value for each point, the
+        same quantities as evaluate_eos are stored for all points at once
+        """
+        M = self.ui[0]
+        CV = self.ui[1]
+        R = UnitManager.transform(
+            8.3144621,
+            "ENERGY_UNITS_OVER_TEMPERATURE_UNITS_OVER_DISCRETE_AMOUNT",
+            "SI", unit_system)
+
+        if rho is not None and temp is not None:
+            rho, temp = np.asarray(rho), np.asarray(temp)
+            enrg = CV * R * temp
+        elif rho is not None and enrg is not None:
+            rho, enrg = np.asarray(rho), np.asarray(enrg)
+            temp = enrg / CV / R
+        else:
+            pu.report_and_raise_error(
+                "evaluate_eos_ensemble not used correctly.")
+
+        P = R * temp * rho / M
+
+        edat.store("density", rho)
+        edat.store("temperature", temp)
+        edat.store("energy", enrg)
+
+        edat.store("pressure", P)
+        edat.store("dpdr", R * temp / M)
+        edat.store("dpdt", R * rho / M)
+        edat.store("dedt", CV * R)
+        edat.store("dedr", CV * P * M / rho ** 2)
+        edat.store("soundspeed", (R * temp / M) ** 2)
+        return
+
     def update_state(self, simdat, matdat):
         """update the material state"""
         pu.report_and_raise_error("MGR EOS does not provide update_state")
@@ -31,7 +31,7 @@ import numpy as np
 import Source.__config__ as cfg
 from Source.Payette_utils import (
     report_and_raise_error, log_warning, log_message, parse_token)
-from Source.Payette_tensor import SYM_MAP, iso, dev, mag, ddp
+from Source.Payette_tensor import SYM_MAP, I6, W, iso, dev, mag, ddp
 from Source.Payette_constitutive_model import ConstitutiveModelPrototype
 from Toolset.elastic_conversion import compute_elastic_constants
 
@@ -78,6 +78,15 @@ class Plastic(ConstitutiveModelPrototype):
         self.nsv = nxtra
         self.bulk_modulus, self.shear_modulus = self.ui[0], self.ui[1]
 
+        # the consistent tangent is derived for constant elastic moduli and
+        # no softening
+        pi = self._pi
+        self._has_tangent = (
+            not self.ui[pi.EOSID] and self.ui[pi.A0F] == self.ui[pi.A0] and
+            self.ui[pi.A1F] == self.ui[pi.A1])
+        k, mu = self.bulk_modulus, self.shear_modulus
+        self._ce = (k - 2. / 3. * mu) * np.outer(I6, I6) + 2. * mu * np.eye(6)
+
         # register __xtra__
         matdat.register_xtra(nxtra, names, keys, xtra)
 
@@ -88,10 +97,12 @@ class Plastic(ConstitutiveModelPrototype):
            update the material state based on current state and strain increment
         """
         # get passed arguments
-        dt = simdat.get("time step")
-        d = matdat.get("rate of deformation")
-        sigold = matdat.get("stress")
-        xtra = matdat.get("__xtra__")
+        h_sig, h_xtra = matdat.handle("stress"), matdat.handle("__xtra__")
+        dt = simdat.handle("time step").get()
+        d = matdat.handle("rate of deformation").get()
+        sigold = h_sig.get()
+        xtra = h_xtra.get()
+        gamn, yldn = xtra[self._xi.GAM], xtra[self._xi.YLD]
 
         a = [1, self.nsv, dt, self.ui, sigold, d, xtra]
         if cfg.F2PY["callback"]:
@@ -99,6 +110,113 @@ class Plastic(ConstitutiveModelPrototype):
         sig, xtra = mtllib.plastic_calc(*a)
 
         # store updated data
-        matdat.store("__xtra__", xtra)
-        matdat.store("stress", sig)
+        h_xtra.store(xtra)
+        h_sig.store(sig)
+        self._tangent, self._tangent_args = None, (sig, xtra, gamn, yldn)
+        return
+
+    def update_state_ensemble(self, simdat, edat):
+        """
+           update the material state of every point in the ensemble
+        """
+        # get passed arguments
+        dt = simdat.get("time step")
+        d = edat.get("rate of deformation")
+        sigold = edat.get("stress")
+        xtra = edat.get("__xtra__")
+
+        a = [dt, self.ui, sigold.T, d.T, xtra.T]
+        if cfg.F2PY["callback"]:
+            a.extend([report_and_raise_error, log_message])
+        sig, xtra = mtllib.plastic_calc_blk(*a)
+
+        # store updated data
+        edat.store("__xtra__", xtra.T)
+        edat.store("stress", sig.T)
         return
+
+    def consistent_tangent(self, sig, xtra, gamn, yldn):
+        """Consistent tangent J = dsig / dE of the stress update performed by
+        plastic_calc
+
+        Parameters
+        ----------
+        sig : array_like
+          updated stress
+        xtra : array_like
+          updated state variables
+        gamn : float
+          distortional plastic strain at the beginning of the step
+        yldn : float
+          yield flag at the beginning of the step
+
+        Returns
+        -------
+        J : array_like or None
+          6x6 tangent, or None if it is not available for the current state
+
+        Notes
+        -----
+        plastic_calc returns the shifted trial stress xit = xin + C:de along
+        p = C:m, where m is the unit normal to the yield surface at the trial
+        state, so that
+
+            sig = sign + C:de - dlam * q,  q = p - 2 / 3 * c0 * dev(m)
+
+        with dlam found from the consistency condition.  Differentiating
+        gives the elastic-plastic tangent plus a term from the rotation of m
+        with the trial stress.  No tangent is returned for stresses returned
+        to the vertex, or for steps that began elastic and yielded, which
+        plastic_calc splits into subcycles.
+
+        """
+        if not self._has_tangent:
+            return None
+
+        yld = xtra[self._xi.YLD]
+        if yld == 0.:
+            # elastic step
+            return np.array(self._ce)
+
+        if yld != 1. or yldn == 0.:
+            return None
+
+        pi = self._pi
+        k, mu = self.ui[pi.K], self.ui[pi.MU]
+        a1, c0, c1, c2 = (self.ui[pi.A1], self.ui[pi.C0],
+                          self.ui[pi.C1], self.ui[pi.C2])
+        root2 = np.sqrt(2.)
+
+        # direction of the deviatoric part of the shifted stress, which is
+        # the same at the trial and returned states
+        ibs = self._xi.BSIG11
+        s = dev(sig - xtra[ibs:ibs + 6])
+        smag = mag(s)
+        if smag < 1.e-16:
+            return None
+        n = s / smag
+
+        # yield surface gradient and plastic multiplier
+        gmag = np.sqrt(.5 + 3. * a1 * a1)
+        g = n / root2 + a1 * I6
+        gam = xtra[self._xi.GAM]
+        dlam = root2 * gmag * (gam - gamn)
+
+        # derivative of the yield stress with respect to gam
+        hiso = 0.
+        if c1 and gam > 0.:
+            eqps = np.sqrt(2. / 3.) * gam
+            hiso = c1 / c2 * eqps ** (1. / c2 - 1.) * np.sqrt(2. / 3.)
+
+        # consistency condition: ddlam = g:C:dE / hmod
+        hmod = (mu + 9. * k * a1 * a1 + hiso / root2) / gmag
+        q = (3. * k * a1 * I6 + (2. * mu - 2. / 3. * c0) * n / root2) / gmag
+        J = self._ce - np.outer(q, np.dot(W * g, self._ce)) / hmod
+
+        # rotation of the return direction with the trial stress
+        strial = smag + root2 * mu * dlam / gmag
+        fac = dlam * (2. * mu - 2. / 3. * c0) / (root2 * gmag)
+        pdev = np.eye(6) - np.outer(I6, I6) / 3.
+        J -= fac * 2. * mu / strial * (pdev - np.outer(n, W * n))
+
+        return J
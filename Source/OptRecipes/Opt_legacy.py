@@ -73,7 +73,8 @@ class ObjectiveFunction(object):
         Parameters
         ----------
         args : tuple
-            args[0] : output file from simulation
+            args[0] : output file from simulation, or the (head, data)
+            output of a simulation run in memory
 
         Returns
         -------
@@ -90,13 +91,12 @@ class ObjectiveFunction(object):
 
         # extract only what we want from the gold and output files
         out_f = args[0]
-        exargs = [out_f] + self.minvars
-        out_data = np.array(pe.extract(exargs, silent=True))
+        out_data = pe.extract_columns(out_f, self.minvars)
         if self.abscissa is not None:
             to, xo = out_data[:, 0], out_data[:, 1:]
             tg, xg = self.gold_data[:, 0], self.gold_data[:, 1:]
         else:
-            xo = data
+            xo = out_data
             xg = self.gold_data
 
         # do the comparison
@@ -72,7 +72,8 @@ class ObjectiveFunction(object):
         Parameters
         ----------
         args : tuple
-            args[0] : output file from simulation
+            args[0] : output file from simulation, or the (head, data)
+            output of a simulation run in memory
 
         Returns
         -------
@@ -83,10 +84,9 @@ class ObjectiveFunction(object):
 
         # extract only what we want from the gold and output files
         out_f = args[0]
-        if not os.path.isfile(out_f):
+        if isinstance(out_f, basestring) and not os.path.isfile(out_f):
             pu.report_and_raise_error("{0} not found".format(out_f))
-        exargs = [out_f] + self.minvars
-        out_data = np.array(pe.extract(exargs, silent=True))
+        out_data = pe.extract_columns(out_f, self.minvars)
         to, xo = out_data[:, 0], out_data[:, 1:]
 
         # do the comparison
@@ -83,7 +83,8 @@ class ObjectiveFunction(object):
         Parameters
         ----------
         args : tuple
-            args[0] : output file from simulation
+            args[0] : output file from simulation, or the (head, data)
+            output of a simulation run in memory
 
         Returns
         -------
@@ -95,8 +96,7 @@ class ObjectiveFunction(object):
         out_f = args[0]
 
         # extract only what we want from the gold and output files
-        exargs = [out_f] + self.minvars
-        xo = np.array(pe.extract(exargs, silent=True))
+        xo = pe.extract_columns(out_f, self.minvars)
 
         # do the comparison
         Eo = []
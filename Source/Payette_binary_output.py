@@ -0,0 +1,234 @@
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Binary Payette output files.
+
+A binary output file is written alongside a text output file "name.out" as
+"name.out.npy".  It is a numpy .npy file holding a one dimensional record
+array with one float64 field per output variable, named by the variable's
+plot key, so that the header and data are kept together and the file can be
+memory mapped with numpy.load(..., mmap_mode="r").  The values are read
+back from the text written to the text file, see BinaryOutputFile.write_text,
+so that readers get the same data from either.
+
+"""
+
+import os
+import struct
+import numpy as np
+import numpy.lib.format as npf
+
+EXT = ".npy"
+
+# width reserved for the number of rows in the file header, the header is
+# rewritten in place each time rows are appended
+_NROW_WIDTH = 20
+
+
+def binary_file_name(fpath):
+    """Return the name of the binary file written alongside fpath"""
+    if fpath.endswith(EXT):
+        return fpath
+    return fpath + EXT
+
+
+def find_binary_file(fpath):
+    """Return the binary file written alongside fpath, or None if there is
+    not one
+
+    """
+    bpath = binary_file_name(fpath)
+    if os.path.isfile(bpath):
+        return bpath
+    return None
+
+
+def load(fpath, mmap_mode="r"):
+    """Load a binary output file
+
+    Parameters
+    ----------
+    fpath : str
+        Path to the binary file, or to the text file it was written alongside
+    mmap_mode : str, optional {"r"}
+        Passed to numpy.load. If None, the data are read in to memory.
+
+    Returns
+    -------
+    head : list
+        list of column names
+    data : array_like
+        m x n dimensional numpy ndarray where m is the number of data points
+        (rows) and n the number of data fields (columns)
+
+    """
+    try:
+        records = np.load(binary_file_name(fpath), mmap_mode=mmap_mode)
+    except ValueError:
+        # files without any rows cannot be memory mapped
+        records = np.load(binary_file_name(fpath))
+    head = list(records.dtype.names)
+    data = records.view(np.float64).reshape(records.shape[0], len(head))
+    return head, data
+
+
+def get_header(fpath):
+    """Return the list of column names of the binary file fpath"""
+    with open(binary_file_name(fpath), "rb") as fobj:
+        version = npf.read_magic(fobj)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npf.read_array_header_1_0(fobj)
+        else:
+            shape, fortran_order, dtype = npf.read_array_header_2_0(fobj)
+    return list(dtype.names)
+
+
+class BinaryOutputFile(object):
+    """Binary output file that rows of output are appended to as the
+    simulation runs.
+
+    The file is a valid .npy file after every call to write.
+
+    """
+
+    def __init__(self, fpath, keys, append=False):
+        """Open the binary output file
+
+        Parameters
+        ----------
+        fpath : str
+            Path to the text output file the binary file is written alongside
+        keys : list
+            Column names
+        append : bool, optional
+            Append to an existing file rather than creating a new one
+
+        """
+        self.name = binary_file_name(fpath)
+        self.keys = [str(x) for x in keys]
+        self.dtype = np.dtype([(x, "<f8") for x in self.keys])
+        self._descr = npf.dtype_to_descr(self.dtype)
+
+        if append:
+            self.file = open(self.name, "r+b")
+            self._version = version = npf.read_magic(self.file)
+            if version == (1, 0):
+                shape, fortran_order, dtype = npf.read_array_header_1_0(
+                    self.file)
+            else:
+                shape, fortran_order, dtype = npf.read_array_header_2_0(
+                    self.file)
+            if list(dtype.names) != self.keys:
+                raise ValueError(
+                    "columns of {0} do not match output".format(self.name))
+            self._hlen = self.file.tell()
+            # the file may have been truncated to fewer rows than the header
+            # gives, see Payette.write_restart
+            self.file.seek(0, 2)
+            self.nrows = min(shape[0], (self.file.tell() - self._hlen) //
+                             self.dtype.itemsize)
+            self.file.seek(self._hlen + self.nrows * self.dtype.itemsize)
+            self.file.truncate()
+            self._write_header()
+
+        else:
+            self.file = open(self.name, "wb")
+            self._version, self._hlen = None, None
+            self.nrows = 0
+            self._write_header()
+        pass
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    def _header(self, nrows):
+        """Return the .npy header describing nrows rows"""
+        shape = "({0:d},)".format(nrows).ljust(_NROW_WIDTH)
+        header = ("{{'descr': {0!r}, 'fortran_order': False, "
+                  "'shape': {1}, }}".format(self._descr, shape))
+        if self._hlen is None:
+            # pad so that the data begin on a 16 byte boundary
+            self._version = (1, 0) if len(header) < 65000 else (2, 0)
+            hlen = self._magic_len() + len(header) + 1
+            self._hlen = hlen + (16 - hlen % 16) % 16
+        header = header.ljust(self._hlen - self._magic_len() - 1) + "\n"
+        fmt = "<H" if self._version == (1, 0) else "<I"
+        return (npf.magic(*self._version) + struct.pack(fmt, len(header)) +
+                header)
+
+    def _magic_len(self):
+        """Return the length of the magic string and header length"""
+        return 10 if self._version == (1, 0) else 12
+
+    def _write_header(self):
+        """(Re)write the header at the beginning of the file"""
+        self.file.seek(0)
+        self.file.write(self._header(self.nrows))
+        self.file.seek(0, 2)
+        return
+
+    def write(self, block):
+        """Append the rows of block to the file
+
+        Parameters
+        ----------
+        block : array_like
+            m x n array of m rows of the n output variables
+
+        """
+        block = np.ascontiguousarray(block, dtype="<f8")
+        if not block.shape[0]:
+            return
+        self.file.write(block.tostring())
+        self.nrows += block.shape[0]
+        self._write_header()
+        return
+
+    def write_text(self, text):
+        """Append the rows of the text output text to the file
+
+        The values are read back from text rather than rounded numerically,
+        so that they are exactly those a reader of the text file gets.
+
+        Parameters
+        ----------
+        text : str
+            rows of the n output variables as written to the text file
+
+        """
+        block = np.array(text.split(), dtype=np.float64)
+        self.write(block.reshape(-1, len(self.keys)))
+        return
+
+    def flush(self):
+        self.file.flush()
+        return
+
+    def close(self):
+        self.file.close()
+        return
@@ -712,6 +712,26 @@ def dtypes(dtype=None):
     return DTYPES.get(dtype.strip().lower(), (None, None))
 
 
+def _get_floats(option, lines, default=None):
+    """Find the option in lines and return the list of floats following it
+
+    Values may be separated by white space or commas, which
+    Payette_input_parser.get does not allow.
+
+    """
+    regex = r"(?im)^\s*{0}\s+(?P<val>.*)$".format(
+        r"\s+".join(option.split()))
+    match = re.search(regex, lines)
+    if match is None:
+        return default
+    try:
+        return [float(x) for x in match.group("val").replace(",", " ").split()]
+    except ValueError:
+        pu.report_and_raise_error(
+            "expected numbers for {0}, got: {1}"
+            .format(option, match.group("val")))
+
+
 class EOSBoundary(object):
     """The EOS boundary class"""
 
@@ -798,9 +818,7 @@ class EOSBoundary(object):
             pip.get("nprints", self.boundary, 4))
 
         # density range
-        val = sorted(
-            [float(x) for x in
-             pip.get("density range", self.boundary, "0. 0.").split()])
+        val = sorted(_get_floats("density range", self.boundary, [0., 0.]))
         if len(val) != 2 or val[0] == val[1]:
             pu.report_and_raise_error(
                 "Unacceptable density range in boundary block.")
@@ -808,8 +826,7 @@ class EOSBoundary(object):
 
         # temperature range
         val = sorted(
-            [float(x) for x in
-             pip.get("temperature range", self.boundary, "0. 0.").split()])
+            _get_floats("temperature range", self.boundary, [0., 0.]))
         if len(val) != 2 or val[0] == val[1]:
             pu.report_and_raise_error(
                 "Unacceptable temperature range in boundary block.")
@@ -835,19 +852,19 @@ class EOSBoundary(object):
         tmpr_0, tmpr_f = self.bcontrol["temperature range"]["value"]
 
         # isotherm expects [density, temperature]
-        val = pip.get("path isotherm", self.boundary)
+        val = _get_floats("path isotherm", self.boundary)
         if val is not None:
-            isotherm = [float(x) for x in val.split()]
+            isotherm = val
             bad_rho = not rho_0 <= isotherm[0] <= rho_f
             bad_temp = not tmpr_0 <= isotherm[1] <= tmpr_f
             if len(isotherm) != 2 or bad_rho or bad_temp:
                 pu.report_and_raise_error("Bad initial state for isotherm.")
             self.bcontrol["path isotherm"]["value"] = isotherm
 
-        val = pip.get("path hugoniot", self.boundary)
+        val = _get_floats("path hugoniot", self.boundary)
         if val is not None:
             # isotherm expects [density, temperature]
-            hugoniot = [float(x) for x in val.split()]
+            hugoniot = val
             bad_rho = not rho_0 <= hugoniot[0] <= rho_f
             bad_temp = not tmpr_0 <= hugoniot[1] <= tmpr_f
             if len(hugoniot) != 2 or bad_rho or bad_temp:
@@ -37,6 +37,7 @@ import numpy as np
 import Source.__runopts__ as ro
 import Source.Payette_tensor as pt
 import Source.Payette_utils as pu
+import Source.Payette_instrument as pi
 import Source.Payette_xml_parser as px
 from Source.Payette_xml_parser import XMLParserError as XMLParserError
 from Source.Payette_unit_manager import UnitManager as UnitManager
@@ -51,6 +52,7 @@ class ConstitutiveModelPrototype(object):
     __init__
     set_up
     update_state
+    update_state_ensemble
     finish_setup
     register_parameter
     get_parameter_names_and_values
@@ -60,6 +62,8 @@ class ConstitutiveModelPrototype(object):
     initialize_state
     compute_init_jacobian
     jacobian
+    numerical_jacobian
+    tangent
 
     """
 
@@ -124,6 +128,8 @@ class ConstitutiveModelPrototype(object):
         self.ndc = 0
         self.nxtra = 0
         self.J0 = None
+        self._tangent = None
+        self._tangent_args = None
         self.ui0 = np.zeros(self.nprop)
         self.ui = np.zeros(self.nprop)
         self.dc = np.zeros(self.ndc)
@@ -149,6 +155,78 @@ class ConstitutiveModelPrototype(object):
             'Constitutive model must provide update_state method')
         return
 
+    def update_state_ensemble(self, simdat, edat):
+        """Update the material state of every point of the ensemble edat
+
+        Models whose kernels can process blocks of material points should
+        override this method and update all points in a single call.  The
+        default implementation updates the points one at a time through
+        update_state, using the current row of the material data container as
+        scratch space.
+
+        Parameters
+        ----------
+        simdat : object
+          simulation data container
+        edat : object
+          ensemble data, laid out as the material data container
+
+        """
+        matdat = self.matdat
+        row = matdat.get("all")
+        for ipt in range(edat.npts):
+            matdat.store("all", edat.get("all", point=ipt))
+            self.update_state(simdat, matdat)
+            edat.store("all", matdat.get("all"), point=ipt)
+            continue
+        matdat.store("all", row)
+        return
+
+    def evaluate_eos(self, *args, **kwargs):
+        """ evaluate the eos """
+        pu.report_and_raise_error(
+            'EOS model must provide evaluate_eos method')
+        return
+
+    def evaluate_eos_ensemble(self, simdat, edat, unit_system,
+                              rho=None, temp=None, enrg=None):
+        """Evaluate the eos at every point of the ensemble edat
+
+        EOS models that can evaluate arrays of states, including Fortran
+        models whose extension routines loop over points, should override
+        this method and evaluate all points in a single call.  The default
+        implementation evaluates the points one at a time through
+        evaluate_eos, using the current row of the material data container
+        as scratch space.
+
+        Parameters
+        ----------
+        simdat : object
+          simulation data container
+        edat : object
+          ensemble data, laid out as the material data container
+        unit_system : str
+          unit system of rho, temp, and enrg
+        rho : array_like
+          density of each point
+        temp, enrg : array_like
+          temperature or energy of each point
+
+        """
+        matdat = self.matdat
+        row = matdat.get("all", copy=True)
+        for ipt in range(edat.npts):
+            kwargs = {"rho": rho[ipt]}
+            if temp is not None:
+                kwargs["temp"] = temp[ipt]
+            if enrg is not None:
+                kwargs["enrg"] = enrg[ipt]
+            self.evaluate_eos(simdat, matdat, unit_system, **kwargs)
+            edat.store("all", matdat.get("all"), point=ipt)
+            continue
+        matdat.store("all", row)
+        return
+
     def finish_setup(self, matdat):
         """ check that model is properly set up """
 
@@ -160,6 +238,7 @@ class ConstitutiveModelPrototype(object):
 
         if self.eos_model:
             # mss: do something here? But is seems unnecessary.
+            self.matdat = matdat
             return
 
         if not self.bulk_modulus:
@@ -498,6 +577,58 @@ class ConstitutiveModelPrototype(object):
         return
 
     def jacobian(self, simdat, matdat, V):
+        """Return the submatrix Js = J[V, V] of the Jacobian matrix J = dsig /
+        dE.  The base class computes Js numerically, see numerical_jacobian.
+
+        """
+        return self.numerical_jacobian(simdat, matdat, V)
+
+    def tangent(self, simdat, matdat, V):
+        """Return the submatrix Js = J[V, V] of the consistent tangent J = dsig
+        / dE computed by the last call to update_state.
+
+        Parameters
+        ----------
+        simdat : object
+          simulation data container
+        matdat : object
+          material data container
+        V : array_like
+          vector subscript array
+
+        Returns
+        -------
+        Js : array_like or None
+          Js[i, j] = dsig[V[i]] / dE[V[j]], or None if the model did not
+          provide a tangent
+
+        Notes
+        -----
+        Models that get the consistent tangent from the same call that
+        updates the stress should store the full 6x6 tangent in
+        self._tangent from update_state, or set it to None for states for
+        which no tangent is available.  Models that must compute it should
+        instead store the arguments of their consistent_tangent method in
+        self._tangent_args, so that it is only computed when asked for here.
+        When None is returned, callers fall back to the numerically computed
+        Jacobian.
+
+        """
+        if self._tangent_args is not None:
+            self._tangent = self.consistent_tangent(*self._tangent_args)
+            self._tangent_args = None
+        if self._tangent is None:
+            return None
+        return self._tangent[[[x] for x in V], V]
+
+    def consistent_tangent(self, *args):
+        """Return the 6x6 consistent tangent, or None, from the arguments
+        stored in self._tangent_args by the last call to update_state
+
+        """
+        return None
+
+    def numerical_jacobian(self, simdat, matdat, V):
         """Numerically compute and return a specified submatrix, Js, of the
         Jacobian matrix J = J_ij = dsigi / dE.
 
@@ -541,30 +672,36 @@ class ConstitutiveModelPrototype(object):
         # local variables
         nV = len(V)
         dE, Js = math.sqrt(np.finfo(np.float).eps), np.zeros((nV, nV))
+        if ro.INSTRUMENT:
+            pi.count("jacobian evaluations")
+            pi.count("update_state calls", 2 * nV)
         dt = simdat.get("time step")
         dt = 1 if dt == 0. else dt
-        D = matdat.get("rate of deformation", copy=True)
-        F0 = matdat.get("deformation gradient", copy=True)
+        h_D = matdat.handle("rate of deformation")
+        h_F = matdat.handle("deformation gradient")
+        h_P = matdat.handle("stress")
+        D = h_D.get().copy()
+        F0 = h_F.get().copy()
 
         for i in range(nV):
             # perturb forward
             Dp = np.array(D)
             Dp[V[i]] = D[V[i]] + (dE / dt) / 2.
             Fp = F0 + pt.dot(Dp, F0) * dt
-            matdat.store("rate of deformation", Dp)
-            matdat.store("deformation gradient", Fp)
+            h_D.store(Dp)
+            h_F.store(Fp)
             self.update_state(simdat, matdat)
-            Pp = matdat.get("stress", copy=True)
+            Pp = h_P.get().copy()
             matdat.restore()
 
             # perturb backward
             Dm = np.array(D)
             Dm[V[i]] = D[V[i]] - (dE / dt) / 2.
             Fm = F0 + pt.dot(Dm, F0) * dt
-            matdat.store("rate of deformation", Dm)
-            matdat.store("deformation gradient", Fm)
+            h_D.store(Dm)
+            h_F.store(Fm)
             self.update_state(simdat, matdat)
-            Pm = matdat.get("stress", copy=True)
+            Pm = h_P.get().copy()
             matdat.restore()
 
             # compute component of jacobian
@@ -32,6 +32,10 @@ import sys
 import math
 import re
 import numpy as np
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 import datetime
 import shutil
 from textwrap import fill as textfill
@@ -44,9 +48,14 @@ import Source.Payette_extract as pe
 import Source.Payette_boundary as pb
 import Source.Payette_input_parser as pip
 import Source.Payette_unit_manager as um
+import Source.Payette_binary_output as pbo
+import Source.Payette_instrument as pi
 from Source.Payette_material import Material
 from Source.Payette_data_container import DataContainer
 
+# version of the restart file format written by Payette.write_restart
+RESTART_VERSION = 3
+
 
 class Payette(object):
     """Main container class for a Payette single element simulation,
@@ -55,19 +64,159 @@ class Payette(object):
 
     """
 
-    def __init__(self, ilines):
+    def __init__(self, ilines, restart=None, in_memory=False):
+        """Set up the simulation
+
+        Parameters
+        ----------
+        ilines : str
+            user input
+        restart : dict, optional
+            checkpoint, read by load_restart, to continue the simulation
+            from.  ilines must be the checkpoint's input.
+        in_memory : bool, optional
+            if True, hold the output in memory and write no output, log, or
+            other simulation files.  Set by Payette_optimize for the trials
+            of optimization jobs run with self.in_memory.
+
+        """
+
+        self.in_memory = in_memory
 
         # instantiate the user input object
         self.ilines = ilines
         self.ui = pip.InputParser(ilines)
+        self._invariant_input = None
 
-        delete = not ro.KEEP
+        # set options given in the input and set up the output and log files
+        self._set_options()
+        self._setup_simulation_files(restart)
+
+        # step the simulation is restarted from, 0 if not restarted, and the
+        # state of the leg in progress at that step, see write_restart
+        self.is_restart = 0 if restart is None else restart["istep"]
+        self.restart_leg = None if restart is None else restart["leg state"]
+
+        # instantiate the material object
+        material = self.ui.find_block("material", co=True)
+        if material is None:
+            pu.report_and_raise_error(
+                "Material block not found for {0}".format(self.name))
+        self.material = Material(material)
+        self.matdat = self.material.material_data()
 
-        # check if user has specified simulation options directly in the input
-        # file
+        # get the boundary and legs blocks
+        boundary, legs = self.ui.find_nested_blocks("boundary", ("legs", ))
+        if boundary is None:
+            pu.report_and_raise_error(
+                "Boundary block not found for {0}".format(self.name))
+        if not self.material.eos_model and legs is None:
+            pu.report_and_raise_error(
+                "Legs block not found for {0}".format(self.name))
+
+        # solid and eos materials have different boundary classes
+        if not self.material.eos_model:
+            self.boundary = pb.Boundary(boundary, legs)
+        else:
+            self.boundary = pb.EOSBoundary(boundary, legs)
+
+        self.t0 = self.boundary.initial_time()
+        self.tf = self.boundary.termination_time()
+
+        # set up the simulation data container and register obligatory data
+        self._setup_simulation_data()
+
+        if ro.CHECK_SETUP:
+            exit("EXITING to check setup")
+
+        # --- optional information ------------------------------------------ #
+        # list of plot keys for all plotable data
+        output = self.ui.find_block("output", co=True)
+        self._output, oformat = pip.parse_output(output)
+        self.oformat = ro.OUTPUT_FORMAT or oformat
+        self._set_output_vars()
+
+        mathplot = self.ui.find_block("mathplot", [], co=True)
+        if mathplot:
+            mathplot = pip.parse_mathplot(mathplot)
+        self.mathplot_vars = mathplot
+
+        # get extraction
+        extraction, eopts = self.ui.find_block("extraction", [], co=True), {}
+        if extraction:
+            extraction, eopts = pip.parse_extraction(extraction)
+            extraction = [x for x in extraction
+                          if x[1:] in self.plot_keys or x[1] == "%"]
+        self.extraction_vars = extraction
+        self.eopts = eopts
+
+        # ensemble of material points
+        ensemble = self.ui.find_block("ensemble", co=True)
+        if ensemble is not None:
+            if self.material.eos_model:
+                pu.report_and_raise_error(
+                    "ensemble simulations require a solid material model")
+            ensemble = pip.parse_ensemble(ensemble)
+        self.ensemble = ensemble
+
+        # set up the data containers, material model, and files
+        self._setup_simulation(restart)
+
+        pass
+
+    def reset(self, ilines):
+        """Reset the simulation so that it can be run again with the user
+        input ilines.
+
+        The input may differ from the input the simulation was created with
+        only in its name and material block.  The parsed boundary, legs, and
+        output requests and the constitutive model class are reused, the
+        material is set up again with the new parameters, and the data,
+        output, and log files are set up as for a new simulation in the
+        current directory.
+
+        Parameters
+        ----------
+        ilines : str
+            user input
+
+        Returns
+        -------
+        reset : bool
+            True if the simulation was reset.  False if ilines differs from
+            the original input in more than its name and material block, in
+            which case the simulation is left unchanged.
+
+        """
+        ui = pip.InputParser(ilines)
+        if self._invariant_input is None:
+            self._invariant_input = _invariant_input(self.ui)
+        if _invariant_input(ui) != self._invariant_input:
+            return False
+
+        self.ilines, self.ui = ilines, ui
+        self._set_options()
+        self._setup_simulation_files()
+        self.is_restart, self.restart_leg = 0, None
+        self.material.reset(self.ui.find_block("material", co=True))
+        self.matdat = self.material.material_data()
+        self._setup_simulation_data()
+        self._set_output_vars()
+        self._setup_simulation()
+        return True
+
+    def _set_options(self):
+        """set the simulation options given in the user input"""
         for attr, val in self.ui.options().items():
             ro.set_global_option(attr, val)
             continue
+        return
+
+    def _setup_simulation_files(self, restart=None):
+        """set up the simulation directory and the output and log files, or
+        continue those of the simulation checkpointed in restart"""
+
+        delete = not ro.KEEP
 
         # directory to run simulation
         self.simdir = os.getcwd()
@@ -78,7 +227,7 @@ class Payette(object):
             else:
                 self.simdir = os.path.join(self.simdir, ro.SIMDIR)
 
-        if not os.path.isdir(self.simdir):
+        if not self.in_memory and not os.path.isdir(self.simdir):
             try:
                 os.makedirs(self.simdir)
             except OSError:
@@ -92,11 +241,32 @@ class Payette(object):
         # default variables
         self.dtable_fobj = None
         self.outfile_obj = None
+        self.binfile_obj = None
         self.vtable_fobj = None
+        self.ensemble_fobj = None
+        self._out_nrows = 0
+        self._out_data = []
+
+        if self.in_memory:
+            # nothing is written, the output is held in memory
+            self.outfile, self.logfile = None, None
+            pu.setup_logger(None)
+            pu.log_message("setting up simulation {0}".format(self.name))
+            return
+
+        if restart is not None:
+            self.simdir = restart["simdir"]
+            self.outfile = restart["output file"]
+            self.logfile = "{0}.log".format(os.path.splitext(self.outfile)[0])
+            pu.setup_logger(self.logfile, mode="a")
+            pu.log_message("setting up simulation {0}".format(self.name))
+            return
 
         tmpnam = os.path.join(self.simdir, self.name + ".out")
         if delete and os.path.isfile(tmpnam):
             os.remove(tmpnam)
+            if pbo.find_binary_file(tmpnam):
+                os.remove(pbo.binary_file_name(tmpnam))
 
         elif os.path.isfile(tmpnam):
             i = 0
@@ -144,38 +314,12 @@ class Payette(object):
         # write input to log file
         pu.write_to_simlog(FMT.format("USER INPUT", ""))
         pu.write_to_simlog(self.ui.formatted_input(ii="  "))
+        return
 
-        # file name for the Payette restart file
-        self.is_restart = 0
-
-        # instantiate the material object
-        material = self.ui.find_block("material", co=True)
-        if material is None:
-            pu.report_and_raise_error(
-                "Material block not found for {0}".format(self.name))
-        self.material = Material(material)
-        self.matdat = self.material.material_data()
-
-        # get the boundary and legs blocks
-        boundary, legs = self.ui.find_nested_blocks("boundary", ("legs", ))
-        if boundary is None:
-            pu.report_and_raise_error(
-                "Boundary block not found for {0}".format(self.name))
-        if not self.material.eos_model and legs is None:
-            pu.report_and_raise_error(
-                "Legs block not found for {0}".format(self.name))
-
-        # solid and eos materials have different boundary classes
-        if not self.material.eos_model:
-            self.boundary = pb.Boundary(boundary, legs)
-        else:
-            self.boundary = pb.EOSBoundary(boundary, legs)
-
-        self.t0 = self.boundary.initial_time()
-        self.tf = self.boundary.termination_time()
+    def _setup_simulation_data(self):
+        """register the simulation data"""
         ro.set_number_of_steps(N=self.boundary.nsteps(), I=0)
 
-        # set up the simulation data container and register obligatory data
         self.simdat = DataContainer(self.name)
         self.simdat.register("istep", "Scalar", iv=0, attr=True,
                              units="NO_UNITS")
@@ -191,17 +335,6 @@ class Payette(object):
                              plot_key="PRHO", units="DENSITY_UNITS")
         self.simdat.register("volume fraction", "Scalar", iv=1.,
                              plot_key="VFRAC", units="NO_UNITS")
-
-        if ro.CHECK_SETUP:
-            exit("EXITING to check setup")
-
-        if ro.WRITERESTART:
-            self.restart_file = os.path.splitext(self.outfile)[0] + ".prf"
-
-        # write out properties
-        if not ro.NOWRITEPROPS:
-            self._write_mtl_params()
-        self.write_input = ro.WRITE_INPUT or self.simdir != os.getcwd()
         self.simdat.register("nprints", "Scalar",
                              self.boundary.nprints(), constant=True,
                              units="NO_UNITS")
@@ -215,47 +348,59 @@ class Payette(object):
             self.simdat.register(
                 "screenout", "Scalar", self.boundary.screenout(),
                 constant=True, units="NO_UNITS")
+        return
 
-        # --- optional information ------------------------------------------ #
-        # list of plot keys for all plotable data
-        output = self.ui.find_block("output", co=True)
-        output, oformat = pip.parse_output(output)
+    def _set_output_vars(self):
+        """set the plot keys of the data written to the output file"""
         self.plot_keys = [x for x in self.simdat.plot_keys()]
         self.plot_keys.extend(self.matdat.plot_keys())
         self.plot_keys = [x.upper() for x in self.plot_keys]
-        if "ALL" in output:
+        if "ALL" in self._output:
             self.out_vars = [x for x in self.plot_keys]
         else:
-            self.out_vars = [x for x in output if x.upper() in self.plot_keys]
+            self.out_vars = [x for x in self._output
+                             if x.upper() in self.plot_keys]
+        return
 
-        mathplot = self.ui.find_block("mathplot", [], co=True)
-        if mathplot:
-            mathplot = pip.parse_mathplot(mathplot)
-        self.mathplot_vars = mathplot
+    def _setup_simulation(self, restart=None):
+        """set up the data containers, initialize the material model, and set
+        up the output files.  If restart is given, the data are set to the
+        checkpointed state instead and the output files are continued."""
 
-        # get extraction
-        extraction, eopts = self.ui.find_block("extraction", [], co=True), {}
-        if extraction:
-            extraction, eopts = pip.parse_extraction(extraction)
-            extraction = [x for x in extraction
-                          if x[1:] in self.plot_keys or x[1] == "%"]
-        self.extraction_vars = extraction
-        self.eopts = eopts
+        if self.in_memory:
+            if ro.WRITERESTART or ro.RESTART_TIME or ro.TESTRESTART:
+                pu.log_warning(
+                    "restart files are not written for in memory simulations")
+                ro.set_global_option("WRITERESTART", False)
+                ro.set_global_option("RESTART_TIME", 0.)
+                ro.set_global_option("TESTRESTART", False)
+
+        elif ro.WRITERESTART:
+            self.restart_file = os.path.splitext(self.outfile)[0] + ".prf"
+
+        # write out properties
+        if not ro.NOWRITEPROPS and not self.in_memory and restart is None:
+            self._write_mtl_params()
+        self.write_input = not self.in_memory and restart is None and (
+            ro.WRITE_INPUT or self.simdir != os.getcwd())
 
         # set up the data containers and initialize material models
         self.simdat.setup_data_container()
         self.matdat.setup_data_container()
-        self.material.constitutive_model.initialize_state(
-            self.simdat, self.matdat, self.boundary.legs()[0],
-            self.boundary.initial_stress())
+        if restart is not None:
+            self._restore_state(restart)
+        elif not self.material.eos_model:
+            # eos models are evaluated at the states given by the boundary
+            self.material.constitutive_model.initialize_state(
+                self.simdat, self.matdat, self.boundary.legs()[0],
+                self.boundary.initial_stress())
 
         self._setup_files()
 
         if self.write_input:
             fpath = os.path.join(self.simdir, self.name + ".inp")
             self.ui.write_input_file(fpath)
-
-        pass
+        return
 
     # private methods
     def _write_extraction(self):
@@ -328,6 +473,8 @@ class Payette(object):
 
     def _close_open_files(self):
         """close files opened by Payette"""
+        if self.outfile_obj is not None and not self.outfile_obj.closed:
+            self.flush_state()
         for fnam, fobj in self._open_files.items():
             fobj.flush()
             fobj.close()
@@ -347,6 +494,8 @@ class Payette(object):
 
     def _setup_out_file(self, file_name):
         """set up the ouput files"""
+        # rows still buffered belong to the previous output file
+        self.flush_state()
         if self._open_files.get(file_name) is not None:
             self._open_files[file_name].close()
             del self._open_files[file_name]
@@ -368,14 +517,74 @@ class Payette(object):
             self.outfile_obj.write("\n")
             self.outfile_obj.flush()
         self._open_files[file_name] = self.outfile_obj
+
+        # binary output is written alongside the text output
+        self.binfile_obj = None
+        if self.oformat == "binary":
+            try:
+                self.binfile_obj = pbo.BinaryOutputFile(
+                    file_name, self.out_vars, append=bool(self.is_restart))
+            except (IOError, ValueError) as error:
+                pu.report_and_raise_error(
+                    "Unable to set up binary output file: {0}".format(error))
+            self._open_files[self.binfile_obj.name] = self.binfile_obj
+        elif not self.is_restart and pbo.find_binary_file(file_name):
+            os.remove(pbo.binary_file_name(file_name))
+
+        self._setup_out_buffer()
+        return
+
+    def _setup_out_buffer(self):
+        """set up the buffer that holds rows of output until written.
+
+        The data container and data column of each output variable are
+        looked up once here so that write_state only gathers the current
+        row of each container.
+
+        """
+        sim_keys = self.simdat.plot_keys()
+        owners = [self.simdat if x in sim_keys else self.matdat
+                  for x in self.out_vars]
+        self._out_map = []
+        for dat in (self.simdat, self.matdat):
+            pos = [i for i, x in enumerate(owners) if x is dat]
+            cols = dat.plot_key_columns([self.out_vars[i] for i in pos])
+            self._out_map.append((dat, np.array(pos, dtype=int), cols))
+            continue
+        self._out_units = [dat.get(x, "units")
+                           for dat, x in zip(owners, self.out_vars)]
+        self._out_plans = {}
+
+        # each value is formatted as pu.textformat would format it
+        self._out_fmt = "{:<20.10E}" * len(self.out_vars) + "\n"
+        nrows = max(int(ro.OUTPUT_CHUNK), 1)
+        self._out_block = np.empty((nrows, len(self.out_vars)))
+        self._out_nrows = 0
         return
 
     def _setup_files(self):
         """set up files"""
+        if self.in_memory:
+            # output rows are held in memory by flush_state
+            self._setup_out_buffer()
+            return
+
         self._setup_out_file(self.outfile)
 
         self._write_avail_dat_to_log()
 
+        if self.ensemble is not None:
+            ename = os.path.splitext(self.outfile)[0] + ".ensemble"
+            if self.is_restart:
+                self.ensemble_fobj = open(ename, "a")
+            else:
+                self.ensemble_fobj = open(ename, "w")
+                self.ensemble_fobj.write(pu.textformat("POINT"))
+                for key in self.out_vars:
+                    self.ensemble_fobj.write(pu.textformat(key))
+                self.ensemble_fobj.write("\n")
+            self._open_files[ename] = self.ensemble_fobj
+
         if ro.WRITE_VANDD_TABLE:
             # set up files
             vname = os.path.splitext(self.outfile)[0] + ".vtable"
@@ -438,41 +647,234 @@ class Payette(object):
 
         return
 
-    def write_state(self, iu=None, ou=None):
+    def state_row(self):
+        """ return the simulation and material data that write_state would
+        write to the output file """
+        row = np.empty(self._out_block.shape[1])
+        for dat, pos, cols in self._out_map:
+            row[pos] = dat.get("all")[cols]
+            continue
+        return row
+
+    def write_state(self, iu=None, ou=None, row=None):
         """ write the simulation and material data to the output file. If
         iu and ou are given and valid, convert
+        from the input system to the output system first. If row is given,
+        it is written in place of the current data, see state_row.
+
+        Rows are collected in the output buffer and written to the output
+        file by flush_state once ro.OUTPUT_CHUNK rows have accumulated.
+        """
+        if row is not None:
+            self._out_block[self._out_nrows] = row
+            row = self._out_block[self._out_nrows]
+        else:
+            row = self._out_block[self._out_nrows]
+            for dat, pos, cols in self._out_map:
+                row[pos] = dat.get("all")[cols]
+                continue
+
+        if all(x is not None for x in (iu, ou,)):
+            row *= self._conversion_plan(iu, ou)
+
+        self._out_nrows += 1
+        if self._out_nrows == self._out_block.shape[0]:
+            self.flush_state()
+        return
+
+    def write_state_block(self, mdata, iu=None, ou=None):
+        """ write a row to the output file for each row of mdata, with the
+        current simulation data. If iu and ou are given and valid, convert
         from the input system to the output system first.
+
+        Parameters
+        ----------
+        mdata : array_like
+            m x n array of the material data of m states, each row laid out
+            as the rows of the material data container, see
+            EnsembleData.get("all")
+
         """
-        UNITCONVERT = False
+        mdata = np.atleast_2d(mdata)
+        block = np.empty((mdata.shape[0], len(self.out_vars)))
+        for dat, pos, cols in self._out_map:
+            if dat is self.simdat:
+                block[:, pos] = dat.get("all")[cols]
+            else:
+                block[:, pos] = mdata[:, cols]
+            continue
+
         if all(x is not None for x in (iu, ou,)):
-            UNITCONVERT = True
-        for out_var in self.out_vars:
-            if out_var in self.simdat.plot_keys():
-                dat = self.simdat
+            block *= self._conversion_plan(iu, ou)
+
+        # rows buffered by write_state come first
+        self.flush_state()
+        self._write_block(block)
+        return
+
+    def _conversion_plan(self, iu, ou):
+        """ return the factors converting a row of output from the unit
+        system iu to ou, see UnitManager.conversion_plan """
+        plan = self._out_plans.get((iu, ou))
+        if plan is None:
+            plan = um.UnitManager.conversion_plan(self._out_units, iu, ou)
+            self._out_plans[(iu, ou)] = plan
+        return plan
+
+    def flush_state(self):
+        """ write the rows held in the output buffer to the output file with
+        a single format call and empty the buffer """
+        nrows = self._out_nrows
+        if not nrows:
+            return
+        self._write_block(self._out_block[:nrows])
+        self._out_nrows = 0
+        return
+
+    def _write_block(self, block):
+        """ write the rows of block to the output file, ro.OUTPUT_CHUNK rows
+        per format call """
+        if self.outfile_obj is None:
+            # in memory simulation
+            self._out_data.append(np.array(block))
+            return
+        chunk = self._out_block.shape[0]
+        for start in range(0, block.shape[0], chunk):
+            rows = block[start:start + chunk]
+            nrows = rows.shape[0]
+            text = (self._out_fmt * nrows).format(*rows.ravel().tolist())
+            self.outfile_obj.write(text)
+            if self.binfile_obj is not None:
+                # the binary file holds the values as written to the text file
+                self.binfile_obj.write_text(text)
+            continue
+        return
+
+    def write_ensemble_state(self, edat, rho):
+        """ write the simulation data and the material data of every point of
+        the ensemble edat to the ensemble output file, one row per point.
+        rho holds the density of each point.
+        """
+        if self.ensemble_fobj is None:
+            return
+        npts = edat.npts
+        block = np.empty((npts, len(self.out_vars) + 1))
+        block[:, 0] = np.arange(npts)
+        for icol, out_var in enumerate(self.out_vars):
+            if out_var == "PRHO":
+                block[:, icol + 1] = rho
+            elif out_var in self.simdat.plot_keys():
+                block[:, icol + 1] = self.simdat.get(out_var)
             else:
-                dat = self.matdat
-            val = dat.get(out_var)
-
-            if UNITCONVERT:
-                units = dat.get(out_var, "units")
-                umgr = um.UnitManager(val, iu, units)
-                umgr.convert(ou)
-                val = umgr.get()
-            self.outfile_obj.write(pu.textformat(val))
+                block[:, icol + 1] = edat.get(out_var)
             continue
-        self.outfile_obj.write('\n')
+        for row in block:
+            self.ensemble_fobj.write(
+                "".join(pu.textformat(x) for x in row) + "\n")
         return
 
-    def setup_restart(self):
-        """set up the restart files"""
-        nsteps, istep = self.simdat.NSTEPS, self.simdat.ISTEP
-        if self.is_restart:
-            pu.report_and_raise_error("Restart file already run")
-        self.is_restart = istep
-        ro.set_number_of_steps(N=nsteps, I=istep)
-        pu.setup_logger(self.logfile, mode="a")
-        pu.log_message("setting up simulation {0}".format(self.name))
-        self._setup_files()
+    def write_restart(self, fpath, leg_state=None):
+        """Write a checkpoint of the simulation to fpath
+
+        The checkpoint holds the current row of the simulation and material
+        data, the leg and step numbers, the time stepping options, the
+        output format, and the material parameters.  The output already
+        written is not copied.  Instead, the checkpoint records the size of
+        each output file, so that a restart can continue the files from that
+        point.  The file is written to a
+        temporary file that is moved in to place, so that an existing
+        checkpoint is replaced only by a complete one.
+
+        Parameters
+        ----------
+        fpath : str
+            path to the restart file
+        leg_state : dict, optional
+            state the driver needs to continue the leg in progress, if the
+            checkpoint is not written at the end of a leg: the leg's starting
+            time and values, and the step number and fraction of the leg
+            completed
+
+        """
+        self.flush_state()
+        files = {}
+        for fnam, fobj in self._open_files.items():
+            fobj.flush()
+            files[fnam] = os.path.getsize(fnam)
+            continue
+        restart = {"version": RESTART_VERSION,
+                   "name": self.name,
+                   "input": self.ilines,
+                   "simdir": self.simdir,
+                   "output file": self.outfile,
+                   "files": files,
+                   "nsteps": self.simdat.NSTEPS,
+                   "istep": ro.ISTEP,
+                   "leg": int(self.simdat.get("leg number")),
+                   "leg state": leg_state,
+                   "adaptive": bool(ro.ADAPTIVE),
+                   "adaptive tol": ro.ADAPTIVE_TOL,
+                   "output format": self.oformat,
+                   "simdat": self.simdat.get("all"),
+                   "matdat": self.matdat.get("all"),
+                   "parameters": np.array(
+                       self.material.constitutive_model.ui)}
+        tmp = "{0}.{1}".format(fpath, os.getpid())
+        try:
+            with open(tmp, "wb") as fobj:
+                pickle.dump(restart, fobj, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp, fpath)
+        except (IOError, OSError) as error:
+            if os.path.isfile(tmp):
+                os.remove(tmp)
+            pu.report_and_raise_error(
+                "unable to write restart file {0}: {1}".format(fpath, error))
+        return
+
+    def _restore_state(self, restart):
+        """Set the data to the state checkpointed in restart and truncate the
+        output files to their size when it was written"""
+        cmod = self.material.constitutive_model
+        if (restart["nsteps"] != self.simdat.NSTEPS or
+            len(restart["simdat"]) != len(self.simdat.get("all")) or
+            len(restart["matdat"]) != len(self.matdat.get("all")) or
+            len(restart["parameters"]) != len(cmod.ui)):
+            pu.report_and_raise_error(
+                "restart file for {0} does not match its input"
+                .format(self.name))
+
+        # the leg in progress is continued with the time stepping it was run
+        # with, the step numbers of adaptive and uniform steps differ
+        for opt, key in (("ADAPTIVE", "adaptive"),
+                         ("ADAPTIVE_TOL", "adaptive tol")):
+            if getattr(ro, opt) != restart[key]:
+                pu.log_message("Setting {0} = {1} from restart file"
+                               .format(opt, restart[key]))
+                ro.set_global_option(opt, restart[key])
+            continue
+
+        # the output files are continued in the formats they were written in
+        if self.oformat != restart["output format"]:
+            pu.log_message("Setting output format = {0} from restart file"
+                           .format(restart["output format"]))
+            self.oformat = restart["output format"]
+
+        istep = restart["istep"]
+        ro.ISTEP = istep
+        self.simdat.store("all", restart["simdat"])
+        self.matdat.store("all", restart["matdat"])
+        self.simdat.store("istep", istep)
+        cmod.ui = np.array(restart["parameters"])
+
+        for fnam, size in restart["files"].items():
+            try:
+                with open(fnam, "r+b") as fobj:
+                    fobj.truncate(size)
+            except IOError:
+                pu.report_and_raise_error(
+                    "Original output file {0} not found during "
+                    "setup of restart".format(fnam))
+            continue
         return
 
     def write_vel_and_disp(self, tbeg, tend, epsbeg, epsend):
@@ -497,7 +899,7 @@ class Payette(object):
           driver
 
         """
-        if not ro.WRITE_VANDD_TABLE:
+        if not ro.WRITE_VANDD_TABLE or self.vtable_fobj is None:
             return
 
         delt = tend - tbeg
@@ -561,7 +963,10 @@ class Payette(object):
         """run the job"""
 
         # solid and eos materials have different drivers
-        if not self.material.eos_model:
+        if self.ensemble is not None:
+            driver = pd.ensemble_driver
+
+        elif not self.material.eos_model:
             driver = pd.solid_driver
 
         else:
@@ -571,16 +976,24 @@ class Payette(object):
         extra_files = {}
         retcode = driver(
             self, restart=self.is_restart, extra_files=extra_files)
+        self.flush_state()
 
         if retcode == 0:
             pu.log_message("Payette simulation {0} ran to completion"
                            .format(self.name))
 
-        return {"retcode": retcode,
-                "output file": self.outfile,
-                "extra files": extra_files,
-                "simulation name": self.name,
-                "simulation directory": self.simdir}
+        if self.ensemble_fobj is not None:
+            extra_files["ensemble file"] = self.ensemble_fobj.name
+
+        siminfo = {"retcode": retcode,
+                   "output file": self.outfile,
+                   "extra files": extra_files,
+                   "simulation name": self.name,
+                   "simulation directory": self.simdir}
+        if ro.INSTRUMENT:
+            # counters and timers of the run's hot paths
+            siminfo["stats"] = pi.stats()
+        return siminfo
 
     def finish(self, wipe=False, wipeall=False):
         """finish up"""
@@ -594,11 +1007,11 @@ class Payette(object):
         self._close_open_files()
 
         # write the mathematica files
-        if self.mathplot_vars:
+        if self.mathplot_vars and self.outfile is not None:
             self._write_mathplot()
 
         # extract requested variables
-        if self.extraction_vars:
+        if self.extraction_vars and self.outfile is not None:
             self._write_extraction()
 
         if wipe or wipeall:
@@ -610,16 +1023,75 @@ class Payette(object):
                     pass
                 continue
         if wipeall:
-            try:
-                os.remove(self.name + ".out")
-            except OSError:
-                pass
+            for ext in (".out", ".out" + pbo.EXT, ".ensemble"):
+                try:
+                    os.remove(self.name + ext)
+                except OSError:
+                    pass
+                continue
 
         # remove data containers
         self.matdat.clear()
         self.simdat.clear()
         return
 
+    def output(self):
+        """Return the output of the simulation
+
+        Returns
+        -------
+        head : list
+            plot keys of the output variables
+        data : ndarray
+            m x n array of the m rows of output of the n output variables
+
+        Notes
+        -----
+        The output of simulations run in memory (in_memory) is held in
+        memory, the output of other simulations is read from the output file.
+
+        """
+        self.flush_state()
+        if self.outfile is None:
+            if not self._out_data:
+                return list(self.out_vars), np.empty((0, len(self.out_vars)))
+            return list(self.out_vars), np.vstack(self._out_data)
+        if self.outfile_obj is not None and not self.outfile_obj.closed:
+            self.outfile_obj.flush()
+            if self.binfile_obj is not None:
+                self.binfile_obj.flush()
+        return pu.get_header(self.outfile), pu.read_data(self.outfile)
+
     def simulation_data(self):
         """return the simulation simdat object"""
         return self.simdat
+
+
+def load_restart(fpath):
+    """Load the checkpoint written by Payette.write_restart to fpath
+
+    Returns
+    -------
+    restart : dict
+        the checkpoint, passed to Payette to continue the simulation
+
+    """
+    try:
+        with open(fpath, "rb") as fobj:
+            restart = pickle.load(fobj)
+    except Exception:
+        restart = None
+    if not isinstance(restart, dict) or "version" not in restart:
+        pu.report_and_raise_error(
+            "{0} is not a Payette restart file".format(fpath))
+    if restart["version"] != RESTART_VERSION:
+        pu.report_and_raise_error(
+            "restart file {0} was written by an incompatible version of "
+            "Payette".format(fpath))
+    return restart
+
+
+def _invariant_input(ui):
+    """Return the user input of ui without its name and material block"""
+    lines = ui.user_input(pop=("material", ))
+    return re.sub(r"(?i)\bname\s.*", "", lines)
@@ -31,7 +31,6 @@ import re
 import imp
 import math
 import numpy as np
-import scipy.linalg
 import time
 from copy import deepcopy
 
@@ -43,6 +42,10 @@ import Source.Payette_unit_manager as um
 
 BOOL_MAP = {True: 1, False: 0}
 
+# number of rows held by data containers in "ring" history mode.  The drivers
+# only access rows ISTEP - 1, ISTEP, and ISTEP + 1
+RING_LENGTH = 4
+
 
 class DataContainer:
     """
@@ -75,6 +78,10 @@ class DataContainer:
         self._data = []
         self._ival = []
         self._names = []
+        self._ring = False
+        self._snapshot = 0
+        self._snapshots = []
+        self._handles = {}
 
         pass
 
@@ -91,6 +98,10 @@ class DataContainer:
         self._data = []
         self._ival = []
         self._names = []
+        self._ring = False
+        self._snapshot = 0
+        self._snapshots = []
+        self._handles = {}
 
     # ------------------------------------------ P U B L I C  M E T H O D S ---
 
@@ -297,10 +308,20 @@ class DataContainer:
         The data container is a MxN numpy ndarray that where M is the total
         number of simulatin steps and N is the number of registered variables.
 
+        If ro.HISTORY is "ring", M is instead RING_LENGTH and step n is held
+        in row n % RING_LENGTH, so that only the most recent steps are kept.
+        If ro.SNAPSHOT_INTERVAL > 0, a copy of every ro.SNAPSHOT_INTERVAL'th
+        step is also kept and returned by dump.
+
         """
         self._setup = True
+        self._ring = ro.HISTORY == "ring"
+        self._snapshot = int(ro.SNAPSHOT_INTERVAL) if self._ring else 0
+        self._snapshot_step = -1
+        self._snapshots = []
         ldata = len(self._ival)
-        self._data = np.empty((ro.NSTEPS + 1, ldata), dtype=float)
+        nrows = RING_LENGTH if self._ring else ro.NSTEPS + 1
+        self._data = np.empty((nrows, ldata), dtype=float)
         self._data[0, :] = [x for x in self._ival]
 
         # initialize constant data
@@ -328,6 +349,11 @@ class DataContainer:
            the value
 
         """
+        if name == "all":
+            N = ro.ISTEP if not len(args) else args[0]
+            self._data[self._row(N), :] = v
+            return
+
         inc, N = False, ro.ISTEP
         if "+=" in args:
             inc = True
@@ -379,6 +405,7 @@ class DataContainer:
         else:
             r, c = 1, 1
 
+        N = self._row(N)
         if inc:
             v = self._data[N, start:end] + v
 
@@ -416,15 +443,54 @@ class DataContainer:
         if N == -1:
             # restoring on first step, restore from self._ival
             self._data[0, start:end] = np.array(self._ival)[start:end]
-        else:
-            self._data[N + 1, start:end] = self._data[N, start:end]
+            return
+
+        if (self._snapshot and name is None and "-" not in args and
+                not N % self._snapshot and N > self._snapshot_step):
+            # step N is complete, keep a copy of it
+            self._snapshots.append(self._get_all(N))
+            self._snapshot_step = N
+
+        self._data[self._row(N + 1), start:end] = \
+            self._data[self._row(N), start:end]
         return
 
     def plot_keys(self):
         """ return a list of plot keys in the order registered """
         return sorted(self._plotable_data, key=lambda x: self._plotable_data[x])
 
+    def plot_key_columns(self, keys):
+        """Return the data columns of the plot keys in keys
+
+        Parameters
+        ----------
+        keys : list
+           plot keys
+
+        Returns
+        -------
+        cols : ndarray
+           cols[i] is the column of keys[i] in each row of the data
+
+        """
+        cols = []
+        for key in keys:
+            if key not in self._plotable_data:
+                pu.report_and_raise_error(
+                    "{0} not found in plot keys".format(key))
+            cols.append(self._plotable_data[key])
+            continue
+        return np.array(cols, dtype=int)
+
     def dump(self, N=None):
+        """Return the data for the first N steps, or, in ring history mode,
+        the snapshots taken so far
+
+        """
+        if self._ring:
+            if not self._snapshots:
+                return np.empty((0, len(self._ival)))
+            return np.array(self._snapshots[:N])
         if N is None:
             N = ro.NSTEPS
         return np.array(self._data[:N, :])
@@ -445,6 +511,36 @@ class DataContainer:
     def nxtra(self):
         return self._nxtra
 
+    def handle(self, name):
+        """Return a DataHandle for the data name
+
+        The columns of name are looked up once, when the handle is first
+        requested, and the handle is reused by all later requests for name.
+        Use handles in place of get and store for data accessed every step.
+
+        Parameters
+        ----------
+        name : str
+           name of variable, its plot key, or "__xtra__"
+
+        Returns
+        -------
+        handle : DataHandle
+
+        """
+        handle = self._handles.get(name)
+        if handle is None:
+            handle = DataHandle(self, name)
+            self._handles[name] = handle
+        return handle
+
+    def ensemble(self, npts):
+        """Return an EnsembleData object holding npts copies of the current
+        state of this container"""
+        if not self._setup:
+            pu.report_and_raise_error("cannot create ensemble until setup")
+        return EnsembleData(self, npts)
+
     # ---------------------------------------- P R I V A T E  M E T H O D S ---
 
     def _initial_value(self, dtype, iv):
@@ -611,6 +707,7 @@ class DataContainer:
                 form = "matrix"
 
         # check for scalar values
+        N = self._row(N)
         if end - start == 1:
             return float(self._data[N, start])
         val = self._data[N, start:end]
@@ -633,6 +730,34 @@ class DataContainer:
             return np.array(val)
         return val
 
+    def _columns(self, name, store=False):
+        """Return the start and end columns of the data name
+
+        Parameters
+        ----------
+        name : str
+           name of variable, or its plot key
+        store : bool, optional
+           if True, the data is checked that it is not constant
+
+        Returns
+        -------
+        start, end : int
+
+        """
+        if _is_xtra(name):
+            return self._xtra_start, self._xtra_end
+        if name in self._plotable_data:
+            start = self._plotable_data[name]
+            return start, start + 1
+        data = self._container.get(name)
+        if data is None:
+            pu.report_and_raise_error("{0} not found".format(name))
+        elif store and data["constant"]:
+            pu.report_and_raise_error(
+                "Attempting to update '{0}' which is constant".format(name))
+        return data["start"], data["end"]
+
     def _get_name(self, key):
         """Get the name from the plot key
 
@@ -702,7 +827,17 @@ class DataContainer:
         return data["plot key"][N]
 
     def _get_all(self, N):
-        return self._data[N, :].copy()
+        return self._data[self._row(N), :].copy()
+
+    def _row(self, N):
+        """Return the row of the data holding step N"""
+        if not self._ring:
+            return N
+        if not ro.ISTEP - RING_LENGTH + 2 <= N <= ro.ISTEP + 1:
+            pu.report_and_raise_error(
+                "step {0} of {1} is no longer held in ring history"
+                .format(N, self.name))
+        return N % RING_LENGTH
 
     def _get_name_from_plot_key(self, key):
         """get name from plot key"""
@@ -719,5 +854,181 @@ class DataContainer:
         return
 
 
+class DataHandle(object):
+    """
+    CLASS NAME
+       DataHandle
+
+    PURPOSE
+       Direct access to a single variable of a DataContainer.  The columns of
+       the variable are resolved when the handle is created so that get and
+       store reduce to indexing the container's data array.  Values are
+       returned as views of the container's data and stored in place.
+    """
+
+    def __init__(self, container, name):
+
+        self.name = name
+        self._container = container
+        data = container._container.get(name)
+        self._constant = data is not None and data.get("constant", False)
+        self._start, self._end = container._columns(name)
+        self._scalar = self._end - self._start == 1
+        pass
+
+    def get(self, *args):
+        """Get the value of the variable
+
+        Parameters
+        ----------
+        args : tuple
+           if args[0] == "-" ("+"), return the value at the previous (next)
+           step.  As with DataContainer.get, the value at the first step is
+           returned at the first step.
+
+        Returns
+        -------
+        val : float or array_like
+           the value, as a float for scalar data and otherwise as a view of
+           the container's data
+
+        """
+        N = ro.ISTEP
+        if args and N:
+            N += {"+": 1, "-": -1}[args[0]]
+        container = self._container
+        if self._scalar:
+            return float(container._data[container._row(N), self._start])
+        return container._data[container._row(N), self._start:self._end]
+
+    def store(self, v, *args):
+        """Store the value of the variable in place
+
+        Parameters
+        ----------
+        v : float or array_like
+           the value.  Arrays must be flat, matrix forms are not converted.
+        args : tuple
+           if args[0] == "-" ("+"), store the value at the previous (next)
+           step
+
+        """
+        if self._constant:
+            pu.report_and_raise_error(
+                "Attempting to update '{0}' which is constant"
+                .format(self.name))
+        N = ro.ISTEP
+        if args:
+            N += {"+": 1, "-": -1}[args[0]]
+        container = self._container
+        container._data[container._row(N), self._start:self._end] = v
+        return
+
+
+class EnsembleData(object):
+    """
+    CLASS NAME
+       EnsembleData
+
+    PURPOSE
+       Hold the current state of an ensemble of material points.  The data is
+       stored in an (npts x nvars) array whose rows are laid out exactly as the
+       rows of the DataContainer from which it was created, so that any data
+       registered with the parent container can be retrieved or stored for
+       all points at once.  Only the current and previous states are kept.
+    """
+
+    def __init__(self, container, npts):
+
+        self.name = container.name
+        self.npts = int(npts)
+        if self.npts < 1:
+            pu.report_and_raise_error("ensemble must have at least one point")
+        self._container = container
+        self._data = np.tile(container.get("all"), (self.npts, 1))
+        self._prev = np.array(self._data)
+        pass
+
+    def get(self, name, *args, **kwargs):
+        """Get the data for all points of the ensemble
+
+        Parameters
+        ----------
+        name : str
+           name of variable, its plot key, or "all"
+        args : tuple
+           if args[0] == "-", return the value at the previous step
+
+        kwargs : dict
+           kwargs["copy"] : bool
+               return a copy instead of reference
+           kwargs["point"] : int
+               return only the value for this point
+
+        Returns
+        -------
+        val : array_like
+           (npts, n) array of values, or (npts, ) array for scalar data.  If
+           point is given, the value for just that point is returned.
+
+        """
+        data = self._prev if "-" in args else self._data
+        if name == "all":
+            start, end = 0, data.shape[1]
+        else:
+            start, end = self._container._columns(name)
+
+        point = kwargs.get("point")
+        if point is not None:
+            val = data[point, start:end]
+        elif end - start == 1 and name != "all":
+            val = data[:, start]
+        else:
+            val = data[:, start:end]
+
+        if kwargs.get("copy", False):
+            return np.array(val)
+        return val
+
+    def store(self, name, v, **kwargs):
+        """Store the data for all points of the ensemble
+
+        Parameters
+        ----------
+        name : str
+           name of variable or "all"
+        v : array_like
+           (npts, n) array of values, or (npts, ) array for scalar data.  If
+           point is given, v is the value for just that point.
+        kwargs : dict
+           kwargs["point"] : int
+               store only the value for this point
+
+        """
+        if name == "all":
+            start, end = 0, self._data.shape[1]
+        else:
+            start, end = self._container._columns(name, store=True)
+
+        point = kwargs.get("point")
+        if point is not None:
+            self._data[point, start:end] = v
+        elif end - start == 1:
+            self._data[:, start] = v
+        else:
+            self._data[:, start:end] = v
+        return
+
+    def advance(self):
+        """advance the current state to the previous state"""
+        self._prev[:, :] = self._data
+        return
+
+    def restore(self):
+        """restore the current state from the previous state"""
+        self._data[:, :] = self._prev
+        return
+
+
 def _is_xtra(name):
     return name.strip().lower() == "__xtra__"
@@ -28,13 +28,12 @@
 import os
 import sys
 import math
+import time
+import multiprocessing as mp
 import numpy as np
-try:
-    import cPickle as pickle
-except ImportError:
-    import pickle
 
 import Source.Payette_iterative_solvers as citer
+import Source.Payette_instrument as pi
 import Source.Payette_kinematics as pk
 import Source.Payette_utils as pu
 import Source.Payette_tensor as pt
@@ -47,6 +46,10 @@ ACCLIM = .0001 / 100.
 EPSILON = np.finfo(np.float).eps
 TOL = 1.E-09
 
+# the eos model and data of the sweep being evaluated, inherited by the
+# processes a sweep is split across
+_EOS_SWEEP = {}
+
 
 def eos_driver(the_model, **kwargs):
     """
@@ -89,8 +92,6 @@ def eos_driver(the_model, **kwargs):
     simdat.ensure_valid_units()
     matdat.ensure_valid_units()
 
-    nprints = simdat.NPRINTS
-
     # get boundary data
     Rrange = the_model.boundary.density_range()
     Trange = the_model.boundary.temperature_range()
@@ -122,13 +123,11 @@ def eos_driver(the_model, **kwargs):
         out_fnam = os.path.join(simdir, simnam + ".out")
         the_model._setup_out_file(out_fnam)
 
-        for pair in RT_pairs:
-            eos_model.evaluate_eos(simdat, matdat, input_unit_system,
-                                   rho=pair[0], temp=pair[1])
-            matdat.advance()
-            simdat.advance()
-            the_model.write_state(iu=input_unit_system, ou=output_unit_system)
-            ro.ISTEP += 1
+        rho, temp = np.array(RT_pairs, dtype=np.float64).T
+        mdata = evaluate_eos_sweep(eos_model, simdat, matdat,
+                                   input_unit_system, rho, temp=temp)
+        the_model.write_state_block(
+            mdata, iu=input_unit_system, ou=output_unit_system)
         pu.log_message("Legs file: {0}".format(out_fnam))
 
     # ------------------------------------------------------------- SURFACE ---
@@ -143,22 +142,16 @@ def eos_driver(the_model, **kwargs):
 
         pu.log_message("=" * (80 - 6))
         pu.log_message("Begin surface")
-        DEJAVU = False
-        idx = 0
-        for rho in np.linspace(R0, Rf, Ns):
-            for temp in np.linspace(T0, Tf, Ns):
-                idx += 1
-                if idx % int(Ns ** 2 / float(nprints)) == 0:
-                    pu.log_message(
-                        "Surface step {0}/{1}".format(idx, Ns ** 2))
-
-                eos_model.evaluate_eos(simdat, matdat, input_unit_system,
-                                       rho=rho, temp=temp)
-                matdat.advance()
-                simdat.advance()
-                the_model.write_state(
-                    iu=input_unit_system, ou=output_unit_system)
-                ro.ISTEP += 1
+
+        # the whole grid is evaluated at once, temperature varying fastest
+        rho, temp = np.meshgrid(np.linspace(R0, Rf, Ns),
+                                np.linspace(T0, Tf, Ns), indexing="ij")
+        mdata = evaluate_eos_sweep(eos_model, simdat, matdat,
+                                   input_unit_system, rho.ravel(),
+                                   temp=temp.ravel())
+        pu.log_message("Surface step {0}/{0}".format(Ns ** 2))
+        the_model.write_state_block(
+            mdata, iu=input_unit_system, ou=output_unit_system)
 
         pu.log_message("End surface")
         pu.log_message("Surface file: {0}".format(out_fnam))
@@ -181,20 +174,14 @@ def eos_driver(the_model, **kwargs):
 
         pu.log_message("=" * (80 - 6))
         pu.log_message("Begin isotherm")
-        DEJAVU = False
-        idx = 0
-        for rho in np.linspace(R0I, Rf, Np):
-            idx += 1
-            if idx % int(Np / float(nprints)) == 0:
-                pu.log_message("Isotherm step {0}/{1}".format(idx, Np))
 
-            eos_model.evaluate_eos(simdat, matdat, input_unit_system,
-                                   rho=rho, temp=TfI)
-
-            matdat.advance()
-            simdat.advance()
-            the_model.write_state(iu=input_unit_system, ou=output_unit_system)
-            ro.ISTEP += 1
+        rho = np.linspace(R0I, Rf, Np)
+        mdata = evaluate_eos_sweep(eos_model, simdat, matdat,
+                                   input_unit_system, rho,
+                                   temp=np.repeat(TfI, Np))
+        pu.log_message("Isotherm step {0}/{0}".format(Np))
+        the_model.write_state_block(
+            mdata, iu=input_unit_system, ou=output_unit_system)
 
         pu.log_message("End isotherm")
         pu.log_message("Isotherm file: {0}".format(out_fnam))
@@ -235,62 +222,21 @@ def eos_driver(the_model, **kwargs):
         init_energy = matdat.get("energy")
         init_pressure = matdat.get("pressure")
 
-        idx = 0
-        DEJAVU = False
-        e = init_energy
-        for rho in np.linspace(RH, Rf, Np):
-            idx += 1
-            if idx % int(Np / float(nprints)) == 0:
-                pu.log_message("Hugoniot step {0}/{1}".format(idx, Np))
-
-            # Here we solve the Rankine-Hugoniot equation as
-            # a function of energy with constant density:
-            #
-            # E-E0 == 0.5*[P(E,V)+P0]*(V0-V)
-            #
-            # Where V0 = 1/rho0 and V = 1/rho. We rewrite it as:
-            #
-            # 0.5*[P(E,V)+P0]*(V0-V)-E+E0 == 0.0 = f(E)
-            #
-            # The derivative is given by:
-            #
-            # df(E)/dE = 0.5*(dP/dE)*(1/rho0 - 1/rho) - 1
-            #
-            # The solution to the first equation is found by a simple
-            # application of newton's method:
-            #
-            # x_n+1 = x_n - f(E)/(df(E)/dE)
-
-            r = rho
-            a = (1. / init_density - 1. / r) / 2.
-
-            converged_idx = 0
-            CONVERGED = False
-            while not CONVERGED:
-                converged_idx += 1
-                eos_model.evaluate_eos(simdat, matdat, input_unit_system,
-                                       rho=r, enrg=e)
-
-                f = (matdat.get(
-                    "pressure") + init_pressure) * a - e + init_energy
-                df = matdat.get("dpdt") / matdat.get("dedt") * a - 1.0
-                e = e - f / df
-                errval = abs(f / init_energy)
-                if errval < TOL:
-                    CONVERGED = True
-                    if converged_idx > 100:
-                        pu.log_message(
-                            "Max iterations reached (tol={0:14.10e}).\n".format(TOL) +
-                            "rel error   = {0:14.10e}\n".format(float(errval)) +
-                            "abs error   = {0:14.10e}\n".format(float(f)) +
-                            "func val    = {0:14.10e}\n".format(float(f)) +
-                            "init_energy = {0:14.10e}\n".format(float(init_energy)))
-                        break
-
-            matdat.advance()
-            simdat.advance()
-            the_model.write_state(iu=input_unit_system, ou=output_unit_system)
-            ro.ISTEP += 1
+        rho = np.linspace(RH, Rf, Np)
+        mdata, niter, converged, npass = solve_hugoniot(
+            eos_model, simdat, matdat, input_unit_system, rho,
+            init_density, init_energy, init_pressure)
+        pu.log_message(
+            "Hugoniot step {0}/{0}, {1} passes, iterations per point: "
+            "min {2}, mean {3:.2f}, max {4}".format(
+                Np, npass, niter.min(), niter.mean(), niter.max()))
+        if not converged.all():
+            pu.log_warning(
+                "Hugoniot did not converge at {0:d} of {1:d} points, "
+                "first at density {2:.6E}".format(
+                    Np - converged.sum(), Np, rho[~converged][0]))
+        the_model.write_state_block(
+            mdata, iu=input_unit_system, ou=output_unit_system)
 
         pu.log_message("End Hugoniot")
         pu.log_message("Hugoniot file: {0}".format(out_fnam))
@@ -299,6 +245,210 @@ def eos_driver(the_model, **kwargs):
     return 0
 
 
+def evaluate_eos_sweep(eos_model, simdat, matdat, unit_system, rho,
+                       temp=None, enrg=None):
+    """Evaluate the eos model at every (rho, temp) or (rho, enrg) state of a
+    sweep through evaluate_eos_ensemble
+
+    If ro.NPROC > 1 and the simulation is not itself running in a worker
+    process, the states are split in to ro.NPROC contiguous chunks that are
+    evaluated in separate processes.
+
+    Parameters
+    ----------
+    eos_model : object
+      the eos constitutive model
+    simdat, matdat : object
+      simulation and material data containers
+    unit_system : str
+      unit system of rho, temp, and enrg
+    rho : array_like
+      density of each state
+    temp, enrg : array_like
+      temperature or energy of each state
+
+    Returns
+    -------
+    mdata : ndarray
+      m x n array of the material data of the m states, each row laid out as
+      the rows of matdat
+
+    """
+    npts = len(rho)
+    nproc = min(ro.NPROC, npts)
+    if nproc > 1 and mp.current_process().daemon:
+        # daemonic pool workers cannot have children of their own
+        nproc = 1
+
+    if nproc <= 1:
+        edat = matdat.ensemble(npts)
+        eos_model.evaluate_eos_ensemble(simdat, edat, unit_system,
+                                        rho=rho, temp=temp, enrg=enrg)
+        return edat.get("all")
+
+    _EOS_SWEEP.update(eos_model=eos_model, simdat=simdat, matdat=matdat,
+                      unit_system=unit_system)
+    args = []
+    for idx in np.array_split(np.arange(npts), nproc):
+        args.append((rho[idx],
+                     None if temp is None else temp[idx],
+                     None if enrg is None else enrg[idx]))
+        continue
+    pool = mp.Pool(processes=nproc)
+    try:
+        blocks = pool.map(_evaluate_eos_chunk, args)
+    finally:
+        pool.close()
+        pool.join()
+        _EOS_SWEEP.clear()
+    return np.vstack(blocks)
+
+
+def solve_hugoniot(eos_model, simdat, matdat, unit_system, rho,
+                   init_density, init_energy, init_pressure,
+                   tol=TOL, maxiter=100):
+    """Solve the Rankine-Hugoniot energy equation at every density of rho
+
+    The Rankine-Hugoniot equation is solved as a function of energy at
+    constant density:
+
+        E-E0 == 0.5*[P(E,V)+P0]*(V0-V)
+
+    where V0 = 1/rho0 and V = 1/rho.  It is rewritten as
+
+        f(E) = 0.5*[P(E,V)+P0]*(V0-V)-E+E0 == 0.0
+
+        df(E)/dE = 0.5*(dP/dE)*(1/rho0 - 1/rho) - 1
+
+    and solved by Newton's method for all unconverged points at once, each
+    pass evaluating the eos for all of them through evaluate_eos_ensemble.
+    Once a point has seen energies on both sides of its root, Newton steps
+    that leave the bracket or do not halve |f| are replaced by bisection.
+
+    Every stride'th point is solved first, starting from E0, then the points
+    halfway between solved points, and so on, each point starting from the
+    energy interpolated between its converged neighbours, or from E0 if none
+    of the points solved so far converged.
+
+    Parameters
+    ----------
+    eos_model : object
+      the eos constitutive model
+    simdat, matdat : object
+      simulation and material data containers
+    unit_system : str
+      unit system of the densities, energies, and pressure
+    rho : array_like
+      densities of the points on the Hugoniot, increasing or decreasing
+    init_density, init_energy, init_pressure : float
+      the initial state rho0, E0, P0
+    tol : float, optional
+      tolerance on |f(E)/E0|
+    maxiter : int, optional
+      maximum number of iterations of each point
+
+    Returns
+    -------
+    mdata : ndarray
+      material data of the state at each point, each row laid out as the rows
+      of matdat
+    niter : ndarray
+      number of iterations taken by each point
+    converged : ndarray
+      True for each point that converged
+    npass : int
+      number of evaluations of the eos model
+
+    """
+    rho = np.asarray(rho, dtype=np.float64)
+    npts = rho.shape[0]
+    a = (1. / init_density - 1. / rho) / 2.
+    scale = abs(init_energy) if abs(init_energy) > EPSILON else 1.
+
+    mdata = np.tile(matdat.get("all"), (npts, 1))
+    enrg = np.repeat(float(init_energy), npts)
+    niter = np.zeros(npts, dtype=int)
+    converged = np.zeros(npts, dtype=bool)
+    solved = np.zeros(npts, dtype=bool)
+    npass = 0
+
+    # energies on either side of each point's root, and the last |f|
+    e_pos = np.repeat(np.nan, npts)
+    e_neg = np.repeat(np.nan, npts)
+    f_abs = np.repeat(np.inf, npts)
+
+    stride = 1
+    while npts > 16 * stride:
+        stride *= 2
+
+    while stride:
+        active = np.arange(0, npts, stride)
+        active = active[~solved[active]]
+        # warm start from the neighbours' converged energies, the last
+        # iterates of points that failed or ran out of iterations are not used.
+        # np.interp needs increasing abscissae, rho may be decreasing.
+        good = np.flatnonzero(solved & converged)
+        if good.shape[0]:
+            good = good[np.argsort(rho[good])]
+            enrg[active] = np.interp(rho[active], rho[good], enrg[good])
+        else:
+            enrg[active] = init_energy
+        solved[active] = True
+
+        while active.shape[0]:
+            edat = matdat.ensemble(active.shape[0])
+            eos_model.evaluate_eos_ensemble(simdat, edat, unit_system,
+                                            rho=rho[active],
+                                            enrg=enrg[active])
+            npass += 1
+            niter[active] += 1
+            mdata[active] = edat.get("all")
+
+            e = enrg[active]
+            f = ((edat.get("pressure") + init_pressure) * a[active] -
+                 e + init_energy)
+            done = np.abs(f / scale) < tol
+            converged[active[done]] = True
+
+            # update the brackets and take the safeguarded Newton step
+            pos = f > 0.
+            e_pos[active[pos]] = e[pos]
+            e_neg[active[~pos]] = e[~pos]
+            lo = np.fmin(e_pos[active], e_neg[active])
+            hi = np.fmax(e_pos[active], e_neg[active])
+            bracketed = ~np.isnan(e_pos[active]) & ~np.isnan(e_neg[active])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                df = (edat.get("dpdt") / edat.get("dedt") * a[active] - 1.)
+                e_new = e - f / df
+            bisect = bracketed & (
+                ~np.isfinite(e_new) | (e_new <= lo) | (e_new >= hi) |
+                (np.abs(f) > .5 * f_abs[active]))
+            e_new[bisect] = .5 * (lo[bisect] + hi[bisect])
+            f_abs[active] = np.abs(f)
+
+            # points without a usable step and those out of iterations stop
+            failed = ~np.isfinite(e_new) | (niter[active] >= maxiter)
+            keep = ~done & ~failed
+            enrg[active[keep]] = e_new[keep]
+            active = active[keep]
+            continue
+
+        stride //= 2
+        continue
+
+    return mdata, niter, converged, npass
+
+
+def _evaluate_eos_chunk(args):
+    """Evaluate a chunk of the sweep set up by evaluate_eos_sweep"""
+    rho, temp, enrg = args
+    edat = _EOS_SWEEP["matdat"].ensemble(len(rho))
+    _EOS_SWEEP["eos_model"].evaluate_eos_ensemble(
+        _EOS_SWEEP["simdat"], edat, _EOS_SWEEP["unit_system"],
+        rho=rho, temp=temp, enrg=enrg)
+    return edat.get("all")
+
+
 def solid_driver(the_model, **kwargs):
     """Run the single element simulation for an instance of the main Payette
     class the_model
@@ -349,6 +499,22 @@ def solid_driver(the_model, **kwargs):
     K = simdat.KAPPA
     timed_restart_file = None
 
+    # --- the leg in progress when the restart file was written, if it was
+    #     not written at the end of a leg, is continued from that step
+    resume = the_model.restart_leg
+    if resume is not None:
+        t_beg = resume["time"]
+
+    # --- instrumentation of the hot paths
+    instrument = ro.INSTRUMENT
+    if instrument:
+        pi.reset()
+    if ro.CHECK_TANGENT:
+        citer.reset_tangent_check()
+
+    # --- adaptive time stepping, see below
+    adaptive = ro.ADAPTIVE
+
     # --- material data
     material = the_model.material
     matdat = material.material_data()
@@ -372,7 +538,7 @@ def solid_driver(the_model, **kwargs):
                 "velocity and displacement tables will be generated")
 
     # --- call the material model with zero state
-    if ileg == 0:
+    if ileg == 0 and not restart:
         material.update_state(simdat, matdat)
         simdat.advance()
         matdat.advance()
@@ -383,9 +549,20 @@ def solid_driver(the_model, **kwargs):
     # V is an array of integers that contains the columns of prescribed stress
     V = []
 
-    Ec = matdat.get("strain")
-    Fc = matdat.get("deformation gradient")
-    Pc = matdat.get("stress")
+    # handles to the data stored and retrieved every step
+    h_t, h_dt = simdat.handle("time"), simdat.handle("time step")
+    h_rho = simdat.handle("payette density")
+    h_E, h_F = matdat.handle("strain"), matdat.handle("deformation gradient")
+    h_D, h_W = matdat.handle("rate of deformation"), matdat.handle("vorticity")
+    h_vE, h_eqE = matdat.handle("vstrain"), matdat.handle("equivalent strain")
+    h_P, h_dP = matdat.handle("stress"), matdat.handle("stress rate")
+    h_p = matdat.handle("pressure")
+    if ro.EFIELD_SIM:
+        h_EF = matdat.handle("electric field")
+
+    Ec = h_E.get()
+    Fc = h_F.get()
+    Pc = h_P.get()
     R, dR = matdat.get("rotation"), matdat.get("rotation rate")
 
     # --------------------------------------------------- begin{processing leg}
@@ -407,6 +584,9 @@ def solid_driver(the_model, **kwargs):
         delt = t_end - t_beg
         if delt == 0.:
             continue
+        if instrument:
+            pi.start_leg(lnum)
+            t_leg = time.time()
         nv, dflg = 0, list(set(ltype))
         for inum in (0, 6):
             try:
@@ -425,6 +605,10 @@ def solid_driver(the_model, **kwargs):
         F0 = matdat.get("deformation gradient", copy=True)
         if ro.EFIELD_SIM:
             EF0 = matdat.get("electric field", copy=True)
+        if resume is not None:
+            E0, P0, F0 = resume["E0"], resume["P0"], resume["F0"]
+            if ro.EFIELD_SIM:
+                EF0 = resume["EF0"]
 
         pu.log_message(cons_msg.format(lnum, lnl, 1, lns, t_beg, dt))
 
@@ -490,8 +674,44 @@ def solid_driver(the_model, **kwargs):
         t = t_beg
         dt = delt / nsteps
 
+        if adaptive:
+            # with adaptive time stepping, each step covers a fraction ds of
+            # the leg that is at least the 1 / nsteps of the legs block. ds
+            # is grown while the rates of stress and deformation gradient
+            # change little from step to step and is cut back, and the step
+            # taken again, when they change more than ro.ADAPTIVE_TOL or the
+            # stress solve does not converge.
+            # Output is written at the same points of the leg as it would be
+            # without adaptive stepping, interpolated between the data at the
+            # beginning and end of the step that passes them.
+            dsmin = ds = 1. / nsteps
+            print_at = [float(i + 1) / nsteps for i in range(nsteps)
+                        if (nsteps - i) % print_interval == 0
+                        or i == nsteps - 1]
+            iprint = 0
+            row_beg = the_model.state_row()
+            rates_beg = None
+
         # ---------------------------------------------- begin{processing step}
-        for n in range(nsteps):
+        n, s_beg, converged = 0, 0., 1
+        if resume is not None:
+            n, s_beg = resume["step"], resume["fraction"]
+            t = simdat.get("time")
+            if adaptive:
+                ds = resume["ds"]
+                iprint = len([x for x in print_at if x < s_beg + 1.E-12])
+                row_beg = the_model.state_row()
+            resume = None
+        while s_beg < 1.:
+
+            # fraction of the leg completed at the end of this step
+            if not adaptive:
+                s_end = float(n + 1) / nsteps
+            else:
+                s_end = s_beg + ds
+                if s_end > 1. - .5 * dsmin:
+                    s_end = 1.
+                Fc_beg, Ec_beg, Pc_beg = Fc, Ec, Pc
 
             # advance data from end of last step to this step
             matdat.advance()
@@ -499,12 +719,19 @@ def solid_driver(the_model, **kwargs):
             ro.ISTEP += 1
 
             # increment time
-            t += dt
+            if not adaptive:
+                t += dt
+            else:
+                dt = delt * (s_end - s_beg)
+                t = t_beg + delt * s_end
 
             # interpolate values of E, F, EF, and P for the target values for
             # this step
-            a1 = float(nsteps - (n + 1)) / nsteps
-            a2 = float(n + 1) / nsteps
+            if not adaptive:
+                a1 = float(nsteps - (n + 1)) / nsteps
+            else:
+                a1 = 1. - s_end
+            a2 = s_end
             Et = a1 * E0 + a2 * Ef
             Ft = a1 * F0 + a2 * Ff
             if ro.EFIELD_SIM:
@@ -515,12 +742,14 @@ def solid_driver(the_model, **kwargs):
                 Pt = a1 * PS0 + a2 * PSf  # target stress
 
             # advance known values to end of step
-            simdat.store("time", t)
-            simdat.store("time step", dt)
+            h_t.store(t)
+            h_dt.store(dt)
             if ro.EFIELD_SIM:
-                matdat.store("electric field", EFt)
+                h_EF.store(EFt)
 
             # --- find current value of d: sym(velocity gradient)
+            if instrument:
+                t_phase = time.time()
             if not len(V):
 
                 if dflg[0] == 5:
@@ -533,8 +762,12 @@ def solid_driver(the_model, **kwargs):
 
             else:
                 # --- One or more stresses prescribed
-                Dc, Wc = pk.velgrad_from_stress(
-                    material, simdat, matdat, dt, Ec, Et, Pc, Pt, V)
+                Dc, Wc, converged = pk.velgrad_from_stress(
+                    material, simdat, matdat, dt, Ec, Et, Pc, Pt, V,
+                    full_output=True)
+                if instrument:
+                    pi.add_time("stress solve", time.time() - t_phase)
+                    t_phase = time.time()
 
             if not ro.USE_TABLE:
                 # compute the current deformation gradient and strain from
@@ -555,35 +788,95 @@ def solid_driver(the_model, **kwargs):
             # --- update the deformation to the end of the step at this point,
             #     the rate of deformation and vorticity to the end of the step
             #     are known, advance them.
-            matdat.store("rate of deformation", Dc)
-            matdat.store("vorticity", Wc)
-            matdat.store("deformation gradient", Fc)
-            matdat.store("strain", Ec)
-            matdat.store("vstrain", np.sum(Ec[:3]))
+            h_D.store(Dc)
+            h_W.store(Wc)
+            h_F.store(Fc)
+            h_E.store(Ec)
+            h_vE.store(np.sum(Ec[:3]))
             # compute the equivalent strain
-            matdat.store(
-                "equivalent strain",
+            h_eqE.store(
                 np.sqrt(2. / 3. * (np.sum(Ec[:3] ** 2) + 2. * np.sum(Ec[3:] ** 2))))
 
             # udpate density
-            dev = pt.trace(matdat.get("rate of deformation")) * dt
-            rho_old = simdat.get("payette density")
-            simdat.store("payette density", rho_old * math.exp(-dev))
+            dev = pt.trace(h_D.get()) * dt
+            rho_old = h_rho.get()
+            h_rho.store(rho_old * math.exp(-dev))
+            if instrument:
+                pi.add_time("kinematics", time.time() - t_phase)
+                t_phase = time.time()
 
             # update material state
             material.update_state(simdat, matdat)
+            if instrument:
+                pi.add_time("update state", time.time() - t_phase)
 
             # advance all data after updating state
-            Pc = matdat.get("stress")
-            matdat.store("stress rate", (Pc - matdat.get("stress", "-")) / dt)
-            matdat.store("pressure", -np.sum(Pc[:3]) / 3.)
+            Pc = h_P.get()
+            rate = (Pc - h_P.get("-")) / dt
+            h_dP.store(rate)
+            h_p.store(-np.sum(Pc[:3]) / 3.)
+
+            if adaptive:
+                # estimate the error of the step from the change in the rates
+                # of stress and deformation gradient from the last step,
+                # relative to the stress and deformation gradient
+                err = 0.
+                rates = (rate, (Fc - Fc_beg) / dt)
+                if rates_beg is not None:
+                    for x, x_beg, x_dot, x_dot_beg in zip(
+                        (Pc, Fc), (Pc_beg, Fc_beg), rates, rates_beg):
+                        dnom = max(np.amax(np.abs(x)), np.amax(np.abs(x_beg)))
+                        if dnom > 0.:
+                            err = max(err, np.amax(np.abs(x_dot - x_dot_beg))
+                                      * dt / dnom)
+
+                if ds > dsmin and (not converged or err > ro.ADAPTIVE_TOL):
+                    # reject the step and take it again with a smaller ds
+                    if instrument:
+                        pi.count("rejected steps")
+                    ro.ISTEP -= 1
+                    Fc, Ec, Pc = Fc_beg, Ec_beg, Pc_beg
+                    fac = .25 if not converged else max(
+                        .2, .9 * math.sqrt(ro.ADAPTIVE_TOL / err))
+                    ds = max(dsmin, ds * fac)
+                    continue
+
+                # the next step is grown if the solution is smooth and the
+                # stress solve converged on the stringent tolerance
+                if converged == 1:
+                    fac = 2. if not err else min(
+                        2., .9 * math.sqrt(ro.ADAPTIVE_TOL / err))
+                    ds = max(dsmin, ds * fac)
+                rates_beg = rates
 
             # --- write state to file
-            endstep =  abs(t - t_end) / t_end < 1.E-12
-            if (nsteps - n) % print_interval == 0 or endstep:
-                the_model.write_state()
-
-            if simdat.SCREENOUT or (2 * n - nsteps) == 0:
+            if instrument:
+                t_phase = time.time()
+            if not adaptive:
+                endstep =  abs(t - t_end) / t_end < 1.E-12
+                if (nsteps - n) % print_interval == 0 or endstep:
+                    the_model.write_state()
+            else:
+                row_end = None
+                while (iprint < len(print_at) and
+                       print_at[iprint] < s_end + 1.E-12):
+                    if abs(print_at[iprint] - s_end) < 1.E-12:
+                        the_model.write_state()
+                    else:
+                        # interpolate to the print point
+                        if row_end is None:
+                            row_end = the_model.state_row()
+                        w = (print_at[iprint] - s_beg) / (s_end - s_beg)
+                        the_model.write_state(
+                            row=row_beg + w * (row_end - row_beg))
+                    iprint += 1
+                    continue
+                row_beg = (the_model.state_row() if row_end is None
+                           else row_end)
+            if instrument:
+                pi.add_time("output", time.time() - t_phase)
+
+            if simdat.SCREENOUT or (not adaptive and (2 * n - nsteps) == 0):
                 pu.log_message(cons_msg.format(lnum, lnl, n, lns, t, dt))
 
             # ------------------------------------------ begin{end of step SQA}
@@ -593,7 +886,7 @@ def solid_driver(the_model, **kwargs):
                     if ro.VERBOSITY > 3:
                         pu.log_message("checking that computed strain matches "
                                        "at end of step prescribed strain")
-                    Etmp = matdat.get("strain")
+                    Etmp = h_E.get()
                     max_diff = np.max(np.abs(Etmp - Ec))
                     dnom = max(np.max(np.abs(Ec)), 0.)
                     dnom = dnom if dnom != 0. else 1.
@@ -612,7 +905,7 @@ def solid_driver(the_model, **kwargs):
                         pu.log_message("checking that computed deformation "
                                        "gradient at end of step matches "
                                        "prescribed deformation gradient")
-                    F_tmp = matdat.get("deformation gradient")
+                    F_tmp = h_F.get()
                     max_diff = (np.max(F_tmp - Fc)) / np.max(np.abs(Fc))
                     dnom = max(np.max(np.abs(Fc)), 0.)
                     dnom = dnom if dnom != 0. else 1.
@@ -629,6 +922,8 @@ def solid_driver(the_model, **kwargs):
 
             # -------------------------------------------- end{end of step SQA}
             simdat.store("istep", ro.ISTEP)
+            if instrument:
+                pi.end_step()
 
             if ro.RESTART_TIME:
                 if (t - .001 * t <= ro.RESTART_TIME <= t + .001 * t or
@@ -642,9 +937,17 @@ def solid_driver(the_model, **kwargs):
                             fnam, t, fext)
                         pu.log_message("Writing restart file {0}".format(
                                 os.path.basename(timed_restart_file)))
-                        with open(timed_restart_file, 'wb') as fobj:
-                            pickle.dump(the_model, fobj, 2)
-
+                        leg_state = {"time": t_beg, "step": n + 1,
+                                     "fraction": s_end, "E0": E0, "P0": P0,
+                                     "F0": F0}
+                        if ro.EFIELD_SIM:
+                            leg_state["EF0"] = EF0
+                        if adaptive:
+                            leg_state["ds"] = ds
+                        the_model.write_restart(timed_restart_file, leg_state)
+
+            n += 1
+            s_beg = s_end
 
             continue  # continue to next step
         # ------------------------------------------------ end{processing step}
@@ -660,12 +963,18 @@ def solid_driver(the_model, **kwargs):
         t_beg = t_end
 
         if ro.WRITERESTART and not ro.RESTART_TIME:
-            with open(the_model.restart_file, 'wb') as fobj:
-                pickle.dump(the_model, fobj, 2)
+            the_model.write_restart(the_model.restart_file)
 
         # --- print message to screen
         if nsteps > 1:
-            pu.log_message(cons_msg.format(lnum, lnl, n + 1, lns, t, dt))
+            pu.log_message(cons_msg.format(lnum, lnl, n, lns, t, dt))
+        if adaptive:
+            pu.log_message("leg {0} took {1} of {2} steps".format(
+                lnum, n, nsteps))
+
+        if instrument:
+            pi.end_leg(time.time() - t_leg)
+            pu.log_message(pi.summary())
 
         # ----------------------------------------------- begin{end of leg SQA}
         if ro.SQA:
@@ -710,7 +1019,223 @@ def solid_driver(the_model, **kwargs):
         continue  # continue to next leg
     # ----------------------------------------------------- end{processing leg}
 
+    if ro.CHECK_TANGENT:
+        pu.log_message("consistent tangent checked {0} times, maximum "
+                       "relative error {1:.4E}".format(*citer.tangent_check()))
+
     pu.log_message(
         "Finished calculations for simulation {0}".format(the_model.name),
         noisy=ro.NPROC > 1)
     return 0
+
+
+def ensemble_driver(the_model, **kwargs):
+    """Run an ensemble of single element simulations for an instance of the
+    main Payette class the_model
+
+    Parameters
+    ----------
+    the_model : object
+      Payette class instance
+
+    Returns
+    -------
+    None
+
+    Updates
+    -------
+    the_model : object
+      Payette class instance
+    outfile : file object
+      simulation output file, containing the history of the first point of
+      the ensemble
+    ensemble file : file object
+      output file containing the history of every point of the ensemble
+
+    Strategy
+    --------
+    Each of the N points of the ensemble follows the legs of the boundary
+    block with its prescribed strains scaled by the point's amplitude.  The
+    state of the ensemble is held in an (N x nvars) array and the material
+    model is called once per step for all N points.  Only strain and strain
+    rate legs are supported.
+
+    """
+    cons_msg = "leg {0:{1}d}, step {2:{3}d}, time {4:.4E}, dt {5:.4E}"
+
+    # --- simulation data
+    simdat = the_model.simulation_data()
+
+    # --- data
+    ileg = int(simdat.get("leg number"))
+    legs = the_model.boundary.legs(ileg)
+    lnl = len(str(len(legs)))
+    t_beg = simdat.get("time")
+    dt = simdat.get("time step")
+    K = simdat.KAPPA
+
+    # --- material data
+    material = the_model.material
+    matdat = material.material_data()
+
+    npts = the_model.ensemble["npoints"]
+    ampl = the_model.ensemble["ampl"][:, None]
+
+    pu.log_message(
+        "Starting calculations for ensemble simulation {0} of {1} points"
+        .format(the_model.name, npts), noisy=ro.NPROC > 1)
+    if ro.EFIELD_SIM:
+        pu.report_and_raise_error(
+            "ensemble simulations do not support electric field models")
+    if ro.WRITERESTART or ro.RESTART_TIME or ro.TESTRESTART:
+        pu.log_warning("restart files are not written for ensembles")
+
+    # --- call the material model with zero state
+    if ileg == 0:
+        material.update_state(simdat, matdat)
+        simdat.advance()
+        matdat.advance()
+        the_model.write_state()
+
+    # --- every point begins in the current state of the material
+    edat = matdat.ensemble(npts)
+    h_rho = simdat.handle("payette density")
+    rho = np.repeat(h_rho.get(), npts)
+    if ileg == 0:
+        the_model.write_ensemble_state(edat, rho)
+
+    # handles to the simulation data stored every step
+    h_t, h_dt = simdat.handle("time"), simdat.handle("time step")
+
+    Ec = edat.get("strain", copy=True)
+    Fc = edat.get("deformation gradient", copy=True)
+    R, dR = matdat.get("rotation"), matdat.get("rotation rate")
+
+    # --------------------------------------------------- begin{processing leg}
+    for leg in legs:
+
+        # read inputs and initialize for this leg
+        lnum, t_end, nsteps, ltype, prdef = leg
+        ltype = [int(x) for x in ltype]
+        lns = len(str(nsteps))
+        delt = t_end - t_beg
+        if delt == 0.:
+            continue
+
+        if any(x not in (0, 1, 2) for x in ltype[:6]) or any(ltype[6:9]):
+            pu.report_and_raise_error(
+                "ensemble simulations support only strain and strain rate "
+                "legs, leg {0} prescribes other quantities".format(lnum))
+            return 1
+
+        nprints = (simdat.NPRINTS if simdat.NPRINTS else nsteps)
+        if simdat.EMIT == 0:
+            nprints = min(10, nsteps)
+        print_interval = max(1, int(nsteps / nprints))
+
+        # pass values from the end of the last leg to beginning of this leg
+        E0 = edat.get("strain", copy=True)
+        pu.log_message(cons_msg.format(lnum, lnl, 1, lns, t_beg, dt))
+
+        # --- strain at end of leg for each point, scaled by its amplitude
+        #       for ltype = 1: Ef at t_end -> E0 + ampl*prdef*delt
+        #       for ltype = 2: Ef at t_end -> ampl*prdef
+        Ef = np.zeros((npts, 6))
+        for i in range(6):
+            if ltype[i] == 1:
+                Ef[:, i] = E0[:, i] + ampl[:, 0] * prdef[i] * delt
+            elif ltype[i] == 2:
+                Ef[:, i] = ampl[:, 0] * prdef[i]
+            continue
+
+        t = t_beg
+        dt = delt / nsteps
+
+        # ---------------------------------------------- begin{processing step}
+        for n in range(nsteps):
+
+            # advance data from end of last step to this step
+            edat.advance()
+            matdat.advance()
+            simdat.advance()
+            ro.ISTEP += 1
+
+            # increment time
+            t += dt
+
+            # interpolate values of E for the target values for this step
+            a1 = float(nsteps - (n + 1)) / nsteps
+            a2 = float(n + 1) / nsteps
+            Et = a1 * E0 + a2 * Ef
+
+            # advance known values to end of step
+            h_t.store(t)
+            h_dt.store(dt)
+
+            # --- find current value of d: sym(velocity gradient)
+            Dc, Wc = pk.velgrad_from_strain_blk(dt, K, Ec, R, dR, Et)
+
+            if not ro.USE_TABLE:
+                # compute the current deformation gradient and strain from
+                # previous values and the deformation rate
+                Fc, Ec = pk.update_deformation_blk(dt, K, Fc, Dc, Wc)
+
+            else:
+                Ec = Et
+                Fc = edat.get("deformation gradient", copy=True)
+
+            # --- update the deformation to the end of the step
+            edat.store("rate of deformation", Dc)
+            edat.store("vorticity", Wc)
+            edat.store("deformation gradient", Fc)
+            edat.store("strain", Ec)
+            edat.store("vstrain", np.sum(Ec[:, :3], axis=1))
+            edat.store("equivalent strain", np.sqrt(2. / 3. * (
+                np.sum(Ec[:, :3] ** 2, axis=1) +
+                2. * np.sum(Ec[:, 3:] ** 2, axis=1))))
+
+            # update density of each point, the simulation data holds the
+            # density of the first point
+            rho *= np.exp(-pt.trace_blk(Dc) * dt)
+            h_rho.store(rho[0])
+
+            # update material state
+            material.update_state_ensemble(simdat, edat)
+
+            # advance all data after updating state
+            Pc = edat.get("stress")
+            edat.store("stress rate", (Pc - edat.get("stress", "-")) / dt)
+            edat.store("pressure", -np.sum(Pc[:, :3], axis=1) / 3.)
+
+            # --- write state to file
+            endstep = abs(t - t_end) / t_end < 1.E-12
+            if (nsteps - n) % print_interval == 0 or endstep:
+                matdat.store("all", edat.get("all", point=0))
+                the_model.write_state()
+                the_model.write_ensemble_state(edat, rho)
+
+            if simdat.SCREENOUT or (2 * n - nsteps) == 0:
+                pu.log_message(cons_msg.format(lnum, lnl, n, lns, t, dt))
+
+            simdat.store("istep", ro.ISTEP)
+            continue  # continue to next step
+        # ------------------------------------------------ end{processing step}
+
+        # --- pass quantities from end of leg to beginning of new leg
+        ileg += 1
+        simdat.store("leg number", ileg)
+        t_beg = t_end
+
+        # --- print message to screen
+        if nsteps > 1:
+            pu.log_message(cons_msg.format(lnum, lnl, n + 1, lns, t, dt))
+
+        continue  # continue to next leg
+    # ----------------------------------------------------- end{processing leg}
+
+    matdat.store("all", edat.get("all", point=0))
+
+    pu.log_message(
+        "Finished calculations for ensemble simulation {0}"
+        .format(the_model.name), noisy=ro.NPROC > 1)
+    return 0
@@ -30,6 +30,8 @@ import os
 import numpy
 import optparse
 
+import Source.Payette_binary_output as pbo
+
 """
 NAME
     extractPayette.py
@@ -203,13 +205,7 @@ def extract(passed_args, sep="space", cols=False, silent=True,
             continue
 
         # open the file and extract only the data that the user asked for
-        fobj = open(outf, "r")
-        for iline, line in enumerate(fobj):
-
-            if iline == 0 or not line.split() or line.split()[0] == "#":
-                continue
-
-            linedat = [float(x) for x in line.split()]
+        for linedat in read_rows(outf):
 
             extracted_data = []
             for item in to_extract:
@@ -258,6 +254,65 @@ def extract(passed_args, sep="space", cols=False, silent=True,
     return data
 
 
+def extract_columns(source, keys):
+    """Extract the columns named by keys from source
+
+    Parameters
+    ----------
+    source : str or tuple
+        Either the name of an output file, or the (head, data) output of a
+        simulation held in memory, where head is the list of column names
+        and data the m x n array of output
+    keys : list
+        Keywords of the columns to extract, "@sig11", for example
+
+    Returns
+    -------
+    data : ndarray
+        m x len(keys) array of the extracted columns
+
+    """
+    if isinstance(source, basestring):
+        return numpy.array(extract([source] + list(keys), silent=True))
+
+    head, data = source
+    head_dict = header2dict(" ".join(head))
+    cols = []
+    for key in keys:
+        kw = key[1:] if key.startswith(kwtoken) else key
+        try:
+            cols.append(int(head_dict[kw.lower()]["col"][1:]))
+        except KeyError:
+            msg = ("keyword {0} not in output, choose from:\n {1}"
+                   .format(kw, " ".join(head)))
+            raise ExtractError(msg, 4)
+        continue
+    return numpy.array(data)[:, cols]
+
+
+def read_rows(outf):
+    """Generator of the rows of data in outf, read from the binary output
+    file written alongside outf when there is one
+
+    """
+    bpath = pbo.find_binary_file(outf)
+    if bpath is not None:
+        for linedat in pbo.load(bpath)[1].tolist():
+            yield linedat
+        return
+
+    fobj = open(outf, "r")
+    for iline, line in enumerate(fobj):
+
+        if iline == 0 or not line.split() or line.split()[0] == "#":
+            continue
+
+        yield [float(x) for x in line.split()]
+
+    fobj.close()
+    return
+
+
 def ffrmt(x):
     return "{0:<12.5E}".format(x)
 
@@ -362,13 +417,17 @@ def args2dict(args, sep):
             raise ExtractError("file {0} sent multiple times".format(argf), 11)
 
         # add file to tmparg and move on to next item in args
-        check_file()
+        bpath = pbo.find_binary_file(argf)
+        if bpath is None:
+            check_file()
+            header = open(argf).readline()
+        else:
+            header = " ".join(pbo.get_header(bpath))
         arg_dict = {}
         arg_dict["file"] = argf
         arg_dict["extract"] = []
         arg_dict["extract header"] = []
         fnam, fext = os.path.splitext(argf)
-        header = open(argf).readline()
         head_dict = header2dict(header)
         arg_dict["file header"] = header.strip()
 
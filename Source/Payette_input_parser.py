@@ -759,7 +759,7 @@ def parse_output(oblock):
         output format
 
     """
-    oformats = ("ascii", )
+    oformats = ("ascii", "binary", )
     ovars = []
 
     if not oblock:
@@ -768,6 +768,7 @@ def parse_output(oblock):
     oformat, oblock = find_item_name(oblock, "format", pop=True)
     if oformat is None:
         oformat = "ascii"
+    oformat = oformat.lower()
 
     if oformat not in oformats:
         pu.report_and_raise_error(
@@ -843,6 +844,69 @@ def parse_extraction(eblock):
     return extraction_vars, opts
 
 
+def parse_ensemble(eblock):
+    """Parse the ensemble block of the input file
+
+    Parameters
+    ----------
+    eblock : str
+        The ensemble block
+
+    Returns
+    -------
+    ensemble : dict
+        ensemble["npoints"] : int
+            number of material points in the ensemble
+        ensemble["ampl"] : ndarray
+            amplitude applied to the prescribed strains of each point
+
+    Notes
+    -----
+    The ensemble block will look something like
+
+        npoints = 100
+        ampl = .9, 1.1
+
+    and the amplitudes of the prescribed strains of the points are linearly
+    spaced between the two values of ampl.  If only one value of ampl is
+    given, every point receives it.
+
+    """
+    npoints, ampl = None, [1., 1.]
+    for line in eblock.split("\n"):
+        line = re.sub(I_SEP, " ", re.sub(I_EQ, " ", line)).split()
+        if not line:
+            continue
+        kwd, vals = line[0].lower(), line[1:]
+        if kwd == "npoints":
+            try:
+                npoints = int(vals[0])
+            except (IndexError, ValueError):
+                pu.report_and_raise_error(
+                    "npoints must be an integer, got {0}".format(vals))
+        elif kwd == "ampl":
+            try:
+                ampl = [float(x) for x in vals]
+            except ValueError:
+                pu.report_and_raise_error(
+                    "ampl values must be floats, got {0}".format(vals))
+            if len(ampl) == 1:
+                ampl = ampl * 2
+            elif len(ampl) != 2:
+                pu.report_and_raise_error(
+                    "ampl requires one or two values, got {0}".format(vals))
+        else:
+            pu.report_and_raise_error(
+                "unrecognized ensemble option {0}".format(kwd))
+        continue
+
+    if npoints is None or npoints < 1:
+        pu.report_and_raise_error("ensemble requires npoints > 0")
+
+    return {"npoints": npoints,
+            "ampl": np.linspace(ampl[0], ampl[1], npoints)}
+
+
 def flatten(x):
     result = []
     for el in x:
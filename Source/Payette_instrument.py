@@ -0,0 +1,165 @@
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Counters and timers for the hot paths of the solid driver.
+
+Instrumentation is off unless the 'instrument' option is set, either with
+payette --instrument or in the input file's control block.  Code on the hot
+paths checks ro.INSTRUMENT before calling count or add_time, so that nothing
+is done when it is off.
+
+The statistics are kept for each leg of the simulation run by the solid
+driver.  The driver writes a summary of each leg to the log file and the
+record returned by stats is put in the dictionary returned by
+Payette.run_job.
+
+"""
+
+# counters and the code that increments them
+COUNTERS = (
+    # every call to the constitutive model's update_state
+    "update_state calls",
+    # iterations of the Newton stress solver
+    "newton iterations",
+    # numerically computed Jacobians
+    "jacobian evaluations",
+    # singular Jacobians solved by least squares
+    "least squares",
+    # Newton solves restarted with d[V] = 0
+    "newton restarts",
+    # stress solves that fell back to the downhill simplex method
+    "simplex fallbacks",
+    # steps rejected and retaken with a smaller time step, ro.ADAPTIVE
+    "rejected steps",
+    )
+
+# phases of a solid driver step timed
+PHASES = ("kinematics", "stress solve", "update state", "output")
+
+# statistics of each leg run, the last is the current leg
+_LEGS = []
+
+
+def reset():
+    """Forget the statistics of all legs"""
+    del _LEGS[:]
+    return
+
+
+def start_leg(lnum):
+    """Start collecting statistics for leg lnum"""
+    leg = {"leg": lnum, "steps": 0, "max newton iterations per step": 0,
+           "time": dict((x, 0.) for x in PHASES + ("total", ))}
+    leg.update((x, 0) for x in COUNTERS)
+    leg["_newton"] = 0
+    _LEGS.append(leg)
+    return
+
+
+def count(key, inc=1):
+    """Increment the counter key of the current leg by inc"""
+    if _LEGS:
+        _LEGS[-1][key] += inc
+    return
+
+
+def add_time(phase, dtime):
+    """Add dtime seconds to the time spent in phase in the current leg"""
+    if _LEGS:
+        _LEGS[-1]["time"][phase] += dtime
+    return
+
+
+def end_step():
+    """Finish the statistics of a step of the current leg"""
+    if not _LEGS:
+        return
+    leg = _LEGS[-1]
+    leg["steps"] += 1
+    niter = leg["newton iterations"] - leg["_newton"]
+    leg["_newton"] = leg["newton iterations"]
+    if niter > leg["max newton iterations per step"]:
+        leg["max newton iterations per step"] = niter
+    return
+
+
+def end_leg(dtime):
+    """Finish the statistics of the current leg, that took dtime seconds"""
+    if _LEGS:
+        _LEGS[-1]["time"]["total"] = dtime
+    return
+
+
+def stats():
+    """Return the statistics of all legs
+
+    Returns
+    -------
+    stats : dict
+        legs: list of dicts of the counters, number of steps, and time spent
+        in each phase of each leg
+        total: the sum of each counter, number of steps, and time over all
+        legs
+
+    """
+    legs = []
+    for leg in _LEGS:
+        leg = dict((k, v) for k, v in leg.items() if not k.startswith("_"))
+        leg["time"] = dict(leg["time"])
+        legs.append(leg)
+    total = {"steps": sum(x["steps"] for x in legs),
+             "max newton iterations per step": max(
+                 [x["max newton iterations per step"] for x in legs] or [0]),
+             "time": dict((p, sum(x["time"][p] for x in legs))
+                          for p in PHASES + ("total", ))}
+    total.update((c, sum(x[c] for x in legs)) for c in COUNTERS)
+    return {"legs": legs, "total": total}
+
+
+def summary(leg=None):
+    """Return a summary of the statistics of a leg, the current leg if None,
+    for the log file
+
+    """
+    if leg is None:
+        if not _LEGS:
+            return ""
+        leg = _LEGS[-1]
+    nsteps = max(leg["steps"], 1)
+    lines = ["leg {0} statistics: {1} steps".format(leg["leg"], leg["steps"])]
+    for key in COUNTERS:
+        lines.append("  {0:<22s} {1:>10d} {2:>10.2f} per step".format(
+            key, leg[key], float(leg[key]) / nsteps))
+    lines.append("  {0:<22s} {1:>10d}".format(
+        "max newton iterations", leg["max newton iterations per step"]))
+    total = leg["time"]["total"]
+    other = total - sum(leg["time"][x] for x in PHASES)
+    for phase, dtime in [(x, leg["time"][x]) for x in PHASES] + [
+        ("other", other), ("total", total)]:
+        lines.append("  {0:<22s} {1:>10.4f}s {2:>9.1%}".format(
+            phase, dtime, dtime / total if total else 0.))
+    return "\n".join(lines)
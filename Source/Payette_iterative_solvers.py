@@ -29,15 +29,20 @@
 
 import math
 import numpy as np
-import scipy.optimize
 import sys
 
 import Source.Payette_utils as pu
 import Source.Payette_tensor as pt
+import Source.Payette_instrument as pi
 import Source.__runopts__ as ro
 
 
 EPSILON = np.finfo(np.float).eps
+TANGENT_TOL = 1.e-4
+
+# number of tangents compared by check_tangent and the largest difference
+# found, since the last call to reset_tangent_check
+_TANGENT_CHECK = {"checks": 0, "max error": 0.}
 
 
 def newton(material, simdat, matdat, dt, Pt, V, dEdt):
@@ -75,12 +80,14 @@ def newton(material, simdat, matdat, dt, Pt, V, dEdt):
 
     THEORY:
        The approach is an iterative scheme employing a multidimensional Newton's
-       method. Each iteration begins with a call to subroutine jacobian, which
-       numerically computes the Jacobian submatrix
+       method. Each iteration begins with the Jacobian submatrix
 
                                   Js = J[V, V]
 
-       where J[:,;] is the full Jacobian matrix J = dsig/deps. The value of
+       where J[:,;] is the full Jacobian matrix J = dsig/deps. If the material
+       model provides a consistent tangent from the last call to update_state,
+       it is used for Js, otherwise Js is computed numerically by subroutine
+       jacobian. The value of
        dEdt[V] is then updated according to
 
                 dEdt[V] = dEdt[V] - Jsi*Pd(dEdt[V])/dt
@@ -107,8 +114,11 @@ def newton(material, simdat, matdat, dt, Pt, V, dEdt):
     '''
 
     # --- Local variables
-    F0 = matdat.get("deformation gradient", copy=True)
-    D0 = matdat.get("rate of deformation", copy=True)
+    h_F = matdat.handle("deformation gradient")
+    h_D = matdat.handle("rate of deformation")
+    h_P = matdat.handle("stress")
+    F0 = h_F.get().copy()
+    D0 = h_D.get().copy()
 
     nV = len(V)
     Pd = np.zeros(nV)
@@ -123,23 +133,34 @@ def newton(material, simdat, matdat, dt, Pt, V, dEdt):
     Ff = F0 + pt.dot(dEdt, F0) * dt
 
     # replace deformation rate and gradient with current best guesses
-    matdat.store("deformation gradient", Ff)
-    matdat.store("rate of deformation", dEdt)
+    h_F.store(Ff)
+    h_D.store(dEdt)
 
     # update the material state to get the first guess at the new stress
     material.update_state(simdat, matdat)
-    P = matdat.get("stress")
+    P = h_P.get()
     Pd = P[V] - Pt
+    Jt = material.tangent(simdat, matdat, V)
     matdat.restore()
 
     # --- Perform Newton iteration
     for i in range(maxit2):
-        Js = material.jacobian(simdat, matdat, V)
+        if ro.INSTRUMENT:
+            pi.count("newton iterations")
+        if Jt is None:
+            Js = material.jacobian(simdat, matdat, V)
+        else:
+            # use the consistent tangent from the last state update
+            Js = Jt
+            if ro.CHECK_TANGENT:
+                check_tangent(material, simdat, matdat, V, dEdt, Js)
         try:
             dEdt[V] -= np.linalg.solve(Js, Pd) / dt
 
         except:
             dEdt[V] -= np.linalg.lstsq(Js, Pd)[0] / dt
+            if ro.INSTRUMENT:
+                pi.count("least squares")
             msg = 'Using least squares approximation to matrix inverse'
             pu.log_warning(msg, limit=True)
 
@@ -150,13 +171,14 @@ def newton(material, simdat, matdat, dt, Pt, V, dEdt):
             return converged, D0
 
         Ff = F0 + pt.dot(dEdt, F0) * dt
-        matdat.store("rate of deformation", dEdt)
-        matdat.store("deformation gradient", Ff)
+        h_D.store(dEdt)
+        h_F.store(Ff)
         material.update_state(simdat, matdat)
-        P = matdat.get("stress")
+        P = h_P.get()
         Pd = P[V] - Pt
         dnom = np.amax(np.abs(Pt)) if np.amax(np.abs(Pt)) > 2.e-16 else 1.
         relerr = np.amax(np.abs(Pd)) / dnom
+        Jt = material.tangent(simdat, matdat, V)
         matdat.restore()
 
         if i <= maxit1:
@@ -182,6 +204,66 @@ def newton(material, simdat, matdat, dt, Pt, V, dEdt):
     return converged, dEdt
 
 
+def check_tangent(material, simdat, matdat, V, dEdt, Jt):
+    """Compare the material's consistent tangent with the numerically
+    computed Jacobian
+
+    Parameters
+    ----------
+    material : object
+      material instance
+    simdat : object
+      simulation data container
+    matdat : object
+      material data container
+    V : array_like
+      vector subscript array
+    dEdt : array_like
+      strain rate about which the tangent was computed
+    Jt : array_like
+      consistent tangent submatrix Jt[i, j] = dsig[V[i]] / dE[V[j]]
+
+    Returns
+    -------
+    relerr : float
+      maximum difference between the two, relative to the largest component
+      of the numerical Jacobian
+
+    Notes
+    -----
+    The numerical Jacobian is computed about the same strain rate as the
+    tangent.  Its rows hold the derivatives with respect to each prescribed
+    component, so it is transposed before comparing.
+
+    """
+    matdat.store("rate of deformation", dEdt)
+    Jn = material.numerical_jacobian(simdat, matdat, V).T
+    matdat.restore("rate of deformation")
+    dnom = max(np.amax(np.abs(Jn)), EPSILON)
+    relerr = np.amax(np.abs(Jt - Jn)) / dnom
+    _TANGENT_CHECK["checks"] += 1
+    _TANGENT_CHECK["max error"] = max(_TANGENT_CHECK["max error"], relerr)
+    if relerr > TANGENT_TOL:
+        pu.log_warning(
+            "consistent tangent differs from numerical Jacobian by {0:.2e} "
+            "at step {1}".format(relerr, ro.ISTEP), limit=True)
+    return relerr
+
+
+def reset_tangent_check():
+    """Forget the tangents compared by check_tangent"""
+    _TANGENT_CHECK.update({"checks": 0, "max error": 0.})
+    return
+
+
+def tangent_check():
+    """Return the number of tangents compared by check_tangent and the
+    largest relative difference from the numerical Jacobian found
+
+    """
+    return _TANGENT_CHECK["checks"], _TANGENT_CHECK["max error"]
+
+
 def depsmag(sym_velgrad, dt):
     '''
     NAME
@@ -218,6 +300,9 @@ def simplex(material, simdat, matdat, dt, dEdt, Pt, V):
        M Scot Swan, Sandia National Laboratories, mswan@sandia.gov
     '''
     # --- Perform the simplex search
+    if ro.INSTRUMENT:
+        pi.count("simplex fallbacks")
+    import scipy.optimize
     args = (material, simdat, matdat, dt, dEdt.copy(), Pt, V)
     dEdt[V] = scipy.optimize.fmin(func, dEdt[V],
                                   args=args, maxiter=20, disp=False)
@@ -239,15 +324,15 @@ def func(x, material, simdat, matdat, dt, dEdt, Pt, V):
 
     # initialize
     dEdt[V] = x
-    F0 = matdat.get("deformation gradient", copy=True)
-    D0 = matdat.get("rate of deformation", copy=True)
+    h_F = matdat.handle("deformation gradient")
+    F0 = h_F.get().copy()
     Ff = F0 + pt.dot(dEdt, F0) * dt
 
     # store the best guesses
-    matdat.store("rate of deformation", dEdt)
-    matdat.store("deformation gradient", Ff)
+    matdat.handle("rate of deformation").store(dEdt)
+    h_F.store(Ff)
     material.update_state(simdat, matdat)
-    P = matdat.get("stress", copy=True)
+    P = matdat.handle("stress").get().copy()
     matdat.restore()
 
     # check the error
@@ -34,6 +34,7 @@ import numpy.linalg as la
 import Source.__runopts__ as ro
 import Source.Payette_tensor as pt
 import Source.Payette_iterative_solvers as piter
+import Source.Payette_instrument as pi
 import Source.Payette_utils as pu
 
 import Source.Payette_tensor as pt
@@ -158,7 +159,8 @@ def velgrad_from_defgrad(dt, F0, Ft):
     return pt.to_array(D), pt.to_array(W, sym=False)
 
 
-def velgrad_from_stress(material, simdat, matdat, dt, Ec, Et, Pc, Pt, V):
+def velgrad_from_stress(material, simdat, matdat, dt, Ec, Et, Pc, Pt, V,
+                        full_output=False):
     """Seek to determine the unknown components of the symmetric part of
     velocity gradient d[v] satisfying
 
@@ -176,15 +178,18 @@ def velgrad_from_stress(material, simdat, matdat, dt, Ec, Et, Pc, Pt, V):
        simulation data container
     matdat : data container object
        material data container
+    full_output : bool, optional
+       also return whether the Newton solver converged
 
     Returns
     -------
-    None
-
-    Updates
-    -------
-    matdat "rate of deformation"
-    matdat "vorticity"
+    d : array_like
+       symmetric part of the velocity gradient
+    w : array_like
+       skew part of the velocity gradient
+    converged : int
+       only if full_output is True. 0 if the solution was found by the simplex
+       method, otherwise the convergence flag of newton
 
     Approach
     --------
@@ -201,9 +206,12 @@ def velgrad_from_stress(material, simdat, matdat, dt, Ec, Et, Pc, Pt, V):
 
     """
 
-    # Jacobian
-    J0 = matdat.get("jacobian")
-    Js = J0[[[x] for x in V], V]
+    # Jacobian, the consistent tangent from the last state update if the
+    # material provides one, otherwise the initial elastic Jacobian
+    Js = material.tangent(simdat, matdat, V)
+    if Js is None:
+        J0 = matdat.get("jacobian")
+        Js = J0[[[x] for x in V], V]
 
     Pd = Pt - Pc[V]
     dEdt = (Et - Ec) / dt
@@ -219,20 +227,22 @@ def velgrad_from_stress(material, simdat, matdat, dt, Ec, Et, Pc, Pt, V):
         converged, dEdt = piter.newton(
             material, simdat, matdat, dt, Pt, V, dEdt)
         if converged:
-            return dEdt, W
+            return (dEdt, W, converged) if full_output else (dEdt, W)
 
         # --- didn't converge, try Newton's method with initial
         # --- d[V]=0.
+        if ro.INSTRUMENT:
+            pi.count("newton restarts")
         dEdt[V] = np.zeros(nV)
         converged, dEdt = piter.newton(
             material, simdat, matdat, dt, Pt, V, dEdt)
         if converged:
-            return dEdt, W
+            return (dEdt, W, converged) if full_output else (dEdt, W)
 
     # --- Still didn't converge. Try downhill simplex method and accept
     #     whatever answer it returns:
     dEdt = piter.simplex(material, simdat, matdat, dt, dEdt0, Pt, V)
-    return dEdt, W
+    return (dEdt, W, 0) if full_output else (dEdt, W)
 
 
 def update_deformation(dt, K, F0, D, W):
@@ -362,3 +372,95 @@ def left_stretch(K, E):
         return pt.expm(np.matrix(E))
     else:
         return pt.powm(K * np.matrix(E) + pt.I3X3, 1. / K)
+
+
+def velgrad_from_strain_blk(dt, K, E0, R, dR, Et):
+    """Blocked version of velgrad_from_strain.
+
+    Parameters
+    ----------
+    dt : float
+      time step
+    K : float
+      Seth-Hill parameter
+    E0, Et : array_like
+      (N, 6) arrays of the strain at the beginning and end of the step
+    R, dR : array_like
+      rotation and rotation rate, common to all points
+
+    Returns
+    -------
+    D : array_like
+      (N, 6) array of the symmetric part of the velocity gradient
+    W : array_like
+      (N, 9) array of the skew part of the velocity gradient
+
+    """
+    Et = pt.to_matrix_blk(Et)
+    E0 = pt.to_matrix_blk(E0)
+    R = np.asarray(pt.to_matrix(R))
+    dR = np.asarray(pt.to_matrix(dR))
+
+    # rate of strain
+    dE = (Et - E0) / dt
+
+    # stretch and its rate
+    U = right_stretch_blk(K, Et)
+
+    # center X on half step
+    X = 0.5 * (la.inv(K * Et + pt.I3X3) + la.inv(K * E0 + pt.I3X3))
+    dU = pt.dot_blk(pt.dot_blk(U, X), dE)
+
+    # velocity gradient, sym, and skew parts
+    RdUUi = np.einsum("ij,njk,lk->nil", R, pt.dot_blk(dU, la.inv(U)), R)
+    L = np.dot(dR, R.T) + RdUUi
+    D = .5 * (L + L.transpose(0, 2, 1))
+    W = L - D
+
+    return pt.to_array_blk(D), pt.to_array_blk(W, sym=False)
+
+
+def update_deformation_blk(dt, K, F0, D, W):
+    """Blocked version of update_deformation.
+
+    Parameters
+    ----------
+    dt : float
+      time step
+    K : float
+      Seth-Hill parameter
+    F0 : array_like
+      (N, 9) array of deformation gradients at the beginning of the step
+    D, W : array_like
+      (N, 6) and (N, 9) arrays of the symmetric and skew parts of the
+      velocity gradient
+
+    Returns
+    -------
+    Ff : array_like
+      (N, 9) array of deformation gradients at the end of the step
+    Ef : array_like
+      (N, 6) array of strains at the end of the step
+
+    """
+    F0 = pt.to_matrix_blk(F0)
+    D = pt.to_matrix_blk(D)
+    W = pt.to_matrix_blk(W)
+
+    Ff = pt.dot_blk(pt.expm_blk((D + W) * dt), F0)
+    U = pt.sqrtm_blk(pt.dot_blk(Ff.transpose(0, 2, 1), Ff))
+    if K == 0:
+        Ef = pt.logm_blk(U)
+    else:
+        Ef = 1. / K * (pt.powm_blk(U, K) - pt.I3X3)
+    if np.any(la.det(Ff) <= 0.):
+        pu.report_and_raise_error("negative Jacobian encountered")
+    return pt.to_array_blk(Ff, sym=False), pt.to_array_blk(Ef)
+
+
+def right_stretch_blk(K, E):
+    """Blocked version of right_stretch, E is an (N, 3, 3) array"""
+    if K == 0.:
+        return pt.expm_blk(E)
+    else:
+        return pt.powm_blk(K * E + pt.I3X3, 1. / K)
@@ -32,8 +32,10 @@ import sys
 import numpy as np
 
 import Source.__config__ as cfg
+import Source.__runopts__ as ro
 import Source.Payette_utils as pu
 import Source.Payette_model_index as pmi
+import Source.Payette_instrument as pi
 from Source.Payette_data_container import DataContainer
 from Source.Payette_input_parser import I_EQ
 
@@ -66,11 +68,41 @@ class Material:
 
         # get the material's constitutive model object
         self.model_index = pmi.ModelIndex()
-        control_file = self.model_index.control_file(mname)
-        cmod = self.model_index.constitutive_model_object(mname)
+        self._control_file = self.model_index.control_file(mname)
+        self._cmod = self.model_index.constitutive_model_object(mname)
+        self._mname, self._args = mname, args
+
+        self._set_up_model(uparams, uopts)
+
+        pass
+
+    def reset(self, mblock):
+        """Set up the material again with the parameters in mblock
+
+        The constitutive model module is not looked up and loaded again, the
+        model is instantiated from the class loaded when the material was
+        created and set up with a new material data container.
+
+        Parameters
+        ----------
+        mblock : str
+            the material block of the input file, naming the same
+            constitutive model as the block the material was created with
+
+        """
+        mname, uparams, uopts = _parse_material(mblock)
+        if mname != self._mname:
+            pu.report_and_raise_error(
+                "cannot reset material {0} to {1}".format(self._mname, mname))
+        self._set_up_model(uparams, uopts)
+        return
+
+    def _set_up_model(self, uparams, uopts):
+        """Instantiate and set up the constitutive model and material data"""
 
         # instantiate the constiutive model
-        self.constitutive_model = cmod(control_file, *args, **uopts)
+        self.constitutive_model = self._cmod(
+            self._control_file, *self._args, **uopts)
 
         # check if the model was successfully imported
         if not self.constitutive_model.imported:
@@ -116,7 +148,7 @@ Payette developers.""".format(self.constitutive_model.name, cfg.LIBRARY)
                                 "adjusted value": val2}
             continue
 
-        pass
+        return
 
     def register_default_data(self):
         """Register the default data for the material """
@@ -222,12 +254,26 @@ Payette developers.""".format(self.constitutive_model.name, cfg.LIBRARY)
 
     def update_state(self, simdat, matdat):
         """update the material state"""
+        if ro.INSTRUMENT:
+            pi.count("update_state calls")
         return self.constitutive_model.update_state(simdat, matdat)
 
+    def update_state_ensemble(self, simdat, edat):
+        """update the material state of each point in the ensemble"""
+        return self.constitutive_model.update_state_ensemble(simdat, edat)
+
     def jacobian(self, simdat, matdat, V):
         """return the material Jacobian matrix"""
         return self.constitutive_model.jacobian(simdat, matdat, V)
 
+    def numerical_jacobian(self, simdat, matdat, V):
+        """return the numerically computed material Jacobian matrix"""
+        return self.constitutive_model.numerical_jacobian(simdat, matdat, V)
+
+    def tangent(self, simdat, matdat, V):
+        """return the consistent tangent from the last state update"""
+        return self.constitutive_model.tangent(simdat, matdat, V)
+
     def initial_density(self):
         return self.constitutive_model.initial_density()
 
@@ -270,6 +270,14 @@ def main(argv):
         action="store_true",
         default=ro.KEEP,
         help="Do not overwrite old output with each run [default: %default]")
+    parser.add_option(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        default=ro.RESUME,
+        help=("Continue interrupted permutation and optimization jobs in "
+              "their existing directory, members already run are not run "
+              "again [default: %default]"))
     parser.add_option(
         "--write-vandd",
         dest="write_vandd_table",
@@ -290,13 +298,94 @@ def main(argv):
         default=ro.PROPORTIONAL,
         help=("Use proportional loading for prescribed stress"
               " components. [default: %default]"))
+    parser.add_option(
+        "--check-tangent",
+        dest="check_tangent",
+        action="store_true",
+        default=ro.CHECK_TANGENT,
+        help=("Check material tangents against numerically computed "
+              "Jacobians [default: %default]"))
+    parser.add_option(
+        "--instrument",
+        dest="instrument",
+        action="store_true",
+        default=ro.INSTRUMENT,
+        help=("Count model calls, Newton iterations, and stress solver "
+              "fallbacks and time each phase of the solid driver, a summary "
+              "of each leg is written to the log file [default: %default]"))
+    parser.add_option(
+        "--adaptive",
+        dest="adaptive",
+        action="store_true",
+        default=ro.ADAPTIVE,
+        help=("Adapt the time step of solid simulations to the response of "
+              "the material, the number of steps of each leg is the most "
+              "taken [default: %default]"))
+    parser.add_option(
+        "--adaptive-tol",
+        dest="adaptive_tol",
+        type=float,
+        default=ro.ADAPTIVE_TOL,
+        help=("Tolerance on the relative change in stress rate between "
+              "steps for --adaptive [default: %default]"))
+    parser.add_option(
+        "--history",
+        dest="history",
+        type="choice",
+        choices=("full", "ring"),
+        default=ro.HISTORY,
+        help=("Simulation data history kept in memory. full keeps every "
+              "step, ring keeps only the most recent steps [default: "
+              "%default]"))
+    parser.add_option(
+        "--snapshot-interval",
+        dest="snapshot_interval",
+        type=int,
+        default=ro.SNAPSHOT_INTERVAL,
+        help=("With --history=ring, also keep a copy of the simulation "
+              "data every N steps [default: %default]"))
+    parser.add_option(
+        "--output-format",
+        dest="output_format",
+        type="choice",
+        choices=("ascii", "binary"),
+        default=ro.OUTPUT_FORMAT,
+        help=("Output format, overrides the format given in the output "
+              "block. binary writes a memory mappable name.out.npy file "
+              "alongside name.out [default: %default]"))
+    parser.add_option(
+        "--output-chunk",
+        dest="output_chunk",
+        type=int,
+        default=ro.OUTPUT_CHUNK,
+        help=("Number of output rows buffered between writes to the "
+              "output file [default: %default]"))
+    parser.add_option(
+        "--in-memory",
+        dest="in_memory",
+        action="store_true",
+        default=ro.IN_MEMORY,
+        help=("Keep the output of optimization trials in memory and do not "
+              "write output, log, or other simulation files for them, or "
+              "create directories for the iterations. Other jobs write "
+              "their files as usual [default: %default]"))
     parser.add_option(
         "-j", "--nproc",
         dest="nproc",
         type=int,
         default=ro.NPROC,
         action="store",
-        help="Number of simultaneous jobs [default: %default]")
+        help=("Number of simultaneous jobs.  The density-temperature sweeps "
+              "of a single EOS simulation are split across this many "
+              "processes [default: %default]"))
+    parser.add_option(
+        "--xml-cache",
+        dest="xml_cache",
+        action="store_true",
+        default=ro.XML_CACHE,
+        help=("Keep the parsed material control files in a file next to "
+              "the material index, so that they are not parsed again by "
+              "later runs [default: %default]"))
     parser.add_option(
         "--check-setup",
         dest="check_setup",
@@ -42,6 +42,14 @@ import Source.__config__ as cfg
 import Source.Payette_utils as pu
 import Source.__runopts__ as ro
 
+# index files loaded, keyed by path, of (modification time, index) pairs
+_INDEXES = {}
+
+# constitutive model classes and parameterizers loaded from the interface
+# files of the installed models, keyed by (index file, model name, kind), of
+# (index modification time, object) pairs
+_LOADED = {}
+
 
 class ModelIndex(object):
     """Class for indexing installed materials
@@ -68,6 +76,7 @@ class ModelIndex(object):
 
         # initialize class data
         self._installed_constitutive_models = {}
+        self._mtime = None
 
         # load the index file if it exists
         if os.path.isfile(self.index_file):
@@ -127,6 +136,7 @@ class ModelIndex(object):
                        .format(stubf), beg="\n")
         with open(self.index_file, "wb") as fobj:
             pickle.dump(self._installed_constitutive_models, fobj)
+        _INDEXES.pop(self.index_file, None)
         pu.log_message("constitutive model information written\n")
         return
 
@@ -137,9 +147,15 @@ class ModelIndex(object):
             pu.report_and_raise_error(
                 "buildPayette must be executed to generate {0}"
                 .format(self.index_file))
-        # load it in
-        self._installed_constitutive_models = pickle.load(
-            open(self.index_file, "rb"))
+        # load it in, if not already loaded since it last changed
+        mtime = os.path.getmtime(self.index_file)
+        cached = _INDEXES.get(self.index_file)
+        if cached is None or cached[0] != mtime:
+            with open(self.index_file, "rb") as fobj:
+                cached = (mtime, pickle.load(fobj))
+            _INDEXES[self.index_file] = cached
+        self._mtime = mtime
+        self._installed_constitutive_models = dict(cached[1])
         return self._installed_constitutive_models
 
     def constitutive_model(self, model_name):
@@ -167,16 +183,49 @@ class ModelIndex(object):
         constitutive_model = self.constitutive_model(model_name)
         return constitutive_model.get("libdir")
 
+    def model_files(self, model_name):
+        """Return the files the material model_name is made of: the python
+        files of its interface, its control file and its extension library.
+        An empty list is returned if the model is not installed.
+
+        """
+        for key, val in self._installed_constitutive_models.items():
+            if model_name.lower() == key.lower() or model_name in val["aliases"]:
+                constitutive_model = val
+                break
+            continue
+        else:
+            return []
+
+        intrfc_dir = os.path.dirname(constitutive_model["interface file"])
+        files = []
+        if os.path.isdir(intrfc_dir):
+            files.extend(sorted(os.path.join(intrfc_dir, x)
+                                for x in os.listdir(intrfc_dir)
+                                if x.endswith(".py")))
+        files.append(constitutive_model["control file"])
+        files.append(os.path.join(constitutive_model["libdir"],
+                                  constitutive_model["libname"]))
+        return files
+
     def constitutive_model_object(self, model_name):
-        """ get the actual model object """
+        """ get the actual model object
+
+        The interface module, and the extension library it imports, are
+        loaded once per process.  The class is loaded again only if the
+        index file has changed since.
+
+        """
+        return self._loaded(model_name, "model", self._load_model_object)
+
+    def _load_model_object(self, model_name):
+        """ load the model object from the model's interface file """
         constitutive_model = self.constitutive_model(model_name)
-        sys.path.insert(0, constitutive_model.get("libdir"))
-        py_mod, py_path = pu.get_module_name_and_path(
-            constitutive_model["interface file"])
+        libdir = constitutive_model.get("libdir")
+        if libdir not in sys.path:
+            sys.path.insert(0, libdir)
+        py_module = _load_module(constitutive_model["interface file"])
         cls_nam = constitutive_model["class name"]
-        fobj, pathname, description = imp.find_module(py_mod, py_path)
-        py_module = imp.load_module(py_mod, fobj, pathname, description)
-        fobj.close()
         version = getattr(py_module, "PAYETTE_VERSION", None)
         if version is None:
             pu.report_and_raise_error(
@@ -198,31 +247,58 @@ class ModelIndex(object):
         del py_module
         return cmod
 
+    def _loaded(self, model_name, kind, load):
+        """ return the object of kind for model_name, calling load to load it
+        if it has not been loaded since the index file last changed """
+        key = (self.index_file, model_name.lower(), kind)
+        cached = _LOADED.get(key)
+        if cached is not None and self._mtime is not None:
+            if cached[0] == self._mtime:
+                return cached[1]
+        obj = load(model_name)
+        if self._mtime is not None:
+            _LOADED[key] = (self._mtime, obj)
+        return obj
+
     def parameterization_file(self, model_name):
         """ get the parameterize file for the material """
         constitutive_model = self.constitutive_model(model_name)
         return constitutive_model.get("parameterization file")
 
     def parameterizer(self, model_name):
-        """ get the actual model object """
+        """ get the actual model object, loaded once per process as
+        constitutive_model_object """
+        return self._loaded(model_name, "parameterizer",
+                            self._load_parameterizer)
+
+    def _load_parameterizer(self, model_name):
+        """ load the parameterizer from the model's parameterization file """
         constitutive_model = self.constitutive_model(model_name)
         if constitutive_model["parameterization file"] is None:
             return None
-        py_mod, py_path = pu.get_module_name_and_path(
-            constitutive_model["parameterization file"])
+        py_module = _load_module(constitutive_model["parameterization file"])
         cls_nam = constitutive_model["parameterization class"]
-        fobj, pathname, description = imp.find_module(py_mod, py_path)
-        py_module = imp.load_module(py_mod, fobj, pathname, description)
-        fobj.close()
         _parameterizer = getattr(py_module, cls_nam)
         del py_module
         return _parameterizer
 
 
+def _load_module(py_file):
+    """load the python module py_file"""
+    py_mod, py_path = pu.get_module_name_and_path(py_file)
+    fobj, pathname, description = imp.find_module(py_mod, py_path)
+    try:
+        py_module = imp.load_module(py_mod, fobj, pathname, description)
+    finally:
+        fobj.close()
+    return py_module
+
+
 def remove_index_file():
     """remove the index file"""
     try:
         os.remove(ro.MTLDB)
     except OSError:
         pass
+    _INDEXES.pop(ro.MTLDB, None)
     return
@@ -39,21 +39,29 @@ import numpy as np
 import scipy
 import scipy.optimize
 import math
+import hashlib
+import inspect
+import multiprocessing as mp
 from copy import deepcopy
 
 import Source.__config__ as cfg
 import Source.Payette_utils as pu
-import Source.Payette_container as pcntnr
 import Source.Payette_extract as pe
 import Source.Payette_input_parser as pip
 import Source.__runopts__ as ro
 import Source.Payette_sim_index as psi
+import Source.Payette_worker as pw
 import Toolset.KayentaParamConv as kpc
 
 # Module level variables
 IOPT = -1
 FAC = []
 FNEWEXT = ".0x312.gold"
+POOL = None
+CACHE = None
+RESUMED = {}
+RESUMED_ITERATIONS = set()
+POPULATION_METHODS = ("differential_evolution",)
 
 
 class Optimize(object):
@@ -81,6 +89,10 @@ class Optimize(object):
         self.data["fext"] = ".opt"
         self.data["options"] = []
 
+        # number of processors, used by the population based methods
+        nproc = int(ui.get_option("nproc", ro.NPROC))
+        self.data["nproc"] = min(mp.cpu_count(), nproc)
+
         # fill the data with the optimization information
         self.parse_optimization_block()
 
@@ -135,7 +147,10 @@ class Optimize(object):
         cwd = os.getcwd()
         dnam = self.data["basename"] + self.data["fext"]
         base_dir = os.path.join(cwd, dnam)
-        if not ro.KEEP:
+        if ro.RESUME and os.path.isdir(base_dir):
+            # continue the interrupted job in its directory
+            pass
+        elif not ro.KEEP:
             try:
                 shutil.rmtree(base_dir)
             except OSError:
@@ -160,12 +175,28 @@ class Optimize(object):
             pu.log_message("Running: {0}".format(self.data["basename"]),
                            noisy=True)
 
-        os.mkdir(base_dir)
+        if not os.path.isdir(base_dir):
+            os.mkdir(base_dir)
         os.chdir(base_dir)
 
         # open up the index file
         self.index = psi.SimulationIndex(base_dir)
 
+        # trials of an interrupted run are evaluated from their output rather
+        # than run again
+        global RESUMED, RESUMED_ITERATIONS
+        if ro.RESUME:
+            if ro.IN_MEMORY:
+                pu.log_warning("in memory trials write no output and are not "
+                               "resumed")
+            resumed = self.index.resume()
+            RESUMED = dict((_resume_key(v["variables"]), (k, v["outfile"]))
+                           for k, v in resumed.items())
+            RESUMED_ITERATIONS = set(resumed)
+            if self.data["verbosity"] and resumed:
+                pu.log_message("{0:d} completed trials found in {1}"
+                               .format(len(resumed), base_dir), noisy=True)
+
         # copy gold file to base_dir
 
         # Initial guess for opt_params are those from input. opt_params must
@@ -186,11 +217,29 @@ class Optimize(object):
         opt_options = {"maxiter": self.data["maximum iterations"],
                        "xtol": self.data["tolerance"],
                        "ftol": self.data["tolerance"],
-                       "disp": self.data["disp"], }
+                       "disp": self.data["disp"],
+                       "popsize": self.data["population size"],
+                       "seed": self.data["seed"], }
+
+        global POOL, CACHE
+        if self.data["cache"] is not None:
+            CACHE = psi.EvaluationCache(
+                self.data["cache"], self.digest(opt_nams, opt_params),
+                tolerance=self.data["cache tolerance"],
+                maxsize=self.data["cache size"])
+            if self.data["verbosity"] and len(CACHE):
+                pu.log_message("{0:d} cached evaluations read from {1}"
+                               .format(len(CACHE), self.data["cache"]),
+                               noisy=True)
+
+        if opt_method.lower() in POPULATION_METHODS and self.data["nproc"] > 1:
+            # the workers are forked from this process and start with the
+            # warm simulation created by check_params
+            POOL = mp.Pool(processes=self.data["nproc"])
 
         opt_params = minimize(
             func, opt_params, args=opt_args, method=opt_method,
-            bounds=opt_bounds, options=opt_options,
+            bounds=opt_bounds, options=opt_options, batch_fcn=func_batch,
         )
 
         # optimum parameters found, write out final info
@@ -229,7 +278,7 @@ class Optimize(object):
     def finish(self):
         r""" finish up the optimization job """
 
-        global IOPT, FAC, FNEWEXT
+        global IOPT, FAC, FNEWEXT, POOL, CACHE, RESUMED, RESUMED_ITERATIONS
 
         # remove any temporary files
         for item in [x for x in os.listdir(os.getcwd()) if x.endswith(FNEWEXT)]:
@@ -240,8 +289,20 @@ class Optimize(object):
         IOPT = -1
         FAC = []
         FNEWEXT = ".0x312.gold"
+        RESUMED = {}
+        RESUMED_ITERATIONS = set()
+        if POOL is not None:
+            POOL.close()
+            POOL.join()
+            POOL = None
+        if CACHE is not None:
+            if self.data["verbosity"]:
+                pu.log_message("{0:d} evaluations read from cache"
+                               .format(CACHE.hits), noisy=True)
+            CACHE = None
 
         self.index.dump()
+        pw.clear(self.data["baseinp"])
 
         return
 
@@ -267,7 +328,9 @@ class Optimize(object):
             "simplex": {"method": "Nelder-Mead", "name": "fmin"},
             "powell": {"method": "Powell", "name": "fmin_powell"},
             "cobyla": {"method": "COBYLA", "name": "fmin_cobyla"},
-            "slsqp": {"method": "SLSQP", "name": "fmin_slsqp"}}
+            "slsqp": {"method": "SLSQP", "name": "fmin_slsqp"},
+            "differential_evolution": {"method": "differential_evolution",
+                                       "name": "differential_evolution"}}
 
         # default method
         opt_method = allowed_methods["simplex"]
@@ -286,7 +349,7 @@ class Optimize(object):
         # get method
         method = self.find_oblock_option("method")
         if method is not None:
-            method = method.lower()
+            method = "_".join(method.lower().split())
             opt_method = allowed_methods.get(method)
             if opt_method is None:
                 pu.report_and_raise_error("invalid method {0}".format(method))
@@ -294,6 +357,24 @@ class Optimize(object):
         # tolerance, maxiter
         tolerance = float(self.find_oblock_option("tolerance", 1.e-4))
         maxiter = int(self.find_oblock_option("maxiter", 20))
+        popsize = self.find_oblock_option("popsize")
+        if popsize is not None:
+            popsize = int(popsize)
+        seed = self.find_oblock_option("seed")
+        if seed is not None:
+            seed = int(seed)
+
+        # number of processors, given in the block or as a simulation option
+        nproc = self.find_oblock_option("nproc")
+        if nproc is not None:
+            self.data["nproc"] = min(mp.cpu_count(), int(nproc))
+
+        # persistent cache of evaluations
+        cache_tol = float(self.find_oblock_option("cache tolerance", 0.))
+        cache_size = int(self.find_oblock_option("cache size", 10000))
+        cache = self.find_oblock_option("cache")
+        if cache is not None:
+            cache = os.path.join(os.getcwd(), cache)
         disp = self.find_oblock_option("disp", False)
         if disp:
             if re.search(r"(?i)\bfalse\b", disp) or re.search(r"\b0\b", disp):
@@ -393,7 +474,7 @@ class Optimize(object):
             if not os.path.isfile(fnam):
                 pu.report_error("gold file {0} not found".format(fnam))
             else:
-                gold_f = fnam
+                gold_f = os.path.realpath(fnam)
 
         # check that minimum info was given
         if min_legacy["vars"]:
@@ -439,6 +520,12 @@ class Optimize(object):
         self.data["obj file"] = objmod.__file__
         self.data["maximum iterations"] = maxiter
         self.data["tolerance"] = tolerance
+        self.data["population size"] = popsize
+        self.data["seed"] = seed
+        self.data["cache"] = cache
+        self.data["cache tolerance"] = cache_tol
+        self.data["cache size"] = cache_size
+        self.data["gold file"] = gold_f
         self.data["optimization method"] = opt_method
         self.data["disp"] = disp
 
@@ -463,12 +550,55 @@ class Optimize(object):
         for key, val in self.data["optimize"].items():
             preprocessor += "{0} = {1}\n".format(key, val["initial value"])
         ui = pip.preprocess(self.data["baseinp"], preprocessor=preprocessor)
-        the_model = pcntnr.Payette(ui)
+        the_model = pw.simulation(ui, self.data["baseinp"],
+                                  in_memory=ro.IN_MEMORY)
         if pu.warn_count():
             pu.report_and_raise_error("Stopping due to initial warnings")
+
+        # files of the material model, used by digest
+        cmod = the_model.material.constitutive_model
+        self.data["model files"] = [inspect.getsourcefile(cmod.__class__),
+                                    cmod.control_file]
+
         the_model.finish(wipeall=True)
         return
 
+    def digest(self, opt_nams, opt_params):
+        r"""Digest of everything other than the trial parameters that the
+        error of a trial depends on: the base input, the objective function,
+        the gold file, the material model and library, and the normalization
+        of the optimized parameters.
+
+        Parameters
+        ----------
+        opt_nams : list
+            Names of the optimized parameters
+        opt_params : list
+            Initial values of the optimized parameters
+
+        Returns
+        -------
+        digest : str
+
+        """
+        digest = hashlib.sha1(self.data["baseinp"])
+        digest.update(repr(zip(opt_nams, normalization_factors(opt_params))))
+        for fnam in [self.data["obj file"], self.data["gold file"]]:
+            digest.update(repr(fnam))
+            if fnam is not None and os.path.isfile(fnam):
+                digest.update(open(fnam, "rb").read())
+            continue
+        for fnam in self.data["model files"]:
+            if fnam is not None and os.path.isfile(fnam):
+                digest.update(open(fnam, "rb").read())
+            continue
+        if os.path.isdir(cfg.LIBRARY):
+            for fnam in sorted(os.listdir(cfg.LIBRARY)):
+                fstat = os.stat(os.path.join(cfg.LIBRARY, fnam))
+                digest.update(repr((fnam, fstat.st_size, fstat.st_mtime)))
+                continue
+        return digest.hexdigest()
+
     def find_oblock_option(self, option, default=None):
         option = ".*".join(option.split())
         pat = r"(?i)\b{0}\s".format(option)
@@ -486,7 +616,7 @@ class Optimize(object):
 
 
 def minimize(fcn, x0, args=(), method="Nelder-Mead",
-             bounds=None, options={}):
+             bounds=None, options={}, batch_fcn=None):
     r"""Wrapper to the supported minimization methods
 
     Parameters
@@ -502,11 +632,13 @@ def minimize(fcn, x0, args=(), method="Nelder-Mead",
         (Jacobian, Hessian).
     method : str, optional
         Type of solver. Should be one of:
-            {"Nelder-Mead", "Powell", "COBYLA"}
+            {"Nelder-Mead", "Powell", "COBYLA", "differential_evolution"}
     bounds : sequence, optional
-        Bounds for variables (only for COBYLA). (min, max) pairs for each
-        element in x, defining the bounds on that parameter. Use None for one
-        of min or max when there is no bound in that direction.
+        Bounds for variables (only for COBYLA and differential_evolution).
+        (min, max) pairs for each element in x, defining the bounds on that
+        parameter. Use None for one of min or max when there is no bound in
+        that direction. differential_evolution requires both bounds for each
+        element.
     options : dict, optional
         A dictionary of solver options. All methods accept the following
         generic options:
@@ -518,6 +650,15 @@ def minimize(fcn, x0, args=(), method="Nelder-Mead",
             Tolerance on func
         disp : bool
             Set to True to print convergence messages.
+        popsize : int
+            Population size (only for differential_evolution)
+        seed : int
+            Random number seed (only for differential_evolution)
+    batch_fcn : callable, optional
+        Objective function evaluating each row of a 2D array of trial points,
+        with the same extra arguments as fcn. Required by the population
+        based methods (differential_evolution), which evaluate all of the
+        members of a generation with a single call to batch_fcn.
 
     Returns
     -------
@@ -528,6 +669,7 @@ def minimize(fcn, x0, args=(), method="Nelder-Mead",
 
     global FAC
     meth = method.lower()
+    args = tuple(args)
 
     # set up args and call optimzation routine
     maxiter = options["maxiter"]
@@ -538,11 +680,7 @@ def minimize(fcn, x0, args=(), method="Nelder-Mead",
     # optimization methods work best with number around 1, here we
     # normalize the optimization variables and save the multiplier to be
     # used when the function gets called by the optimizer.
-    for val in x0:
-        mag_val = eval("1.e" + "{0:12.6E}".format(val).split("E")[1])
-        FAC.append(mag_val)
-        continue
-    FAC = np.array(FAC)
+    FAC = normalization_factors(x0)
     x0 = x0 / FAC
 
     has_bounds = [x for j in bounds for x in j if x is not None]
@@ -593,6 +731,21 @@ def minimize(fcn, x0, args=(), method="Nelder-Mead",
             fcn, x0, cons, consargs=(),
             args=args, disp=disp)
 
+    elif meth == "differential_evolution":
+        if batch_fcn is None:
+            pu.report_and_raise_error(
+                "method {0} requires a batch objective function"
+                .format(method))
+        if not has_bounds or len(has_bounds) != 2 * len(x0):
+            pu.report_and_raise_error(
+                "method {0} requires upper and lower bounds on each "
+                "optimized parameter".format(method))
+        bounds = np.array(bounds, dtype=np.float64) / FAC[:, None]
+        xopt = differential_evolution(
+            batch_fcn, x0, bounds, args=args, maxiter=maxiter, tol=ftol,
+            popsize=options.get("popsize"), seed=options.get("seed"),
+            disp=disp)
+
     else:
         pu.report_and_raise_error(
             "ERROR: Unrecognized method {0}".format(method))
@@ -600,6 +753,183 @@ def minimize(fcn, x0, args=(), method="Nelder-Mead",
     return xopt * FAC
 
 
+def normalization_factors(x0):
+    r"""Return the multipliers normalizing the optimization variables: the
+    order of magnitude of each value in x0
+
+    """
+    fac = []
+    for val in x0:
+        mag_val = eval("1.e" + "{0:12.6E}".format(val).split("E")[1])
+        fac.append(mag_val)
+        continue
+    return np.array(fac)
+
+
+def differential_evolution(fcn, x0, bounds, args=(), maxiter=100, tol=1.e-2,
+                           popsize=None, mutation=(.5, 1.), recombination=.7,
+                           seed=None, disp=False):
+    r"""Minimize fcn by differential evolution
+
+    Each generation of the population is evaluated with a single call to
+    fcn, so that the members of the generation can be evaluated in parallel.
+
+    Parameters
+    ----------
+    fcn : callable
+        fcn(xs, *args) returns the array of objective function values at
+        each row of xs
+    x0 : ndarray
+        Initial guess, taken as the first member of the initial population
+    bounds : array_like
+        (min, max) pairs for each element in x. The population is kept
+        within the bounds.
+    args : tuple, optional
+        Extra arguments passed to fcn
+    maxiter : int, optional
+        Maximum number of generations
+    tol : float, optional
+        Relative tolerance. The population has converged when the standard
+        deviation of its objective function values is less than tol times
+        their mean.
+    popsize : int, optional
+        Population size, defaults to 10 times the number of parameters
+    mutation : tuple, optional
+        Range of the mutation constant, it is chosen randomly in the range
+        each generation (dithering)
+    recombination : float, optional
+        Crossover probability
+    seed : int, optional
+        Random number seed
+    disp : bool, optional
+        Print the best objective function value of each generation
+
+    Returns
+    -------
+    xopt : ndarray
+        The best member of the final population
+
+    Notes
+    -----
+    The DE/rand/1/bin strategy is used, the initial population is a latin
+    hypercube sampling of the bounds.
+
+    """
+    rng = np.random.RandomState(seed)
+    x0 = np.asarray(x0, dtype=np.float64)
+    lbnd, ubnd = np.asarray(bounds, dtype=np.float64).T
+    ndim = x0.shape[0]
+    npop = max(popsize or 10 * ndim, 4)
+
+    # latin hypercube sampling of the initial population
+    samples = (rng.rand(npop, ndim) + np.arange(npop)[:, None]) / npop
+    for idx in range(ndim):
+        samples[:, idx] = samples[rng.permutation(npop), idx]
+    pop = lbnd + samples * (ubnd - lbnd)
+    pop[0] = np.clip(x0, lbnd, ubnd)
+    energies = np.asarray(fcn(pop, *args), dtype=np.float64)
+
+    others = [[j for j in range(npop) if j != i] for i in range(npop)]
+    for igen in range(maxiter):
+        scale = rng.uniform(*mutation)
+        trials = np.empty_like(pop)
+        for i in range(npop):
+            r0, r1, r2 = rng.choice(others[i], 3, replace=False)
+            cross = rng.rand(ndim) < recombination
+            cross[rng.randint(ndim)] = True
+            trials[i] = np.where(
+                cross, pop[r0] + scale * (pop[r1] - pop[r2]), pop[i])
+            continue
+
+        # members mutated out of the bounds are replaced by random members
+        out = (trials < lbnd) | (trials > ubnd)
+        trials[out] = (lbnd + rng.rand(npop, ndim) * (ubnd - lbnd))[out]
+
+        trial_energies = np.asarray(fcn(trials, *args), dtype=np.float64)
+        better = trial_energies <= energies
+        pop[better] = trials[better]
+        energies[better] = trial_energies[better]
+
+        if disp:
+            pu.log_message("differential evolution generation {0:d}: "
+                           "f(x) = {1:12.6E}"
+                           .format(igen + 1, np.amin(energies)), noisy=True)
+
+        if np.std(energies) <= tol * np.abs(np.mean(energies)):
+            break
+
+        continue
+
+    return pop[np.argmin(energies)]
+
+
+def func_batch(xcalls, xnams, data, base_dir, index):
+    r"""Objective function evaluated at each row of xcalls
+
+    Each trial is given its iteration number before the trials are
+    dispatched to the process pool, so that the trial directories and the
+    simulation index are the same regardless of the order in which the
+    trials finish.
+
+    Parameters
+    ----------
+    xcalls : array_like
+        Trial values of the optimized parameters, one trial per row
+
+    Returns
+    -------
+    errors : ndarray
+        Error of each trial
+
+    """
+    errors = np.empty(len(xcalls))
+
+    # only trials not in the cache are run
+    trials = []
+    for idx, xcall in enumerate(xcalls):
+        error = None if CACHE is None else CACHE.get(xcall)
+        if error is None:
+            error = _resumed_error(xcall, xnams, data)
+        if error is None:
+            trials.append(idx)
+            continue
+        errors[idx] = error
+        continue
+
+    args = [(_next_iteration(), xcalls[idx], xnams, data, base_dir, FAC)
+            for idx in trials]
+    trials = dict((arg[0], idx) for arg, idx in zip(args, trials))
+
+    if POOL is None:
+        results = [_trial(arg) for arg in args]
+    else:
+        results = POOL.imap_unordered(_trial, args)
+
+    for iopt, error, record in sorted(results, key=lambda x: x[0]):
+        idx = trials[iopt]
+        errors[idx] = error
+        if record is not None:
+            index.store(*record)
+            if CACHE is not None:
+                CACHE.store(xcalls[idx], error)
+        continue
+    return errors
+
+
+def _trial(args):
+    """Run a single trial of func_batch, returns the trial's iteration
+    number with the results of run_trial
+
+    The normalization factors are passed with the trial, since the workers
+    of the process pool are forked before minimize sets FAC.
+
+    """
+    global FAC
+    iopt, FAC = args[0], args[-1]
+    error, record = run_trial(*args[:-1])
+    return iopt, error, record
+
+
 def func(xcall, xnams, data, base_dir, index):
 
     r"""Objective function
@@ -622,61 +952,110 @@ def func(xcall, xnams, data, base_dir, index):
 
     """
 
-    global IOPT
-    IOPT += 1
+    if CACHE is not None:
+        error = CACHE.get(xcall)
+        if error is not None:
+            return error
+
+    error = _resumed_error(xcall, xnams, data)
+    if error is not None:
+        return error
+
+    error, record = run_trial(_next_iteration(), xcall, xnams, data,
+                              base_dir)
+    if record is not None:
+        index.store(*record)
+        if CACHE is not None:
+            CACHE.store(xcall, error)
+    return error
 
-    job = data["basename"] + ".{0:03d}".format(IOPT)
-    obj_fcn = data["ObjectiveFunction"]
 
-    job_dir = os.path.join(base_dir, job)
-    os.mkdir(job_dir)
-    os.chdir(job_dir)
+def run_trial(iopt, xcall, xnams, data, base_dir):
+    r"""Run the trial of iteration iopt and evaluate its error
+
+    Parameters
+    ----------
+    iopt : int
+        Iteration number of the trial
+    xcall : array_like
+        Trial values of the optimized parameters
+    xnams : list
+        Names of the optimized parameters
+    data : dict
+        Optimization class data container
+    base_dir : str
+        Directory of the optimization job
+
+    Returns
+    -------
+    error : float
+        Error of the trial
+    record : tuple or None
+        Arguments to SimulationIndex.store for the trial, None if the trial
+        was not run
+
+    """
+    job = data["basename"] + ".{0:03d}".format(iopt)
+    obj_fcn = data["ObjectiveFunction"]
 
-    # replace the optimize variables with the updated and write params to file
+    # replace the optimize variables with the updated
     msg = []
     preprocessor = ""
     variables = {}
-    with open(os.path.join(job_dir, job + ".opt"), "w") as fobj:
-        fobj.write("Parameters for iteration {0:d}\n".format(IOPT + 1))
-        for idx, item in enumerate(zip(xnams, xcall)):
-            nam, opt_val = item
-            # Some methods do not allow for bounds and we can get negative
-            # trial values. This is a problem when optimizing, say, elastic
-            # moduli that cannot be negative since if we send a negative
-            # elastic modulus to the routine it will bomb and the optimization
-            # will stop. This is a way of forcing the optimizer to see a very
-            # large error if it tries to send in numbers above or below the
-            # user specified bounds -> essentially, we are using a penalty
-            # method of sorts to force the bounds we want.
-            lbnd, ubnd = data["optimize"][nam]["bounds"]
-            if lbnd is not None and opt_val < lbnd / FAC[idx]:
-                return 1.e3
-#            if ubnd is not None and opt_val > ubnd / FAC[idx]:
-#                return 1.e3
-
-            pstr = "{0} = {1:12.6E}".format(nam, opt_val * FAC[idx])
-            preprocessor += "{0} = {1}\n".format(nam, opt_val * FAC[idx])
-            variables[nam] = opt_val * FAC[idx]
-            fobj.write(pstr + "\n")
-            msg.append(pstr)
-            continue
+    for idx, item in enumerate(zip(xnams, xcall)):
+        nam, opt_val = item
+        # Some methods do not allow for bounds and we can get negative
+        # trial values. This is a problem when optimizing, say, elastic
+        # moduli that cannot be negative since if we send a negative
+        # elastic modulus to the routine it will bomb and the optimization
+        # will stop. This is a way of forcing the optimizer to see a very
+        # large error if it tries to send in numbers above or below the
+        # user specified bounds -> essentially, we are using a penalty
+        # method of sorts to force the bounds we want.
+        lbnd, ubnd = data["optimize"][nam]["bounds"]
+        if lbnd is not None and opt_val < lbnd / FAC[idx]:
+            return 1.e3, None
+#        if ubnd is not None and opt_val > ubnd / FAC[idx]:
+#            return 1.e3, None
+
+        preprocessor += "{0} = {1}\n".format(nam, opt_val * FAC[idx])
+        variables[nam] = opt_val * FAC[idx]
+        msg.append("{0} = {1:12.6E}".format(nam, opt_val * FAC[idx]))
+        continue
+
+    # in memory trials are run in base_dir and write no files, the output is
+    # passed directly to the objective function
+    job_dir = None
+    if not ro.IN_MEMORY:
+        job_dir = os.path.join(base_dir, job)
+        if os.path.isdir(job_dir):
+            # left by an interrupted run
+            shutil.rmtree(job_dir)
+        os.mkdir(job_dir)
+        os.chdir(job_dir)
+        with open(os.path.join(job_dir, job + ".opt"), "w") as fobj:
+            fobj.write("Parameters for iteration {0:d}\n".format(iopt + 1))
+            fobj.write("\n".join(msg) + "\n")
 
     ui = pip.preprocess(data["baseinp"], preprocessor=preprocessor)
     ui = re.sub(r"(?i)\bname\s.*", "name {0}".format(job), ui)
     if data["verbosity"]:
         pu.log_message("Iteration {0:03d}, trial parameters: {1}"
-                       .format(IOPT + 1, ", ".join(msg)),
+                       .format(iopt + 1, ", ".join(msg)),
                        noisy=True)
 
-    # instantiate Payette object
-    the_model = pcntnr.Payette(ui)
+    # get the warm Payette object for this process, reset for this trial
+    the_model = pw.simulation(ui, data["baseinp"], in_memory=ro.IN_MEMORY)
 
     # run the job
     solve = the_model.run_job()
 
-    # store the data to the index
-    index.store(int(IOPT), the_model.name, the_model.simdir,
-                variables, the_model.outfile)
+    # the data to store to the index
+    record = (int(iopt), the_model.name, job_dir,
+              variables, the_model.outfile)
+
+    if ro.IN_MEMORY:
+        output = the_model.output()
 
     the_model.finish()
 
@@ -688,6 +1067,9 @@ def func(xcall, xnams, data, base_dir, index):
     if retcode != 0:
         pu.report_and_raise_error("simulation failed")
 
+    if ro.IN_MEMORY:
+        return obj_fcn.evaluate(output), record
+
     # extract minimization variables from the simulation output
     out_f = os.path.join(job_dir, job + ".out")
     if not os.path.isfile(out_f):
@@ -701,4 +1083,40 @@ def func(xcall, xnams, data, base_dir, index):
     # go back to the base_dir
     os.chdir(base_dir)
 
-    return error
+    return error, record
+
+
+def _resumed_error(xcall, xnams, data):
+    """Return the error of the trial xcall if it was run by an interrupted
+    run of the job, None otherwise
+
+    """
+    global IOPT
+    if not RESUMED:
+        return None
+    variables = dict((nam, val * FAC[idx])
+                     for idx, (nam, val) in enumerate(zip(xnams, xcall)))
+    resumed = RESUMED.get(_resume_key(variables))
+    if resumed is None:
+        return None
+    # the trials after it are numbered as they were by the interrupted run
+    iopt, outfile = resumed
+    IOPT = max(IOPT, iopt)
+    return data["ObjectiveFunction"].evaluate(outfile)
+
+
+def _next_iteration():
+    """Return the iteration number of the next trial run, numbers of trials
+    of an interrupted run are not reused
+
+    """
+    global IOPT
+    IOPT += 1
+    while IOPT in RESUMED_ITERATIONS:
+        IOPT += 1
+    return IOPT
+
+
+def _resume_key(variables):
+    """Key of the trial with the parameter values variables in RESUMED"""
+    return tuple(sorted(variables.items()))
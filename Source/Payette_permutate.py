@@ -39,9 +39,9 @@ from copy import deepcopy
 from itertools import izip, product
 
 import Source.Payette_utils as pu
-import Source.Payette_container as pc
 import Source.Payette_input_parser as pip
 import Source.Payette_sim_index as psi
+import Source.Payette_worker as pw
 import Source.__runopts__ as ro
 from Source.Payette_utils import PayetteError
 
@@ -118,11 +118,19 @@ class Permutate(object):
 
         """
 
+        if ro.IN_MEMORY:
+            # the permutation index and its readers need the output files
+            pu.log_warning("permutation jobs are not run in memory")
+
         # make the directory to run the job
         cwd = os.path.realpath(os.getcwd())
         dnam = self.data["basename"] + self.data["fext"]
         base_dir = os.path.join(cwd, dnam)
-        if not ro.KEEP:
+        if ro.RESUME and os.path.isdir(base_dir):
+            # continue the interrupted job in its directory
+            pass
+
+        elif not ro.KEEP:
             try:
                 shutil.rmtree(base_dir)
             except OSError:
@@ -148,30 +156,47 @@ class Permutate(object):
             pu.log_message("Running: {0}".format(self.data["basename"]),
                            noisy=True)
 
-        os.mkdir(base_dir)
+        if not os.path.isdir(base_dir):
+            os.mkdir(base_dir)
         os.chdir(base_dir)
 
         # open up the index file
         self.index = psi.SimulationIndex(base_dir)
 
+        # jobs of an interrupted run that were completed are not run again
+        resumed = {}
+        if ro.RESUME:
+            resumed = self.index.resume()
+            if self.data["verbosity"] and resumed:
+                pu.log_message("{0:d} completed jobs found in {1}"
+                               .format(len(resumed), base_dir), noisy=True)
+
         # Save additional arguments to func in the global FARGS. This would be
         # handled better using something similar to scipy.optimize.py's
         # wrap_function, but that is not compatible with Pool.map.
-        args = ((x, self.param_names, self.data, base_dir, self.index)
-                for x in self.param_ranges)
+        args = ((x, self.param_names, self.data, base_dir)
+                for x in self.param_ranges
+                if not _completed(x, self.param_names, resumed))
 
         if self.data["nproc"] == 1:
-            results = [func(arg) for arg in args]
+            results = (func(arg) for arg in args)
 
         else:
+            # the workers are forked from this process and start with the
+            # warm simulation created by check_params
             pool = mp.Pool(processes=self.data["nproc"])
-            results = pool.map(func, args)
-            pool.close()
-            pool.join()
-            del pool
+            results = pool.imap_unordered(func, args)
 
+        # each job is stored to the index as it completes, so that it is not
+        # lost if the permutation job is interrupted
         for result in results:
             self.index.store(*result)
+            continue
+
+        if self.data["nproc"] != 1:
+            pool.close()
+            pool.join()
+            del pool
         os.chdir(cwd)
 
         if self.data["verbosity"]:
@@ -194,6 +219,7 @@ class Permutate(object):
         r""" finish up the permutation job """
 
         self.index.dump()
+        pw.clear(self.data["baseinp"])
         return
 
     def parse_permutation_block(self):
@@ -436,7 +462,7 @@ class Permutate(object):
         for i, name in enumerate(self.param_names):
             preprocessor += "{0} = {1}\n".format(name, self.initial_vals[i])
         ui = pip.preprocess(self.data["baseinp"], preprocessor=preprocessor)
-        the_model = pc.Payette(ui)
+        the_model = pw.simulation(ui, self.data["baseinp"])
         if pu.warn_count():
             pu.report_and_raise_error("Stopping due to initial warnings")
         the_model.finish(wipeall=True)
@@ -477,6 +503,18 @@ def _get_psequence(a, b=None, N=None, method=None, seed=None):
     return
 
 
+def _completed(xcall, xnams, resumed):
+    """Return True if the job xcall of the permutation job was completed by
+    an earlier run with the same parameters
+
+    """
+    job_id, xcall = xcall
+    entry = resumed.get(job_id)
+    if entry is None:
+        return False
+    return entry["variables"] == dict(zip(xnams, xcall))
+
+
 def func(args):
     r"""Objective function
 
@@ -501,12 +539,15 @@ def func(args):
 
     """
 
-    xcall, xnams, data, base_dir, index = args
+    xcall, xnams, data, base_dir = args
     job_id, xcall = xcall[0], xcall[1]
 
     job = data["basename"] + "." + job_id
 
+    # the directory of a job that was interrupted is run again
     job_dir = os.path.join(base_dir, job)
+    if os.path.isdir(job_dir):
+        shutil.rmtree(job_dir)
     os.mkdir(job_dir)
     os.chdir(job_dir)
 
@@ -530,8 +571,8 @@ def func(args):
         pu.log_message("Running job {0:s}, parameters: {1}"
                        .format(job_id, ", ".join(msg)), noisy=True)
 
-    # instantiate Payette object
-    the_model = pc.Payette(ui)
+    # get the warm Payette object for this process, reset for this trial
+    the_model = pw.simulation(ui, data["baseinp"])
 
     # write out the input file, not actually used, but nice to have
     the_model.write_input = True
@@ -36,7 +36,6 @@ M. Scot Swan, Sandia National Laboratories, mswan@sandia.gov
 """
 import sys
 import os
-import pickle
 import optparse
 import time
 import multiprocessing as mp
@@ -47,11 +46,8 @@ from textwrap import fill as textfill
 import Source.__config__ as cfg
 import Source.Payette_utils as pu
 import Source.Payette_container as pcntnr
-import Source.Payette_optimize as po
-import Source.Payette_permutate as pp
-import Source.Payette_barf as pb
-import Source.Payette_parameterize as pparam
 import Source.Payette_input_parser as pip
+import Source.Payette_xml_parser as px
 import Source.__runopts__ as ro
 from Source.Payette_utils import PayetteError as PayetteError
 
@@ -79,8 +75,8 @@ def run_payette(siminp=None, restart=False, timing=False, barf=False,
     siminp : str
         all simulation input
     restart : bool, [restart file]
-        If restart is not false, it is expected to be the name of a restart
-        file
+        If restart is not false, it is expected to be a list of restart
+        files, written by Payette.write_restart, of simulations to continue
     timing : bool
         perform timing, or not
     barf : bool, [barf file]
@@ -106,9 +102,8 @@ def run_payette(siminp=None, restart=False, timing=False, barf=False,
     user_input_sets = {}
     if restart:
         for item in restart:
-            with open(item, "rb") as ftmp:
-                the_model = pickle.load(ftmp)
-                user_input_sets[the_model.name] = the_model
+            checkpoint = pcntnr.load_restart(item)
+            user_input_sets[checkpoint["name"]] = checkpoint
         restart = True
 
     elif barf:
@@ -209,26 +204,31 @@ def _run_job(args):
 
     t0 = time.time()
 
-    # instantiate Payette object
+    # instantiate Payette object. the modules for barf, optimization,
+    # permutation, and parameterization jobs, and scipy, are imported only
+    # when a job needs them so that starting payette for a simulation is fast
     error, the_model = False, None
     try:
         if restart:
-            the_model = user_input
-            the_model.setup_restart()
+            the_model = pcntnr.Payette(user_input["input"], restart=user_input)
 
         elif barf:
+            import Source.Payette_barf as pb
             the_model = pb.PayetteBarf(user_input)
 
         elif re.search(r"(?i)\boptimization\b.*", user_input):
             # intantiate the Optimize object
+            import Source.Payette_optimize as po
             the_model = po.Optimize(user_input)
 
         elif re.search(r"(?i)\bpermutation\b.*", user_input):
             # intantiate the Optimize object
+            import Source.Payette_permutate as pp
             the_model = pp.Permutate(user_input)
 
         elif re.search(r"(?i)\bparameterization\b.*", user_input):
             # intantiate the Optimize object
+            import Source.Payette_parameterize as pparam
             the_model = pparam.parameterizer(user_input)
 
         else:
@@ -296,6 +296,10 @@ def _run_job(args):
     # write timing info
     write_timing_info(t0, t1, t2, the_model.name, timing)
 
+    # write the material control files parsed by the job to the on disk
+    # cache, before the job's options are restored
+    px.dump_cache()
+
     # finish up
     the_model.finish()
 
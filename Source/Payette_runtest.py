@@ -40,6 +40,7 @@ import imp
 import os
 import time
 import shutil
+import signal
 import multiprocessing as mp
 from pickle import dump, load
 import datetime
@@ -52,7 +53,8 @@ import Source.__config__ as cfg
 import Source.__runopts__ as ro
 import Source.Payette_utils as pu
 from Source.Payette_test import (find_tests, WIDTH_TERM, WIDTH_INFO,
-                                 TEST_INFO, RESDIR, CWD, get_test, TEST_STATUSES)
+                                 TEST_INFO, RESDIR, CWD, get_test, TEST_STATUSES,
+                                 PERFDIR)
 from Source.Payette_utils import PayetteError as PayetteError
 from Source.Payette_utils import PassThroughOptionParser
 
@@ -110,12 +112,37 @@ def main(argv, print_help=False):
         dest="FORCERERUN",
         action="store_true",
         default=False,
-        help="Force benchmarks to be run again [default: %default]")
+        help=("Force benchmarks to be run again, even if they and the files "
+              "they depend on are unchanged [default: %default]"))
     parser.add_option(
         "-j", "--nproc",
         dest="NPROC",
         default="1",
         action="store")
+    parser.add_option(
+        "--timeout",
+        dest="TIMEOUT",
+        type=float,
+        default=None,
+        action="store",
+        help=("Kill benchmarks that run longer than TIMEOUT seconds "
+              "[default: %default]"))
+    parser.add_option(
+        "--in-process",
+        dest="INPROCESS",
+        action="store_true",
+        default=False,
+        help=("Run benchmarks in long lived worker processes that run payette "
+              "directly rather than in a new payette process for each "
+              "benchmark [default: %default]"))
+    parser.add_option(
+        "--performance",
+        dest="PERFORMANCE",
+        action="store_true",
+        default=False,
+        help=("Run the performance benchmarks, one at a time, and compare "
+              "their speed with the baseline, -b rebaselines their speed "
+              "[default: %default]"))
     parser.add_option(
         "-p", "--postprocess",
         dest="POSTPROCESS",
@@ -172,14 +199,17 @@ def main(argv, print_help=False):
         forcererun=opts.FORCERERUN, nproc=nproc, postprocess=opts.POSTPROCESS,
         ignoreerror=opts.IGNOREERROR, switch=opts.SWITCH,
         rebaseline=opts.REBASELINE, index=opts.INDEX,
-        index_name=opts.INDEX_NAME, wipe=opts.WIPE, runcwd=opts.c))
+        index_name=opts.INDEX_NAME, wipe=opts.WIPE, runcwd=opts.c,
+        in_process=opts.INPROCESS, timeout=opts.TIMEOUT,
+        performance=opts.PERFORMANCE))
 
 
 def test_payette(args, testbase=None, builtin=False, keywords=[], nokeywords=[],
                  spectests=[], benchdirs=[], forcererun=False, nproc=1,
                  postprocess=False, ignoreerror=False,
                  switch=None, rebaseline=False, index=False,
-                 index_name=False, wipe=False, runcwd=False):
+                 index_name=False, wipe=False, runcwd=False,
+                 in_process=False, timeout=None, performance=False):
     """Run the Payette benchmarks.
 
     Walk through and run the Payette test simulations, compare results
@@ -202,7 +232,7 @@ def test_payette(args, testbase=None, builtin=False, keywords=[], nokeywords=[],
     benchdirs : list {[]}
         additional directories to search for tests
     forcererun : bool {False}
-        force tests to be run that were already run
+        force tests to be run that were already run and are unchanged
     nproc : int {1}
         number of simultaneous jobs to run
     postprocess : bool {False}
@@ -218,18 +248,35 @@ def test_payette(args, testbase=None, builtin=False, keywords=[], nokeywords=[],
         write index [_name] and exit
     wipe : bool {False}
         Wipe test directory first
+    in_process : bool {False}
+        Run tests in worker processes that run payette in process
+    timeout : float {None}
+        Kill tests that run longer than timeout seconds
+    performance : bool {False}
+        Run the performance benchmarks rather than the regression benchmarks.
+        They are always run, one at a time, and rebaseline rebaselines their
+        speed.
 
     """
     if switch is not None:
         pu.log_warning("switching materials is an untested feature")
 
-    # number of processors
+    # number of processors. performance benchmarks are run one at a time so
+    # that they do not compete with each other for the processor
     nproc = min(mp.cpu_count(), nproc)
+    # keywords are added below, do not modify the caller's (or default) lists
+    keywords, nokeywords = list(keywords), list(nokeywords)
+    if performance:
+        nproc = 1
+        forcererun = True
+        keywords.append("performance")
+    else:
+        nokeywords.append("performance")
 
     ro.set_global_option("VERBOSITY", 0)
     pu.log_message(cfg.INTRO, pre="", noisy=True)
 
-    if rebaseline:
+    if rebaseline and not performance:
         sys.exit(rebaseline_tests(args))
 
     # find tests
@@ -284,7 +331,7 @@ def test_payette(args, testbase=None, builtin=False, keywords=[], nokeywords=[],
         no_write = True
 
     if not tests:
-        test_dirs = cfg.TESTS
+        test_dirs = [PERFDIR] if performance else cfg.TESTS
         for dirnam in benchdirs:
             dirnam = os.path.expanduser(dirnam)
             if not os.path.isdir(dirnam):
@@ -356,8 +403,9 @@ def test_payette(args, testbase=None, builtin=False, keywords=[], nokeywords=[],
         os.makedirs(testbase)
 
 
-    summhtml = os.path.join(testbase, "summary.html")
-    respkl = os.path.join(testbase, "Previous_Results.pkl")
+    prefix = "Performance_" if performance else ""
+    summhtml = os.path.join(testbase, prefix.lower() + "summary.html")
+    respkl = os.path.join(testbase, "Previous_{0}Results.pkl".format(prefix))
     try:
         prev_tests = load(open(respkl, "r"))
     except IOError:
@@ -368,19 +416,28 @@ def test_payette(args, testbase=None, builtin=False, keywords=[], nokeywords=[],
                    pre="", noisy=True)
     pu.log_message("=" * WIDTH_TERM, pre="", noisy=True)
 
-    # run the tests on multiple processors using the multiprocessor map ONLY f
-    # nprocs > 1. For debug purposes, when nprocs=1, run without using the
-    # multiprocessor map because it makes debugging worse than it should be.
-    topts = (testbase, postprocess, switch,)
-    test_inp = ((test, topts, prev_tests, forcererun) for test in tests)
-    if nproc == 1:
-        all_results = [_run_test(job) for job in test_inp]
+    # the summary is rewritten as each test completes
+    report = _ProgressReport(None if no_write else summhtml, len(tests))
+
+    # run the tests on multiple processors using worker processes ONLY if
+    # nprocs > 1, the tests are to be run in process, or timed out. For debug
+    # purposes, when nprocs=1, run without using worker processes because it
+    # makes debugging worse than it should be. The tests that took longest
+    # the last time they were run are started first.
+    topts = (testbase, postprocess, switch, rebaseline)
+    test_inp = [(test, topts, prev_tests, forcererun)
+                for test in schedule_tests(tests, prev_tests)]
+    if nproc == 1 and not in_process and timeout is None:
+        all_results = []
+        for job in test_inp:
+            all_results.append(_run_test(job))
+            report(all_results[-1])
+            continue
 
     else:
-        pool = mp.Pool(processes=nproc)
-        all_results = pool.map(_run_test, test_inp)
-        pool.close()
-        pool.join()
+        all_results = _run_tests_in_workers(
+            test_inp, nproc, in_process=in_process, timeout=timeout,
+            callback=report)
 
     t_run = time.time() - t_start
     pu.log_message("=" * WIDTH_TERM, pre="", noisy=True)
@@ -483,17 +540,22 @@ def _run_test(args):
     # pass args to local variables
     test, setup_args, prev_tests, forcererun = args
 
-    # check if benchmark has been run
-    ran = [x for x in prev_tests if x.name == test.name]
+    # check if benchmark has been run and nothing it depends on has changed
+    # since
+    test.fingerprint = test.compute_fingerprint()
+    ran = [x for x in prev_tests if x.name == test.name and
+           getattr(x, "fingerprint", None) == test.fingerprint]
     if not forcererun and ran:
         prev_test = ran[0]
         pu.log_message("""\
 {0}{1}{2:>10s}
-Test already ran.  Use -F option to force a rerun
+Test already ran and is unchanged.  Use -F option to force a rerun
 """.format( test.name, " " * (50 - len(test.name)), test.status),
                        pre="", noisy=True)
         if test.old_status is None:
             test.old_status = prev_test.status
+            if prev_test.status == "NOT RUN":
+                test.old_status = prev_test.old_status
         return test
 
     test.setup_test(*setup_args)
@@ -508,6 +570,224 @@ Test already ran.  Use -F option to force a rerun
     return test
 
 
+def schedule_tests(tests, prev_tests):
+    """Order tests longest first by the time they took when last run
+
+    Tests that have not been run before, or whose time is not known, are
+    scheduled first.
+
+    Parameters
+    ----------
+    tests : list
+        tests to run
+    prev_tests : list
+        results of the previous test run
+
+    Returns
+    -------
+    tests : list
+        the tests, longest first
+
+    """
+    times = {}
+    for prev_test in prev_tests:
+        times[prev_test.name] = prev_test.completion_time()
+        continue
+    key = lambda test: -(times.get(test.name) or float("inf"))
+    return sorted(tests, key=key)
+
+
+class _ProgressReport(object):
+    """Rewrite the html summary each time a test completes"""
+
+    def __init__(self, summhtml, ntests):
+        self.summhtml = summhtml
+        self.ntests = ntests
+        self.results = []
+
+    def __call__(self, test):
+        self.results.append(test)
+        if self.summhtml is not None:
+            write_html_summary(self.summhtml, self.results,
+                               remaining=self.ntests - len(self.results))
+        return
+
+
+def _run_tests_in_workers(test_inp, nproc, in_process=False, timeout=None,
+                          callback=None):
+    """Run the tests in worker processes
+
+    Tests are sent to the workers one at a time, in the order given, as the
+    workers become free. A test that runs longer than its timeout is killed,
+    along with the processes it started, and its worker replaced.
+
+    If in_process, each worker runs payette in process for each test it is
+    sent, avoiding the cost of starting a new payette process for every test.
+    A worker is then replaced by a new one after any test it runs does not
+    pass, so that a crashed or corrupted worker does not affect other tests.
+
+    Parameters
+    ----------
+    test_inp : iterable
+        arguments to _run_test for each test
+    nproc : int
+        number of workers
+    in_process : bool, optional
+        run payette in the worker processes
+    timeout : float, optional
+        seconds a test may run before it is killed, tests that set their
+        own timeout attribute use it instead
+    callback : callable, optional
+        called with each test as it completes
+
+    Returns
+    -------
+    all_results : list
+        the tests, in the order given
+
+    """
+    jobs = list(test_inp)
+    all_results = [None] * len(jobs)
+    pending = range(len(jobs))[::-1]
+    workers = [_TestWorker(in_process) for i in range(min(nproc, len(jobs)))]
+
+    try:
+        while pending or any(x.job is not None for x in workers):
+            idle = True
+            for i, worker in enumerate(workers):
+                if worker.job is None:
+                    if pending:
+                        worker.send(pending.pop(), jobs)
+                        idle = False
+                    continue
+
+                test, recycle = None, True
+                test_timeout = jobs[worker.job][0].timeout or timeout
+                if worker.conn.poll():
+                    try:
+                        test, recycle = worker.conn.recv()
+                    except (EOFError, IOError):
+                        pass
+                elif not worker.proc.is_alive():
+                    pass
+                elif (test_timeout is not None and
+                      time.time() - worker.t_start > test_timeout):
+                    worker.kill()
+                    test = _not_completed(jobs[worker.job][0],
+                                          "timeoutcode", "timed out")
+                else:
+                    continue
+
+                idle = False
+                if test is None:
+                    test = _not_completed(jobs[worker.job][0],
+                                          "failtoruncode", "died")
+                all_results[worker.job] = test
+                worker.job = None
+                if callback is not None:
+                    callback(test)
+
+                if recycle:
+                    worker.stop()
+                    workers[i] = _TestWorker(in_process)
+                continue
+
+            if idle:
+                time.sleep(.01)
+            continue
+
+    finally:
+        for worker in workers:
+            worker.stop()
+
+    return all_results
+
+
+def _not_completed(test, code, reason):
+    """Set the status of a test whose worker did not complete it"""
+    pu.log_warning("worker running {0} {1}".format(test.name, reason))
+    test.retcode = getattr(test, code)
+    test.status = test.get_status()
+    test.completion_time(0.)
+    test.retdir = os.getcwd()
+    test.finish_test()
+    return test
+
+
+class _TestWorker(object):
+    """A worker process running tests sent to it through a pipe"""
+
+    def __init__(self, in_process):
+        self.conn, conn = mp.Pipe()
+        self.proc = mp.Process(target=_test_worker, args=(conn, in_process))
+        self.proc.start()
+        conn.close()
+        self.job = None
+        self.t_start = None
+
+    def send(self, job, jobs):
+        self.job = job
+        self.t_start = time.time()
+        self.conn.send(jobs[job])
+        return
+
+    def kill(self):
+        """Kill the worker and the processes it started"""
+        try:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        self.proc.join()
+        return
+
+    def stop(self):
+        if self.proc.is_alive():
+            try:
+                self.conn.send(None)
+            except IOError:
+                pass
+            self.proc.join(5.)
+            if self.proc.is_alive():
+                self.kill()
+        self.proc.join()
+        self.conn.close()
+        return
+
+
+def _test_worker(conn, in_process):
+    """Run tests received on conn until None is received"""
+    import Source.Payette_test as pt
+    pt.IN_PROCESS = in_process
+
+    # put the worker in its own process group so that it can be killed along
+    # with any payette processes it starts
+    os.setpgrp()
+
+    # tests that call run_payette directly change the global options, restore
+    # them before each test
+    options = ro.save_options()
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        ro.load_options(options)
+        pu.setup_logger(None)
+        pu.reset_error_and_warnings()
+        try:
+            test = _run_test(job)
+            recycle = in_process and test.status != "PASS"
+        except Exception as error:
+            test = job[0]
+            test.retcode = test.failtoruncode
+            test.status = test.get_status()
+            pu.log_warning("{0}: {1}".format(test.name, error))
+            recycle = True
+        conn.send((test, recycle))
+        continue
+    conn.close()
+    return
+
+
 def dump_results(fpath, all_results):
     dump(all_results, open(fpath, "w"))
     return
@@ -526,7 +806,7 @@ def dump_results(fpath, all_results):
     return
 
 
-def write_html_summary(fname, results):
+def write_html_summary(fname, results, remaining=0):
     """ write summary of the results dictionary to html file """
     resd = os.path.dirname(fname)
 
@@ -547,6 +827,8 @@ def write_html_summary(fname, results):
         fobj.write("<li> Directory: {0} </li>\n".format(resd))
         fobj.write("<li> Options: {0} </li>\n".format(" ".join(sys.argv[1:])))
         fobj.write("<li> {0} </li>\n".format(statstr))
+        if remaining:
+            fobj.write("<li> {0:3d} still running </li>\n".format(remaining))
         fobj.write("</ul>\n")
 
         # write out details for different statuses
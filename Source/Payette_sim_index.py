@@ -31,19 +31,33 @@ optimization simulations
 """
 import os
 import sys
+import time
+from collections import OrderedDict
 
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
 
+import Source.Payette_utils as pu
 from Source.Payette_utils import who_is_calling
 import Source.__runopts__ as ro
 
+# extension of the journal written alongside the index file
+JOURNAL_EXT = ".journal"
+
+# the index file is rewritten, and the journal emptied, when more than this
+# many seconds have passed since it was last written
+DUMP_INTERVAL = 300.
+
 
 class SimulationIndex(object):
     """Class for indexing simulatons run for permutation and optimization jobs
 
+    Each stored simulation is appended to a journal alongside the index file,
+    so that the simulations of an interrupted job are known when the job is
+    run again. The journal is folded in to the index file when it is dumped.
+
     """
     def __init__(self, base_dir=None, index_file=None):
         """Initialize the SimulationIndex object
@@ -72,7 +86,8 @@ class SimulationIndex(object):
                 # default index file name
                 self._index_file = os.path.join(base_dir, "index.pkl")
         elif index_file is not None:
-            if not os.path.isfile(index_file):
+            if (not os.path.isfile(index_file) and
+                not os.path.isfile(index_file + JOURNAL_EXT)):
                 pu.report_and_raise_error("index_file not found")
             else:
                 # default index file name
@@ -80,39 +95,102 @@ class SimulationIndex(object):
         else:
             pu.report_and_raise_error(
                 "One of base_dir or index_file must be specified")
+        self._journal = self._index_file + JOURNAL_EXT
 
         # initialize class data
         self.index = {}
         self.loaded_index = {}
+        self._dumped = time.time()
 
         # load the index file if it exists
-        if os.path.isfile(self._index_file):
+        if os.path.isfile(self._index_file) or os.path.isfile(self._journal):
             self.load()
 
     def store(self, key, name, job_dir, variables, outfile):
-        """Store all kwargs in to the index dict"""
-        self.index[key] = {
-            "name": name, "directory": job_dir, "variables": variables,
-            "outfile": outfile}
+        """Store all kwargs in to the index dict and append them to the
+        journal
+
+        """
+        entry = {"name": name, "directory": job_dir, "variables": variables,
+                 "outfile": outfile}
+        self.index[key] = entry
+        if time.time() - self._dumped > DUMP_INTERVAL:
+            self.dump()
+            return
+        with open(self._journal, "ab") as fobj:
+            pickle.dump((key, entry), fobj, pickle.HIGHEST_PROTOCOL)
         return
 
     def dump(self):
         """Dump self.index to a file"""
-        # dup the index file
-        with open(self._index_file, "wb") as fobj:
+        # write to a temporary file first so that an interrupted dump does
+        # not leave a partial index file
+        tmp = "{0}.{1}".format(self._index_file, os.getpid())
+        with open(tmp, "wb") as fobj:
             pickle.dump(self.index, fobj)
+        os.rename(tmp, self._index_file)
+        try:
+            os.remove(self._journal)
+        except OSError:
+            pass
+        self._dumped = time.time()
         return
 
     def load(self):
-        """Load the index file"""
+        """Load the index file and the simulations in its journal"""
         # check existence of file
-        if not os.path.isfile(self._index_file):
+        if (not os.path.isfile(self._index_file) and
+            not os.path.isfile(self._journal)):
             pu.report_and_raise_error("index file {0} not found"
                                       .format(self._index_file))
         # load it in
-        self.loaded_index = pickle.load(open(self._index_file, "rb"))
+        self.loaded_index = {}
+        if os.path.isfile(self._index_file):
+            self.loaded_index.update(pickle.load(open(self._index_file, "rb")))
+        if os.path.isfile(self._journal):
+            self.loaded_index.update(self._load_journal())
         return self.loaded_index
 
+    def _load_journal(self):
+        """Return the simulations stored in the journal"""
+        index = {}
+        with open(self._journal, "r+b") as fobj:
+            end = 0
+            while True:
+                try:
+                    key, entry = pickle.load(fobj)
+                except (EOFError, pickle.UnpicklingError, ValueError,
+                        TypeError):
+                    break
+                end = fobj.tell()
+                index[key] = entry
+                continue
+
+            # drop the last record of an interrupted job if it was only
+            # partly written, records are appended after it
+            fobj.seek(0, 2)
+            if fobj.tell() > end:
+                pu.log_warning("ignoring corrupt record at the end of {0}"
+                               .format(self._journal))
+                fobj.truncate(end)
+        return index
+
+    def resume(self):
+        """Carry the loaded simulations whose output files exist over to the
+        index of this job
+
+        Returns
+        -------
+        resumed : dict
+            The simulations carried over
+
+        """
+        resumed = dict((k, v) for k, v in self.loaded_index.items()
+                       if v["outfile"] and os.path.isfile(v["outfile"]))
+        self.index.update(resumed)
+        self.dump()
+        return resumed
+
     def get_index(self):
         """Get the index file"""
         if not self.loaded_index:
@@ -124,3 +202,140 @@ class SimulationIndex(object):
 
     def index_file(self):
         return self._index_file
+
+
+class EvaluationCache(object):
+    """Persistent cache of the objective function evaluations of an
+    optimization job
+
+    Evaluations are keyed by the normalized parameter vector and are only
+    valid for the digest of the job they were made for, a hash of everything
+    other than the parameters that the error depends on. Each evaluation is
+    appended to the cache file when it is stored, so that the evaluations of
+    an interrupted job are available when the job is run again.
+
+    """
+    def __init__(self, cache_file, digest, tolerance=0., maxsize=10000):
+        """Initialize the EvaluationCache object
+
+        Parameters
+        ----------
+        cache_file : str
+          Path to the cache file, evaluations in it made for digest are loaded
+
+        digest : str
+          Digest of the optimization job
+
+        tolerance : float, optional
+          Parameter vectors match if no component differs by more than
+          tolerance. Only identical vectors match if tolerance is 0.
+
+        maxsize : int, optional
+          Maximum number of cached evaluations, the least recently used are
+          evicted first
+
+        """
+        self._cache_file = cache_file
+        self.digest = digest
+        self.tolerance = tolerance
+        self.maxsize = maxsize
+        self.hits = 0
+
+        self._entries = OrderedDict()
+        self._nrecords = 0
+        if os.path.isfile(self._cache_file):
+            self.load()
+
+    def load(self):
+        """Load the evaluations made for this job from the cache file"""
+        with open(self._cache_file, "r+b") as fobj:
+            end = 0
+            while True:
+                try:
+                    digest, key, error = pickle.load(fobj)
+                except (EOFError, pickle.UnpicklingError, ValueError,
+                        TypeError):
+                    break
+                end = fobj.tell()
+                self._nrecords += 1
+                if digest == self.digest:
+                    self._insert(key, error)
+                continue
+
+            # drop the last record of an interrupted job if it was only
+            # partly written, records are appended after it
+            fobj.seek(0, 2)
+            if fobj.tell() > end:
+                pu.log_warning("ignoring corrupt record at the end of {0}"
+                               .format(self._cache_file))
+                fobj.truncate(end)
+        return
+
+    def get(self, xcall):
+        """Return the cached error for the parameters xcall, None if the
+        error is not cached
+
+        """
+        key = _cache_key(xcall)
+        error = self._entries.pop(key, None)
+        if error is None and self.tolerance > 0.:
+            for cached in self._entries:
+                diff = max(abs(a - b) for a, b in zip(cached, key))
+                if diff <= self.tolerance:
+                    key = cached
+                    error = self._entries.pop(key)
+                    break
+                continue
+        if error is None:
+            return None
+        self._entries[key] = error
+        self.hits += 1
+        return error
+
+    def store(self, xcall, error):
+        """Cache the error for the parameters xcall and append it to the
+        cache file
+
+        """
+        key = _cache_key(xcall)
+        self._insert(key, error)
+        if self._nrecords >= 2 * self.maxsize:
+            # drop evicted and stale records from the file
+            self.dump()
+            return
+        with open(self._cache_file, "ab") as fobj:
+            pickle.dump((self.digest, key, error), fobj,
+                        pickle.HIGHEST_PROTOCOL)
+        self._nrecords += 1
+        return
+
+    def dump(self):
+        """Rewrite the cache file with the cached evaluations"""
+        tmp = self._cache_file + ".tmp"
+        with open(tmp, "wb") as fobj:
+            for key, error in self._entries.items():
+                pickle.dump((self.digest, key, error), fobj,
+                            pickle.HIGHEST_PROTOCOL)
+                continue
+        os.rename(tmp, self._cache_file)
+        self._nrecords = len(self._entries)
+        return
+
+    def _insert(self, key, error):
+        """Insert the evaluation as the most recently used, evicting the
+        least recently used evaluations beyond maxsize
+
+        """
+        self._entries.pop(key, None)
+        self._entries[key] = error
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _cache_key(xcall):
+    """Key of the parameter vector xcall"""
+    return tuple(float(x) for x in xcall)
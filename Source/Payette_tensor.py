@@ -40,8 +40,6 @@ will be updated as time allows.
 
 import numpy as np
 import numpy.linalg as la
-import scipy
-from scipy import linalg
 from math import sqrt
 
 import Source.Payette_utils as pu
@@ -136,12 +134,18 @@ def powm(a, m):
     return a
 
 
+def _scipy_linalg():
+    """return scipy.linalg, imported only when --strict asks for it"""
+    import scipy.linalg
+    return scipy.linalg
+
+
 def expm(a):
     """return the matrix exponential of a"""
     if isdiag(a) and not ro.STRICT:
         a[DI3] = np.exp(np.diag(a))
     elif ro.STRICT:
-        a = np.real(scipy.linalg.expm(a))
+        a = np.real(_scipy_linalg().expm(a))
     else:
         a = I3X3 + a + np.dot(a, a) / 2.
     return a
@@ -156,7 +160,7 @@ def sqrtm(a):
     if isdiag(a) and not ro.STRICT:
         a[DI3] = np.sqrt(np.diag(a))
     elif ro.STRICT:
-        a = np.real(scipy.linalg.sqrtm(a))
+        a = np.real(_scipy_linalg().sqrtm(a))
     else:
         a = powm(a, 0.5)
     return a
@@ -167,7 +171,7 @@ def logm(a):
     if isdiag(a) and not ro.STRICT:
         a[DI3] = np.log(np.diag(a))
     elif ro.STRICT:
-        a = np.real(scipy.linalg.logm(a))
+        a = np.real(_scipy_linalg().logm(a))
     else:
         a = ((a - I3X3) - np.dot(a - I3X3, a - I3X3) / 2. +
              np.dot(a - I3X3, np.dot(a - I3X3, a - I3X3)) / 3.)
@@ -515,3 +519,130 @@ def cross(a, b):
     return np.array([-a[2] * b[1] + a[1] * b[2],
                      a[2] * b[0] - a[0] * b[2],
                      -a[1] * b[0] + a[0] * b[1]])
+
+
+# ---------------------------------------------------------------------------- #
+# Blocked operations
+#
+# The functions below operate on blocks of N tensors at once, stored as
+# (N, 6), (N, 9), or (N, 3, 3) arrays.  They follow the same conventions (and
+# approximations) as their single tensor counterparts above so that the
+# ensemble driver reproduces, point for point, the single element driver.
+# ---------------------------------------------------------------------------- #
+def to_matrix_blk(a):
+    """convert the (N, 6) or (N, 9) array a to an (N, 3, 3) array"""
+    a = np.asarray(a, dtype='double')
+    nblk, ncmp = a.shape
+    if ncmp == 6:
+        return a[:, [0, 3, 5, 3, 1, 4, 5, 4, 2]].reshape(nblk, 3, 3)
+    elif ncmp == 9:
+        return np.array(a).reshape(nblk, 3, 3)
+    else:
+        msg = "wrong size array of size [{0:d}]".format(ncmp)
+        pu.report_and_raise_error(msg)
+        return
+
+
+def to_array_blk(a, sym=True):
+    """convert the (N, 3, 3) array a to an (N, 6) or (N, 9) array"""
+    nblk = a.shape[0]
+    if a.shape[1:] != (3, 3):
+        pu.report_and_raise_error('wrong shape [{0}]'.format(str(a.shape)))
+        return 1
+
+    if not sym:
+        return np.array(a).reshape(nblk, 9)
+
+    a = 0.5 * (a + a.transpose(0, 2, 1))
+    return a.reshape(nblk, 9)[:, [0, 4, 8, 1, 5, 2]]
+
+
+def dot_blk(a, b):
+    """matrix product of the (N, 3, 3) arrays a and b"""
+    return np.einsum("nij,njk->nik", a, b)
+
+
+def isdiag_blk(a):
+    """return a boolean array that is True where a[n] is diagonal"""
+    tol = 1.e-16
+    offd = np.abs(a.reshape(a.shape[0], 9)[:, [1, 2, 3, 5, 6, 7]])
+    return np.all(offd <= tol, axis=1)
+
+
+def _diag_blk(a, fun):
+    """apply fun to the diagonal components of a"""
+    a[:, DI3[0], DI3[1]] = fun(a[:, DI3[0], DI3[1]])
+    return a
+
+
+def powm_blk(a, m):
+    """return the matrix power of each matrix in a"""
+    a = np.array(a)
+    diag = isdiag_blk(a) if not ro.STRICT else np.zeros(a.shape[0], bool)
+    if diag.any():
+        a[diag] = _diag_blk(a[diag], lambda x: x ** m)
+    full = ~diag
+    if full.any():
+        eig_val, eig_vec = la.eigh(a[full])
+        a[full] = np.einsum("nij,nj,nkj->nik", eig_vec, eig_val ** m, eig_vec)
+    return a
+
+
+def expm_blk(a):
+    """return the matrix exponential of each matrix in a"""
+    a = np.array(a)
+    if ro.STRICT:
+        for i in range(a.shape[0]):
+            a[i] = np.real(_scipy_linalg().expm(a[i]))
+        return a
+    diag = isdiag_blk(a)
+    if diag.any():
+        a[diag] = _diag_blk(a[diag], np.exp)
+    full = ~diag
+    if full.any():
+        x = a[full]
+        a[full] = I3X3 + x + dot_blk(x, x) / 2.
+    return a
+
+
+def sqrtm_blk(a):
+    """return the matrix square root of each matrix in a"""
+    if np.isnan(a).any() or np.isinf(a).any():
+        msg = "Probably reaching the numerical limits for the " +\
+              "magnitude of the deformation."
+        pu.report_and_raise_error(msg)
+    a = np.array(a)
+    if ro.STRICT:
+        for i in range(a.shape[0]):
+            a[i] = np.real(_scipy_linalg().sqrtm(a[i]))
+        return a
+    diag = isdiag_blk(a)
+    if diag.any():
+        a[diag] = _diag_blk(a[diag], np.sqrt)
+    full = ~diag
+    if full.any():
+        a[full] = powm_blk(a[full], 0.5)
+    return a
+
+
+def logm_blk(a):
+    """return the matrix log of each matrix in a"""
+    a = np.array(a)
+    if ro.STRICT:
+        for i in range(a.shape[0]):
+            a[i] = np.real(_scipy_linalg().logm(a[i]))
+        return a
+    diag = isdiag_blk(a)
+    if diag.any():
+        a[diag] = _diag_blk(a[diag], np.log)
+    full = ~diag
+    if full.any():
+        x = a[full] - I3X3
+        xx = dot_blk(x, x)
+        a[full] = x - xx / 2. + dot_blk(x, xx) / 3.
+    return a
+
+
+def trace_blk(a):
+    """trace of each symmetric second order tensor in the (N, 6) array a"""
+    return np.sum(a[:, :3], axis=1)
@@ -37,6 +37,7 @@ import pickle
 import textwrap
 import shutil
 import re
+import hashlib
 from inspect import getfile
 
 if __name__ == "__main__":
@@ -47,16 +48,28 @@ if __name__ == "__main__":
 import Source.__config__ as cfg
 import Source.Payette_utils as pu
 import Source.Payette_model_index as pmi
+import Source.Payette_iterative_solvers as citer
 
 # --- module level variables
 CWD = os.getcwd()
 SPEED_KWS = {"fast": 0, "medium": 1, "long": 2}
-TYPE_KWS = ["verification", "validation", "prototype", "regression"]
+TYPE_KWS = ["verification", "validation", "prototype", "regression",
+            "performance"]
 SP = " " * 5
 WIDTH_TERM = 80
 WIDTH_INFO = 25
 TEST_INFO = ".test.info"
 RESDIR = os.path.join(CWD, "TestResults.{0}".format(cfg.OSTYPE))
+PERFDIR = os.path.join(cfg.ROOT, "Benchmarks", "Performance")
+PERF_HISTORY = "Performance_History.pkl"
+
+# run payette commands in the current process rather than in a subprocess,
+# set by the testPayette worker processes
+IN_PROCESS = False
+
+# the Payette source files and the digests of files, found once per process
+_SOURCE_FILES = []
+_DIGESTS = {}
 
 
 class TestLogger(object):
@@ -89,7 +102,7 @@ class TestLogger(object):
 
 
 TEST_STATUSES = {"PASS": 0, "BAD INPUT": 1, "DIFF": 2,
-                 "FAIL": 3, "FAILED TO RUN": 4, "NOT RUN": 5}
+                 "FAIL": 3, "FAILED TO RUN": 4, "NOT RUN": 5, "TIMEOUT": 6}
 
 
 class PayetteTest(object):
@@ -101,6 +114,7 @@ class PayetteTest(object):
     failcode = TEST_STATUSES["FAIL"]
     failtoruncode = TEST_STATUSES["FAILED TO RUN"]
     notruncode = TEST_STATUSES["NOT RUN"]
+    timeoutcode = TEST_STATUSES["TIMEOUT"]
 
     def __init__(self, check=True):
         self.name = None
@@ -122,6 +136,10 @@ class PayetteTest(object):
         self._completion_time = None
         self.status = "NOT RUN"
         self.old_status = None
+        self.fingerprint = None
+        # seconds the test may run before it is killed, testPayette --timeout
+        # is used if None
+        self.timeout = None
         self.retcode = self.notruncode
         self.postprocess = False
         self.nbs = []
@@ -266,21 +284,66 @@ class PayetteTest(object):
             echof = kwargs["echof"]
         except KeyError:
             echof = self.name + ".echo"
-#        if "payette" in cmd[0]:
-#            # run directly and not through a subprocess
-#            sys.stdout = open(echof,"w")
-#            sys.stderr = sys.stdout
-#            returncode = run_payette(len(cmd[1:]),cmd[1:])
-#            sys.stdout.close()
-#            sys.stdout = sys.__stdout__
-#            sys.stderr = sys.__stderr__
-#            return returncode
+        if IN_PROCESS and os.path.basename(cmd[0]) == "payette":
+            # run directly and not through a subprocess
+            return run_payette_in_process(cmd[1:], echof)
+
         with open(echof, "w") as fobj:
             run = subprocess.Popen(cmd, stdout=fobj, stderr=subprocess.STDOUT)
             run.wait()
 
         return run.returncode
 
+    def run_simulation(self, options=None, check=None):
+        """Run the simulation in self.infile in the current process
+
+        Parameters
+        ----------
+        options : dict, optional
+            global Payette options, set as their command line flags would
+            set them
+        check : callable, optional
+            called with the Payette instance after the simulation has run
+            and before it is finished, while its data can still be inspected
+
+        Returns
+        -------
+        siminfo : dict
+            the dictionary returned by the Payette instance's run_job
+        checked : object
+            the value returned by check, None if check is not given
+
+        Notes
+        -----
+        The simulation writes its output and log files as payette would.
+        The global Payette options and the simulation logger are restored
+        after the run.
+
+        """
+        import Source.__runopts__ as ro
+        import Source.Payette_container as pc
+        import Source.Payette_input_parser as pip
+
+        state = ro.save_options()
+        ro.set_global_option("VERBOSITY", 0, default=True)
+        ro.set_global_option("NOWRITEPROPS", True, default=True)
+        for key, val in (options or {}).items():
+            ro.set_global_option(key, val, default=True)
+            continue
+
+        try:
+            user_input = pip.parse_user_input(open(self.infile).read())
+            the_model = pc.Payette(user_input[self.name])
+            siminfo = the_model.run_job()
+            checked = None if check is None else check(the_model)
+            the_model.finish()
+        finally:
+            pu.setup_logger(None)
+            pu.reset_error_and_warnings()
+            ro.load_options(state)
+
+        return siminfo, checked
+
     def build_command(self, cmd):
 
         if not isinstance(cmd, (list, tuple)):
@@ -315,6 +378,49 @@ class PayetteTest(object):
 
         return [x for x in cmd], self.passcode
 
+    def compute_fingerprint(self):
+        """Digest of the files the result of the test depends on
+
+        The digest covers the test's python file, input, baseline and
+        auxiliary files, the files of the material models used by the test,
+        and the Payette sources executed by payette and the test.
+
+        Returns
+        -------
+        fingerprint : str
+
+        """
+        files = [self.test_file, self.infile]
+        files.extend(self.baseline)
+        files.extend(self.aux_files)
+
+        # material models named by the test and in its inputs
+        models = [self.material] if self.material else []
+        regex = r"(?i)\bconstitutive\s*model\s+(?P<cmod>[a-z0-9_\- ]+)"
+        for fnam in [self.test_file, self.infile]:
+            if fnam is None or not os.path.isfile(fnam):
+                continue
+            for cmod in re.findall(regex, open(fnam, "r").read()):
+                models.append(re.sub(r"[^\S\n]+", "_", cmod.strip()).lower())
+                continue
+            continue
+        model_index = pmi.ModelIndex()
+        for model in sorted(set(models)):
+            files.append(model)
+            files.extend(model_index.model_files(model))
+            continue
+
+        files.extend(payette_source_files())
+
+        # file names, not paths, are digested so that the fingerprint does
+        # not change when the tests or Payette are moved
+        digest = hashlib.sha1()
+        for fnam in files:
+            digest.update(repr(os.path.basename(fnam or "")))
+            digest.update(_file_digest(fnam))
+            continue
+        return digest.hexdigest()
+
     def get_retcode(self, failed, diffed):
         if failed:
             return self.failcode
@@ -1219,6 +1325,37 @@ class PayetteTest(object):
 
         return self.passcode
 
+    def compare_tangent_to_jacobian(self, logf=None):
+        """ check the largest difference between the consistent tangent and
+        the numerical Jacobian, written to the simulation log by payette
+        --check-tangent, against the solver's tolerance """
+
+        if logf is None:
+            logf = self.name + ".log"
+
+        # append to the log file of the output comparison
+        log = TestLogger(self.name + ".diff", "a")
+
+        if not os.path.isfile(logf):
+            log.error("{0} not found".format(logf))
+            return self.failcode
+
+        regex = (r"consistent tangent checked (?P<n>\d+) times, maximum "
+                 r"relative error (?P<err>\S+)")
+        check = re.search(regex, open(logf).read())
+        if check is None or not int(check.group("n")):
+            log.error("consistent tangent not checked in {0}".format(logf))
+            return self.failcode
+
+        error = float(check.group("err"))
+        log.write("\nconsistent tangent checked {0} times, maximum relative "
+                  "error {1:.4E}, tolerance {2:.4E}".format(
+                      check.group("n"), error, citer.TANGENT_TOL))
+        if error > citer.TANGENT_TOL:
+            log.write("\n{0:=^72s}".format(" DIFFED "))
+            return self.diffcode
+        return self.passcode
+
     def set_results_directory(self, *args):
         if not args:
             self._results_directory = os.getcwd()
@@ -1270,6 +1407,313 @@ class PayetteTest(object):
         return
 
 
+class PayettePerformanceTest(PayetteTest):
+    """Base class of the performance benchmarks
+
+    Rather than comparing output to a gold file, a performance benchmark
+    times the simulations in its input file, its workloads. Each workload is
+    run repeat times and its fastest run kept. The steps per second and
+    constitutive model calls per step of each workload are appended to the
+    performance history in the test base directory. The benchmark shows DIFF
+    if the steps per second of any workload fall more than threshold below
+    the baseline stored in the history for the current host.
+
+    """
+    repeat = 3
+    threshold = .2
+
+    def __init__(self, check=True):
+        super(PayettePerformanceTest, self).__init__(check)
+        self.history_file = None
+        self.rebaseline = False
+        self.record = None
+
+    def setup_test(self, *args):
+        super(PayettePerformanceTest, self).setup_test(*args)
+        self.history_file = os.path.join(args[0], PERF_HISTORY)
+        self.rebaseline = args[3] if len(args) > 3 else False
+        return
+
+    def run_test(self):
+        """ time the workloads and compare with the baseline """
+        t0 = time.time()
+        d = os.getcwd()
+        os.chdir(self.results_directory())
+        try:
+            self.record = self.time_workloads()
+        except SystemExit:
+            # errors in the workloads are reported by payette, which exits
+            self.retcode = self.failtoruncode
+        else:
+            self.retcode = self.compare_to_performance_baseline()
+        self.status = self.get_status()
+        tc = time.time()
+        self.completion_time(tc - t0)
+        os.chdir(d)
+        return
+
+    def time_workloads(self):
+        """Time each simulation in the input file
+
+        Returns
+        -------
+        record : dict
+            host, date, and Payette version of the run and, for each workload,
+            its time, number of steps, steps per second, and constitutive
+            model calls per step
+
+        """
+        import Source.__runopts__ as ro
+        import Source.Payette_container as pc
+        import Source.Payette_input_parser as pip
+
+        workloads = pip.parse_user_input(open(self.infile, "r").read())
+        record = {"host": os.uname()[1], "date": time.time(),
+                  "version": cfg.VERSION, "workloads": {}}
+        for name in sorted(workloads):
+            best = None
+            for i in range(self.repeat):
+                ro.set_global_option("VERBOSITY", 0)
+                the_model = pc.Payette(workloads[name])
+
+                # count the calls to the constitutive model
+                cmod = the_model.material.constitutive_model
+                ncalls, update_state = [0], cmod.update_state
+                def counted_update_state(*args):
+                    ncalls[0] += 1
+                    return update_state(*args)
+                cmod.update_state = counted_update_state
+
+                istep = ro.ISTEP
+                t0 = time.time()
+                siminfo = the_model.run_job()
+                dt = time.time() - t0
+                if the_model.material.eos_model:
+                    # eos sweeps evaluate their states without stepping
+                    nsteps = the_model.boundary.nsteps()
+                else:
+                    nsteps = max(ro.ISTEP - istep, 1)
+                the_model.finish()
+
+                if siminfo["retcode"] != 0:
+                    pu.report_and_raise_error(
+                        "workload {0} failed to run".format(name))
+                if best is None or dt < best[0]:
+                    best = (dt, nsteps, ncalls[0])
+                continue
+
+            dt, nsteps, ncalls = best
+            record["workloads"][name] = {
+                "time": dt, "steps": nsteps,
+                "steps per second": nsteps / max(dt, pu.EPSILON),
+                "calls per step": float(ncalls) / nsteps}
+            continue
+        return record
+
+    def compare_to_performance_baseline(self):
+        """Compare the steps per second of the workloads to the baseline
+
+        The record of the run is appended to the performance history. If there
+        is no baseline for the host, or if the test is being rebaselined, the
+        record becomes the baseline.
+
+        OUTPUT
+            0: passed
+            2: diffed
+
+        """
+        history = load_performance_history(self.history_file)
+        key = (self.name, self.record["host"])
+        baseline = history["baselines"].get(key)
+        if baseline is None or self.rebaseline:
+            baseline = history["baselines"][key] = self.record
+        history["records"].append((self.name, self.record))
+        with open(self.history_file, "wb") as fobj:
+            pickle.dump(history, fobj, pickle.HIGHEST_PROTOCOL)
+
+        log = TestLogger(self.name + ".perf", "w")
+        log.write("{0:<40s} {1:>10s} {2:>10s} {3:>10s} {4:>10s}".format(
+            "workload", "steps/s", "baseline", "change", "calls/step"))
+        diffed = False
+        for name, item in sorted(self.record["workloads"].items()):
+            rate = item["steps per second"]
+            base = baseline["workloads"].get(name, item)["steps per second"]
+            change = rate / base - 1.
+            log.write("{0:<40s} {1:10.1f} {2:10.1f} {3:+10.1%} {4:10.2f}"
+                      .format(name, rate, base, change, item["calls per step"]))
+            if change < -self.threshold:
+                log.warn("{0} slowed down by more than {1:.0%}"
+                         .format(name, self.threshold))
+                diffed = True
+            continue
+
+        return self.diffcode if diffed else self.passcode
+
+
+class MaterialPerformanceTest(PayettePerformanceTest):
+    """Performance benchmark of a built material
+
+    The workloads are the simulations in the input file named after the test
+    file. Subclasses give the material timed in model and, if they differ
+    from the defaults, the keywords added to the model's name and the
+    description of the workloads.
+
+    """
+    model = None
+    model_keywords = ["long", "uniaxial strain", "uniaxial stress"]
+    workloads = ("1000 step legs of prescribed uniaxial strain and "
+                 "deformation gradient and 100 step legs of prescribed "
+                 "uniaxial stress, loading to 1 percent axial strain and "
+                 "unloading")
+
+    def __init__(self, check=True):
+        super(MaterialPerformanceTest, self).__init__(check)
+
+        self.enabled = True
+
+        test_file = os.path.realpath(getfile(self.__class__))
+        self.name = os.path.splitext(os.path.basename(test_file))[0]
+        self.tdir = os.path.dirname(test_file)
+
+        self.infile = "{0}.inp".format(os.path.join(self.tdir, self.name))
+        self.keywords = (["performance", self.model, "builtin"] +
+                         self.model_keywords)
+        self.material = self.model
+
+        self.owner = 'Tim Fuller'
+        self.date = 'October 18, 2026'
+        self.description = "\n".join(textwrap.wrap(
+            "Times the {0} material through {1}.".format(
+                self.model.replace("_", " "), self.workloads),
+            initial_indent="    ", subsequent_indent="    "))
+
+        if check:
+            self.check_setup()
+
+        pass
+
+
+def load_performance_history(fpath):
+    """Load the performance history in fpath
+
+    Returns
+    -------
+    history : dict
+        baselines: dict of (test name, host): record of the baseline run
+        records: list of (test name, record) of every run, oldest first
+
+    """
+    try:
+        with open(fpath, "rb") as fobj:
+            return pickle.load(fobj)
+    except IOError:
+        return {"baselines": {}, "records": []}
+
+
+def payette_source_files():
+    """Return the Payette source files executed by payette and the tests
+
+    The files are those of the modules reachable through imports of Source
+    modules from Payette_mgr and Payette_test, and the optimization recipes.
+
+    """
+    if _SOURCE_FILES:
+        return _SOURCE_FILES
+
+    regex = re.compile(r"(?m)^\s*(?:from|import)\s+Source\.(\w+)")
+    seen = []
+    stack = ["Payette_mgr", "Payette_test"]
+    while stack:
+        name = stack.pop()
+        fnam = os.path.join(cfg.SOURCE, name + ".py")
+        if fnam in seen or not os.path.isfile(fnam):
+            continue
+        seen.append(fnam)
+        stack.extend(regex.findall(open(fnam, "r").read()))
+        continue
+
+    if os.path.isdir(cfg.OPTREC):
+        seen.extend(os.path.join(cfg.OPTREC, x)
+                    for x in os.listdir(cfg.OPTREC) if x.endswith(".py"))
+
+    _SOURCE_FILES.extend(sorted(seen))
+    return _SOURCE_FILES
+
+
+def _file_digest(fnam):
+    """Return the digest of the contents of the file fnam"""
+    if fnam is None or not os.path.isfile(fnam):
+        return ""
+    fnam = os.path.realpath(fnam)
+    if fnam not in _DIGESTS:
+        _DIGESTS[fnam] = hashlib.sha1(open(fnam, "rb").read()).hexdigest()
+    return _DIGESTS[fnam]
+
+
+def run_payette_in_process(argv, echof):
+    """Run the payette command line argv in the current process
+
+    Parameters
+    ----------
+    argv : list
+        command line arguments to payette, not including the executable
+    echof : str
+        path to file to which stdout and stderr are redirected
+
+    Returns
+    -------
+    retcode : int
+        the return code payette would have exited with
+
+    Notes
+    -----
+    Output is redirected at the file descriptor level so that output written
+    by extension modules is also captured. The global Payette options and
+    the simulation logger are restored after the run so that one test does
+    not leak options in to the next.
+
+    """
+    import traceback
+    import Source.__runopts__ as ro
+    import Source.Payette_mgr as pm
+
+    options = ro.save_options()
+    syspath = list(sys.path)
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = os.dup(1), os.dup(2)
+    with open(echof, "w") as fobj:
+        os.dup2(fobj.fileno(), 1)
+        os.dup2(fobj.fileno(), 2)
+        try:
+            run, argv = pm._pre(argv)
+            retcode = pm.main(argv) if run else 0
+        except SystemExit as error:
+            retcode = error.code
+            if retcode is not None and not isinstance(retcode, int):
+                sys.stderr.write("{0}\n".format(retcode))
+                retcode = 1
+        except Exception:
+            traceback.print_exc()
+            retcode = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            for fd in saved_fds:
+                os.close(fd)
+
+    # restore the state of the current process
+    pu.setup_logger(None)
+    pu.reset_error_and_warnings()
+    ro.load_options(options)
+    sys.path[:] = syspath
+
+    return retcode or 0
+
+
 def find_tests(kws, skip, reqtests, test_dirs=None):
     """ find the Payette tests
 
@@ -1380,7 +1824,7 @@ def get_test(py_file):
     except AttributeError:
         pu.log_warning("{0}: Test class not found".format(fnam))
         return
-    if PayetteTest not in cls.__bases__:
+    if not issubclass(cls, PayetteTest):
         pu.report_error("{0}: Test not a subclass of PayetteTest".format(fnam))
         return
     # instantiate and return the test object
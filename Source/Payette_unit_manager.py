@@ -26,6 +26,8 @@
 # DEALINGS IN THE SOFTWARE.
 
 import sys
+import numpy as np
+
 import Source.Payette_utils as pu
 
 
@@ -128,6 +130,10 @@ class UnitManager:
         "INV_POLARIZATION_UNITS_SQ": [0, 0, 0, 0, 0, 0, 0],
     }
 
+    # conversion plans returned by conversion_plan, keyed by the units and
+    # the input and output unit systems
+    _plans = {}
+
     @classmethod
     def is_valid_unit_system(cls, unit_system):
         try:
@@ -178,6 +184,61 @@ class UnitManager:
         a.convert(output_unit_system)
         return a.get()
 
+    @classmethod
+    def conversion_plan(cls, units, input_unit_system, output_unit_system):
+        """Return the factors converting values from one unit system to another
+
+        Every conversion between unit systems is a scaling, so converting a
+        row of values with the given units is multiplying it by a vector of
+        scale factors.  The vector is computed once for each set of units
+        and pair of unit systems and cached.
+
+        Parameters
+        ----------
+        units : list
+          units of each value, anything accepted by is_valid_units
+        input_unit_system, output_unit_system : str
+          unit systems converted from and to
+
+        Returns
+        -------
+        plan : ndarray
+          read only array, plan[i] converts a value with units[i]
+
+        """
+        key = (tuple(tuple(x) if isinstance(x, list) else x for x in units),
+               input_unit_system.upper(), output_unit_system.upper())
+        plan = cls._plans.get(key)
+        if plan is not None:
+            return plan
+
+        isys = cls.is_valid_unit_system(input_unit_system)
+        osys = cls.is_valid_unit_system(output_unit_system)
+        for system, name in ((isys, input_unit_system),
+                             (osys, output_unit_system)):
+            if not system:
+                pu.report_and_raise_error(
+                    "Unit system '{0}' not found in {1}".format(
+                        name, repr(cls.valid_systems.keys())))
+
+        plan = np.ones(len(units))
+        for icol, unit in enumerate(units):
+            dimensions = cls.is_valid_units(unit)
+            if not dimensions:
+                pu.report_and_raise_error(
+                    "Cannot process units '{0}'".format(repr(unit)))
+            for idx, dim_exp in enumerate(dimensions):
+                if dim_exp == 0:
+                    continue
+                curr_sys_fac = cls.valid_systems[isys][idx]
+                new_sys_fac = cls.valid_systems[osys][idx]
+                plan[icol] *= (curr_sys_fac / float(new_sys_fac)) ** dim_exp
+                continue
+            continue
+        plan.setflags(write=False)
+        cls._plans[key] = plan
+        return plan
+
     @classmethod
     def class_info(cls):
         # Create a string containing pretty-printed information about
@@ -492,6 +553,21 @@ def unit_tests():
     out += unit_test(1.0, "CGSK", 0.01, "SI", "length")
     out += unit_test(1.0e9, "SI", 1.0, "SESAME", "stress")
     out += unit_test(1.0e9, "SI", 0.01, "SHOCK", "stress")
+
+    # a conversion plan converts each value as UnitManager.get does
+    units = ["length", "stress", "DENSITY_UNITS", "TEMPERATURE_UNITS",
+             "PRESSURE_UNITS_OVER_TEMPERATURE_UNITS", "NO_UNITS"]
+    vals = [2.5, 1.0e9, 4.0026, 300.0, 8.3144621, 1.0]
+    for isys in UnitManager.valid_systems:
+        for osys in UnitManager.valid_systems:
+            plan = UnitManager.conversion_plan(units, isys, osys)
+            for val, unit, fac in zip(vals, units, plan):
+                good = UnitManager(val, isys, unit).get(system=osys)
+                reldiff = abs(val * fac - good) / max(abs(good), 1.0e-300)
+                if reldiff > 1.0e-14:
+                    sys.exit("\nConversion plan: {0} {1} ---> {2}\n"
+                             "    FAIL: got {3} reldiff {4}".format(
+                                 unit, isys, osys, val * fac, reldiff))
     if "FAIL" in out:
         sys.exit(out)
     return
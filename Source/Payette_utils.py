@@ -41,6 +41,7 @@ from textwrap import fill as textfill
 
 import Source.__config__ as cfg
 import Source.Payette_extract as pe
+import Source.Payette_binary_output as pbo
 import Source.__runopts__ as ro
 
 SIMLOG = None
@@ -162,7 +163,7 @@ def error_count():
 def __count_error(ecount=[0], inquire=False, reset=False):
     """Count the number of errors"""
     if reset:
-        ecount = [0]
+        ecount[0] = 0
         return
     if inquire:
         return ecount[0]
@@ -220,7 +221,7 @@ def warn_count():
 
 def __count_warning(wcount=[0], inquire=False, reset=False):
     if reset:
-        wcount = [0]
+        wcount[0] = 0
         return
     if inquire:
         return wcount[0]
@@ -276,6 +277,8 @@ def log_warning(message, limit=False, caller=None, pre="WARNING: ",
 
 def write_to_simlog(msg):
     """ write message to simulation log """
+    if SIMLOG is None:
+        return
     msg = "{0:s}\n".format(msg)
     with open(SIMLOG, "a") as fobj:
         fobj.write(msg)
@@ -318,10 +321,10 @@ def check_py_version():
 
 
 def setup_logger(logfile, mode="w"):
-    """ set up the simulation logger """
+    """ set up the simulation logger, nothing is logged if logfile is None """
     global SIMLOG
     SIMLOG = logfile
-    if mode == "w":
+    if SIMLOG is not None and mode == "w":
         with open(SIMLOG, "w") as fobj:
             fobj.write(cfg.INTRO + "\n")
     return
@@ -405,7 +408,15 @@ def get_header(fpath):
     head : array_like
         list of strings containing column names
 
+    Notes
+    -----
+    If a binary output file was written alongside fpath, the header is read
+    from it.
+
     """
+    bpath = pbo.find_binary_file(fpath)
+    if bpath is not None:
+        return pbo.get_header(bpath)
     line = linecache.getline(fpath, 1)
     if line.strip().startswith(ro.CCHAR):
         return line.split()[1:]
@@ -429,7 +440,15 @@ def read_data(fpath):
         m x n dimensional numpy ndarray where m is the number of data points
         (rows) and n the number of data fields (columns)
 
+    Notes
+    -----
+    If a binary output file was written alongside fpath, the data are memory
+    mapped from it (copy on write) rather than parsed from fpath.
+
     """
+    bpath = pbo.find_binary_file(fpath)
+    if bpath is not None:
+        return pbo.load(bpath, mmap_mode="c")[1]
     return loadtxt(fpath, skiprows=1)
 
 
@@ -461,6 +480,12 @@ def compute_rms_closest_point_residual(set1x, set1y, set2x, set2y):
     nrmsd : float
         normalized root mean square difference between gold and out
 
+    Notes
+    -----
+    The distances from a point of set2 are only computed for the segments of
+    set1 that can be closer to it than the closest point of set1, found with
+    KD-trees of the points and of the segment midpoints of set1.
+
     """
 
     # check the lengths of the arrays passed
@@ -480,46 +505,20 @@ def compute_rms_closest_point_residual(set1x, set1y, set2x, set2y):
     dy = max(set1y) - min(set1y)
     dd = math.sqrt(dx * dx + dy * dy)
 
-    dist_pt_to_pt = lambda x0, y0, x1, y1: math.sqrt(
-        (x1 - x0) ** 2 + (y1 - y0) ** 2)
-    # compute the running square of the difference
-    err = 0.0
-    for idx in range(0, lset2x):
-        tmp_arr = []
-        for jdx in range(0, lset1x - 1):
-            kdx = jdx + 1
-            dist_from_pt0 = dist_pt_to_pt(
-                set1x[jdx], set1y[jdx], set2x[idx], set2y[idx])
-            dist_from_pt1 = dist_pt_to_pt(
-                set1x[kdx], set1y[kdx], set2x[idx], set2y[idx])
-
-            # use dot(a,b)/(mag(a)*mag(b)) = cos(theta) to find the distance
-            # from the line.
-            vec_a_x = set1x[jdx] - set1x[kdx]
-            vec_a_y = set1y[jdx] - set1y[kdx]
-            vec_b_x = set2x[idx] - set1x[kdx]
-            vec_b_y = set2y[idx] - set1y[kdx]
-            mag_a = math.sqrt(vec_a_x ** 2 + vec_a_y ** 2)
-            mag_b = math.sqrt(vec_b_x ** 2 + vec_b_y ** 2)
-
-            if mag_a == 0.0 or mag_b == 0.0:
-                tmp_arr.append(min(dist_from_pt0, dist_from_pt1))
-                continue
-
-            costheta = (vec_a_x * vec_b_x + vec_a_y * vec_b_y) / mag_a / mag_b
-
-            if costheta < 0.0 or mag_b * costheta > mag_a:
-                tmp_arr.append(min(dist_from_pt0, dist_from_pt1))
-                continue
-
-            theta = math.acos(max(min(1.0, costheta), -1.0))
-            dist_from_line = mag_b * math.sin(theta)
-
-            dist = min(dist_from_line, min(dist_from_pt0, dist_from_pt1))
-            tmp_arr.append(dist)
-            continue
-        err += min(tmp_arr)
-        continue
+    # pairs of points of set2 and segments of set1 the distance is computed for
+    ipt, jseg = _closest_segment_candidates(
+        np.column_stack((set1x, set1y)).astype(np.float64),
+        np.column_stack((set2x, set2y)).astype(np.float64))
+    dist = _point_to_segment_distance(
+        np.asarray(set1x, dtype=np.float64), np.asarray(set1y, dtype=np.float64),
+        np.asarray(set2x, dtype=np.float64)[ipt],
+        np.asarray(set2y, dtype=np.float64)[ipt], jseg)
+
+    # the smallest distance of each point of set2, summed in order
+    closest = np.empty(lset2x)
+    closest.fill(np.inf)
+    np.minimum.at(closest, ipt, dist)
+    err = np.add.accumulate(closest)[-1]
 
 #    rmsd = math.sqrt(err / float(lset1x))
 #    dnom = abs(np.amax(set1y) - np.amin(set1y))
@@ -528,6 +527,96 @@ def compute_rms_closest_point_residual(set1x, set1y, set2x, set2y):
     return err, err / dd
 
 
+def _closest_segment_candidates(pts1, pts2):
+    """Return the indices (ipt, jseg) of the pairs of points of pts2 and
+    segments of pts1 that the closest segment to each point is among
+
+    A segment can only be closer to a point than the closest point of pts1
+    if the midpoint of one of its pieces is within the distance to the
+    closest point plus half the length of the piece. Segments are cut in to
+    pieces no longer than 8 times the mean segment length so that long
+    segments do not make that distance large for all segments.
+
+    """
+    from scipy.spatial import cKDTree
+
+    npts, nseg = pts2.shape[0], pts1.shape[0] - 1
+    if not np.all(np.isfinite(pts1)) or not np.all(np.isfinite(pts2)):
+        # all pairs
+        return (np.repeat(np.arange(npts), nseg),
+                np.tile(np.arange(nseg), npts))
+
+    # pieces of the segments, owner is the segment of each piece
+    dpts = pts1[1:] - pts1[:-1]
+    half = .5 * np.sqrt(np.sum(dpts ** 2, axis=1))
+    max_half = 4. * np.mean(half)
+    npieces = np.ones(nseg, dtype=np.int64)
+    if max_half > 0.:
+        npieces = np.maximum(np.ceil(half / max_half).astype(np.int64), 1)
+    owner = np.repeat(np.arange(nseg), npieces)
+    start = np.cumsum(npieces) - npieces
+    frac = ((np.arange(owner.shape[0]) - start[owner] + .5) /
+            npieces[owner])[:, None]
+    mid = pts1[owner] + frac * dpts[owner]
+
+    # distance to the closest point of pts1, inflated to cover round off.
+    # The median splits of balanced trees are very slow to build for the
+    # sorted abscissae of output curves, sliding midpoint splits are not.
+    closest = cKDTree(pts1, balanced_tree=False).query(pts2)[0]
+    radius = ((closest + np.amax(half / npieces)) * (1. + 1.e-8) +
+              1.e-300)
+
+    # query the points in groups sharing a search radius, of no more than
+    # a quarter octave above the radius of each point in the group
+    tree = cKDTree(mid, balanced_tree=False)
+    group = np.ceil(4. * np.log2(radius))
+    ipt, jseg = [], []
+    for igroup in np.unique(group):
+        members = np.flatnonzero(group == igroup)
+        near = tree.query_ball_point(
+            pts2[members], 2. ** (igroup / 4.) * (1. + 1.e-12))
+        counts = [len(x) for x in near]
+        ipt.append(np.repeat(members, counts))
+        jseg.append(owner[np.array([j for x in near for j in x],
+                                   dtype=np.int64)])
+        continue
+    return np.concatenate(ipt), np.concatenate(jseg)
+
+
+def _point_to_segment_distance(set1x, set1y, x, y, jseg):
+    """Return the distance of each point (x, y) to the segment jseg of
+    set1{x, y}
+
+    The distances are computed exactly as the closest point residual always
+    has been, so that its results do not change.
+
+    """
+    kseg = jseg + 1
+    x_0, y_0 = set1x[jseg], set1y[jseg]
+    x_1, y_1 = set1x[kseg], set1y[kseg]
+    dist_from_pt0 = np.sqrt(np.power(x - x_0, 2.) + np.power(y - y_0, 2.))
+    dist_from_pt1 = np.sqrt(np.power(x - x_1, 2.) + np.power(y - y_1, 2.))
+    dist_from_pts = np.minimum(dist_from_pt0, dist_from_pt1)
+
+    # use dot(a,b)/(mag(a)*mag(b)) = cos(theta) to find the distance
+    # from the line.
+    vec_a_x, vec_a_y = x_0 - x_1, y_0 - y_1
+    vec_b_x, vec_b_y = x - x_1, y - y_1
+    mag_a = np.sqrt(np.power(vec_a_x, 2.) + np.power(vec_a_y, 2.))
+    mag_b = np.sqrt(np.power(vec_b_x, 2.) + np.power(vec_b_y, 2.))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        costheta = (vec_a_x * vec_b_x + vec_a_y * vec_b_y) / mag_a / mag_b
+        off_segment = ((mag_a == 0.) | (mag_b == 0.) |
+                       (costheta < 0.) | (mag_b * costheta > mag_a))
+    theta = np.arccos(np.clip(costheta[~off_segment], -1., 1.))
+    dist_from_line = mag_b[~off_segment] * np.sin(theta)
+
+    dist = dist_from_pts
+    dist[~off_segment] = np.minimum(dist_from_line,
+                                    dist_from_pts[~off_segment])
+    return dist
+
+
 def compute_rms(set1x, set1y, set2x, set2y, step=1):
     r"""Compute the root mean square difference between data in set1{x, y} and
     set2{x, y}.
@@ -585,26 +674,25 @@ def compute_rms(set1x, set1y, set2x, set2y, step=1):
 
     else:
 
-        # compute the running square of the difference
+        # each point of set2 is compared with the linear interpolation of
+        # set1 on the first segment of set1 containing it
+        set1x = np.asarray(set1x, dtype=np.float64)
+        set1y = np.asarray(set1y, dtype=np.float64)
+        x = np.asarray(set2x, dtype=np.float64)[::step]
+        y = np.asarray(set2y, dtype=np.float64)[::step]
+        jseg = np.arange(0, lset1x - 1, step)
+        ipt, jseg = _first_segment_containing(
+            set1x[jseg], set1x[jseg + 1], x, jseg)
+
+        x_0, y_0 = set1x[jseg], set1y[jseg]
+        x_1, y_1 = set1x[jseg + 1], set1y[jseg + 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            y_f = y_0 + (x[ipt] - x_0) * (y_1 - y_0) / (x_1 - x_0)
+
+        # sum the squares of the differences in order
         err = 0.0
-        for i in range(0, lset2x, step):
-
-            for j in range(0, lset1x - 1, step):
-
-                # mss: Very expensive look. Optimize.
-                # if set2x is between set1x pair, do linear interpolation
-                if set1x[j] <= set2x[i] <= set1x[j + 1]:
-                    x_0 = set1x[j]
-                    y_0 = set1y[j]
-                    x_1 = set1x[j + 1]
-                    y_1 = set1y[j + 1]
-                    y_f = y_0 + (set2x[i] - x_0) * (y_1 - y_0) / (x_1 - x_0)
-
-                    # Add the square of the difference to err
-                    err += (set2y[i] - y_f) ** 2
-                    break
-                continue
-            continue
+        if ipt.shape[0]:
+            err = np.add.accumulate(np.power(y[ipt] - y_f, 2.))[-1]
 
     rmsd = math.sqrt(err / float(lset1x))
     dnom = abs(np.amax(set1y) - np.amin(set1y))
@@ -612,6 +700,34 @@ def compute_rms(set1x, set1y, set2x, set2y, step=1):
     return rmsd, nrmsd
 
 
+def _first_segment_containing(lo, hi, x, jseg):
+    """Return the indices (ipt, jseg) of the points x contained by a
+    segment [lo, hi] and of the first segment containing each of them
+
+    """
+    if np.all(lo[1:] >= lo[:-1]) and np.all(hi[1:] >= hi[:-1]):
+        # the segments containing x[i] are those from the first with hi
+        # above x[i] to the last with lo below it
+        first = np.searchsorted(hi, x, side="left")
+        last = np.searchsorted(lo, x, side="right") - 1
+        ipt = np.flatnonzero(first <= last)
+        return ipt, jseg[first[ipt]]
+
+    # unsorted abscissa, check each segment for blocks of points
+    nblk = max(1, 2 ** 20 // max(1, lo.shape[0]))
+    ipt, kseg = [], []
+    for start in range(0, x.shape[0], nblk):
+        xblk = x[start:start + nblk, None]
+        inside = (lo <= xblk) & (xblk <= hi)
+        found = np.flatnonzero(np.any(inside, axis=1))
+        ipt.append(found + start)
+        kseg.append(np.argmax(inside[found], axis=1))
+        continue
+    ipt = np.concatenate(ipt) if ipt else np.zeros(0, dtype=np.int64)
+    kseg = np.concatenate(kseg) if kseg else np.zeros(0, dtype=np.int64)
+    return ipt, jseg[kseg]
+
+
 def compute_fast_rms(gold, out):
     r"""Determines the RMS of the error between two piecewise functions of same
     length.
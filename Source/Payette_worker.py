@@ -0,0 +1,83 @@
+# Copyright (2011) Sandia Corporation. Under the terms of Contract
+# DE-AC04-94AL85000 with Sandia Corporation, the U.S. Government retains certain
+# rights in this software.
+
+# The MIT License
+
+# Copyright (c) Sandia Corporation
+
+# License for the specific language governing rights and limitations under
+# Permission is hereby granted, free of charge, to any person obtaining a
+# copy of this software and associated documentation files (the "Software"),
+# to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense,
+# and/or sell copies of the Software, and to permit persons to whom the
+# Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included
+# in all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS
+# OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""Warm Payette simulations for the trials of permutation and optimization
+jobs.
+
+The trials of a permutation or optimization job run the same base input with
+different values substituted for the permutated or optimized parameters.
+Rather than creating a new Payette object for each trial, each process keeps
+the simulation it created for the first trial of a base input and resets it
+with the parameters of later trials, so that the input is parsed and the
+material model looked up and loaded once per process.  Worker processes
+created by forking the process that ran the first trial start warm.
+
+"""
+
+import Source.Payette_container as pc
+
+# warm simulations, keyed by the base input of the job
+_WARM = {}
+
+
+def simulation(ilines, key, in_memory=False):
+    """Return a Payette simulation for the user input ilines
+
+    Parameters
+    ----------
+    ilines : str
+        user input of the trial
+    key : str
+        base input of the job that ilines was created from
+    in_memory : bool, optional
+        if True, a new simulation holds its output in memory, see
+        Payette_container.Payette
+
+    Returns
+    -------
+    the_model : object
+        the warm simulation for key, reset with ilines, or, if ilines differs
+        from the warm simulation's input in more than its name and material
+        parameters, a new Payette object, which becomes the warm simulation
+        for key
+
+    """
+    the_model = _WARM.get(key)
+    if the_model is not None and the_model.reset(ilines):
+        return the_model
+    the_model = pc.Payette(ilines, in_memory=in_memory)
+    _WARM[key] = the_model
+    return the_model
+
+
+def clear(key=None):
+    """Forget the warm simulation for key, or all warm simulations"""
+    if key is None:
+        _WARM.clear()
+    else:
+        _WARM.pop(key, None)
+    return
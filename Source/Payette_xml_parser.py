@@ -30,9 +30,22 @@ import os
 import xml.dom as xmldom
 import xml.dom.minidom as xdom
 from textwrap import fill as textfill
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
 import Payette_utils as pu
 
+# parsed xml files, keyed by real path, of (modification time, data) pairs
+_CACHE = {}
+
+# name of the on disk cache of parsed files, written next to the model index
+# when ro.XML_CACHE is set.  dirty is set when files are parsed that are not
+# in it, it is rewritten by dump_cache
+CACHE_FILE = "xml_cache.pkl"
+_DISK_CACHE = {"file": None, "loaded": False, "dirty": False}
+
 
 class NotTextNodeError:
     pass
@@ -45,6 +58,12 @@ class XMLParserError(Exception):
         super(XMLParserError, self).__init__(self.message)
 
 
+class _DeferredError(Exception):
+    """Error found while parsing an optional part of a file, raised as an
+    XMLParserError when that part is asked for"""
+    pass
+
+
 class XMLParser:
     """
     CLASS NAME
@@ -55,6 +74,11 @@ class XMLParser:
        default material parameters and model parameterizations for different
        materials.
 
+    NOTES
+       Files are parsed once per process, and again only if modified.  The
+       parsed data is shared by all XMLParser objects for the same file and
+       must not be modified.
+
     AUTHORS
        Scot Swan, Sandia National Laboratories, mswan@sandia.gov
     """
@@ -98,93 +122,25 @@ class XMLParser:
         self.file = file_name
         self.fdir = os.path.dirname(self.file)
 
-        dom = xdom.parse(self.file)
-
-        # Get the root element (Should always be "MaterialModel")
-        MaterialModel = dom.getElementsByTagName('MaterialModel')
-        if not MaterialModel:
-            raise XMLParserError("Expected Root Element 'MaterialModel'")
-        self.MaterialModel = MaterialModel[0]
-
-        # Get the Name and Description of the model.
-        Name = self.MaterialModel.getElementsByTagName('Name')
-        if not Name:
-            raise XMLParserError("Expected a 'Name' for the 'MaterialModel'.")
-        self.name = str(Name[0].firstChild.data).strip()
-
-        Description = self.MaterialModel.getElementsByTagName('Description')
-        if not Description:
-            raise XMLParserError(
-                "Expected a 'Description' for the 'MaterialModel'.")
-        self.description = str(Description[0].firstChild.data).strip()
-
-        #
-        # Get the ModelParameters block.
-        #
-        ModelParameters = dom.getElementsByTagName('ModelParameters')
-        if len(ModelParameters) != 1:
-            raise XMLParserError("Expected Element 'ModelParameters'")
-        self.ModelParameters = ModelParameters[0]
-
-        tmp = self.ModelParameters.getElementsByTagName('Units')
-        if len(tmp) != 1:
-            raise XMLParserError(
-                "Expected a 'Units' in the 'ModelParameters' element.")
-        self.units_system = str(tmp[0].firstChild.data).strip()
-
-        #
-        # Get the Model Parameters (Default).
-        #
-        self.parameters = []
-        Parameters = self.ModelParameters.getElementsByTagName('Parameter')
-        for parameter in Parameters:
-            # If you just want to loop through the attributes:
-            tmp = {"aliases": [], "parseable": True}
-            for idx in range(0, parameter.attributes.length):
-                mname = str(parameter.attributes.item(idx).name).strip()
-                mval = str(parameter.attributes.item(idx).value).strip()
-                tmp[mname] = mval
-            if tmp["aliases"]:
-                tmp["aliases"] = [x.strip() for x in tmp["aliases"].split(",")]
-            self.parameters.append(tmp)
-
-        #
-        # Get the Material Parameterizations.
-        #
-        self.materials = []
-        self.matnames_and_aliases = []
-        material_list = self.ModelParameters.getElementsByTagName('Material')
-        for material in material_list:
-            # If you just want to loop through the attributes:
-            tmp = {}
-            try:
-                tmp["description"] = str(material.firstChild.nodeValue).strip()
-            except AttributeError:
-                tmp["description"] = None
-
-            for idx in range(0, material.attributes.length):
-                mname = str(material.attributes.item(idx).name).strip()
-                mval = str(material.attributes.item(idx).value).strip()
-                tmp[mname] = mval
-                continue
-
-            if "name" not in tmp:
-                raise XMLParserError(
-                    "no name given for a material in {0}"
-                    .format(os.path.basename(self.file_name)))
-
-            self.materials.append(tmp)
-
-            # save the name and aliases
-            name = tmp.get("name")
-            aliases = [name.lower()]
-            aliases.extend([x.lower() for x in
-                            tmp.get("aliases", "").split(",") if x])
-            self.matnames_and_aliases.append((name, aliases))
-            continue
+        data = parsed_data(self.file)
+        self.name = data["name"]
+        self.description = data["description"]
+        self.units_system = data["units"]
+        self.parameters = data["parameters"]
+        self.materials = data["materials"]
+        self.matnames_and_aliases = data["matnames and aliases"]
+        self._data = data
 
         pass
 
+    def _get(self, key):
+        """Return the parsed data for key, raising the error found parsing
+        it, if any"""
+        error = self._data["errors"].get(key)
+        if error is not None:
+            raise XMLParserError(error)
+        return self._data[key]
+
     def get_parameterized_materials(self):
         """return the available materials as parsed by parse_xml()
 
@@ -261,37 +217,11 @@ class XMLParser:
 
     def get_core_files(self):
         """Parse MaterialModel for "Core" files"""
-        Files = self.MaterialModel.getElementsByTagName('Files')
-        if not Files:
-            raise XMLParserError(
-                "Expected 'Files' for the 'MaterialModel'.")
-        Core = Files[0].getElementsByTagName("Core")
-        core_files = [
-            os.path.realpath(os.path.join(self.fdir, x.strip()))
-            for x in Core[0].firstChild.data.split()]
-        return core_files
+        return self._get("core files")
 
     def get_payette_interface_files(self):
         """Parse MaterialModel for "Interface" files"""
-        Files = self.MaterialModel.getElementsByTagName('Files')
-        if not Files:
-            raise XMLParserError(
-                "Expected 'Files' for the 'MaterialModel'.")
-        Interface = Files[0].getElementsByTagName("Interface")
-        for idx, item in enumerate(Interface):
-            if item.attributes.item(0).value.lower() == "payette":
-                payette_interface = Interface[idx]
-                break
-            continue
-        else:
-            # not a Payette interface
-            return None
-
-        payette_interface_files = [
-            os.path.realpath(os.path.join(self.fdir, x.strip()))
-            for x in payette_interface.firstChild.data.split()]
-
-        return payette_interface_files
+        return self._get("interface files")
 
     def get_payette_build_info(self):
         """Parse MaterialModel for information needed by Payette build system"""
@@ -312,43 +242,299 @@ class XMLParser:
 
     def get_payette_info(self):
         """Parse MaterialModel for information needed by Payette"""
+        return self._get("payette info")
 
-        # Material type
-        Type = self.MaterialModel.getElementsByTagName("Type")
-        if not Type:
-            material_type = None
-#            raise XMLParserError(
-#                "Expected a 'Type' for the 'MaterialModel'.")
-        else:
-            material_type = str(Type[0].firstChild.data).strip()
 
-        # model keyword
-        Key = self.ModelParameters.getElementsByTagName('Key')
-        if not Key:
+def parsed_data(file_name):
+    """Return the data parsed from the xml file file_name
+
+    The data is parsed once per process and kept until the file is modified.
+    If ro.XML_CACHE is set, it is also kept in a pickle next to the model
+    index, written by dump_cache, so that other processes do not parse the
+    file again.
+
+    Parameters
+    ----------
+    file_name : str
+      real path to the xml file
+
+    Returns
+    -------
+    data : dict
+      parsed data, shared by all callers and not to be modified
+
+    """
+    mtime = os.path.getmtime(file_name)
+    cached = _CACHE.get(file_name)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    use_disk = _use_disk_cache()
+    if use_disk:
+        _load_disk_cache()
+        cached = _CACHE.get(file_name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+    data = _parse(file_name)
+    _CACHE[file_name] = (mtime, data)
+    if use_disk:
+        _DISK_CACHE["dirty"] = True
+    return data
+
+
+def dump_cache():
+    """Write the files parsed since the on disk cache was read to it, if
+    ro.XML_CACHE is set.  The cache is rewritten once for all the files
+    parsed by a job, rather than once for each file"""
+    if _DISK_CACHE["dirty"] and _use_disk_cache():
+        _dump_disk_cache()
+    return
+
+
+def clear_cache():
+    """Forget all parsed files"""
+    _CACHE.clear()
+    _DISK_CACHE["loaded"] = False
+    _DISK_CACHE["dirty"] = False
+    return
+
+
+def _use_disk_cache():
+    """Return whether parsed files are kept on disk, setting the name of the
+    cache file"""
+    try:
+        import Source.__runopts__ as ro
+    except ImportError:
+        return False
+    if not getattr(ro, "XML_CACHE", False):
+        return False
+    cache_file = os.path.join(os.path.dirname(ro.MTLDB), CACHE_FILE)
+    if cache_file != _DISK_CACHE["file"]:
+        _DISK_CACHE.update(file=cache_file, loaded=False)
+    return True
+
+
+def _load_disk_cache():
+    """Read the parsed files on disk in to the process cache"""
+    if _DISK_CACHE["loaded"]:
+        return
+    _DISK_CACHE["loaded"] = True
+    try:
+        with open(_DISK_CACHE["file"], "rb") as fobj:
+            cache = pickle.load(fobj)
+    except (IOError, OSError, EOFError, pickle.UnpicklingError,
+            AttributeError, ImportError, IndexError, TypeError, ValueError):
+        return
+    for file_name, (mtime, data) in cache.items():
+        if file_name not in _CACHE:
+            _CACHE[file_name] = (mtime, data)
+        continue
+    return
+
+
+def _dump_disk_cache():
+    """Write the process cache to disk.  The file is written to a temporary
+    file that is moved in to place, so that readers never see a partial
+    file"""
+    cache_file = _DISK_CACHE["file"]
+    tmp = "{0}.{1}".format(cache_file, os.getpid())
+    try:
+        with open(tmp, "wb") as fobj:
+            pickle.dump(_CACHE, fobj, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp, cache_file)
+        _DISK_CACHE["dirty"] = False
+    except (IOError, OSError) as error:
+        pu.log_warning("unable to write {0}: {1}".format(cache_file, error))
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+    return
+
+
+def _parse(file_name):
+    """Parse the xml file file_name in to a dict of python objects"""
+    fdir = os.path.dirname(file_name)
+    dom = xdom.parse(file_name)
+
+    # Get the root element (Should always be "MaterialModel")
+    MaterialModel = dom.getElementsByTagName('MaterialModel')
+    if not MaterialModel:
+        raise XMLParserError("Expected Root Element 'MaterialModel'")
+    MaterialModel = MaterialModel[0]
+
+    # Get the Name and Description of the model.
+    Name = MaterialModel.getElementsByTagName('Name')
+    if not Name:
+        raise XMLParserError("Expected a 'Name' for the 'MaterialModel'.")
+    name = str(Name[0].firstChild.data).strip()
+
+    Description = MaterialModel.getElementsByTagName('Description')
+    if not Description:
+        raise XMLParserError(
+            "Expected a 'Description' for the 'MaterialModel'.")
+    description = str(Description[0].firstChild.data).strip()
+
+    #
+    # Get the ModelParameters block.
+    #
+    ModelParameters = dom.getElementsByTagName('ModelParameters')
+    if len(ModelParameters) != 1:
+        raise XMLParserError("Expected Element 'ModelParameters'")
+    ModelParameters = ModelParameters[0]
+
+    tmp = ModelParameters.getElementsByTagName('Units')
+    if len(tmp) != 1:
+        raise XMLParserError(
+            "Expected a 'Units' in the 'ModelParameters' element.")
+    units_system = str(tmp[0].firstChild.data).strip()
+
+    #
+    # Get the Model Parameters (Default).
+    #
+    parameters = []
+    Parameters = ModelParameters.getElementsByTagName('Parameter')
+    for parameter in Parameters:
+        # If you just want to loop through the attributes:
+        tmp = {"aliases": [], "parseable": True}
+        for idx in range(0, parameter.attributes.length):
+            mname = str(parameter.attributes.item(idx).name).strip()
+            mval = str(parameter.attributes.item(idx).value).strip()
+            tmp[mname] = mval
+        if tmp["aliases"]:
+            tmp["aliases"] = [x.strip() for x in tmp["aliases"].split(",")]
+        parameters.append(tmp)
+
+    #
+    # Get the Material Parameterizations.
+    #
+    materials = []
+    matnames_and_aliases = []
+    material_list = ModelParameters.getElementsByTagName('Material')
+    for material in material_list:
+        # If you just want to loop through the attributes:
+        tmp = {}
+        try:
+            tmp["description"] = str(material.firstChild.nodeValue).strip()
+        except AttributeError:
+            tmp["description"] = None
+
+        for idx in range(0, material.attributes.length):
+            mname = str(material.attributes.item(idx).name).strip()
+            mval = str(material.attributes.item(idx).value).strip()
+            tmp[mname] = mval
+            continue
+
+        if "name" not in tmp:
             raise XMLParserError(
-                "Expected a 'Key' in the 'ModelParameters' element.")
-        model_key = str(Key[0].firstChild.data).strip()
-
-        # model keyword aliases
-        Aliases = self.ModelParameters.getElementsByTagName('Aliases')
-        if not Aliases:
-            model_aliases = []
-        elif Aliases[0].firstChild is None:
-            model_aliases = []
+                "no name given for a material in {0}"
+                .format(os.path.basename(file_name)))
+
+        materials.append(tmp)
+
+        # save the name and aliases
+        name_ = tmp.get("name")
+        aliases = [name_.lower()]
+        aliases.extend([x.lower() for x in
+                        tmp.get("aliases", "").split(",") if x])
+        matnames_and_aliases.append((name_, aliases))
+        continue
+
+    data = {"name": name, "description": description, "units": units_system,
+            "parameters": parameters, "materials": materials,
+            "matnames and aliases": matnames_and_aliases, "errors": {}}
+
+    # the remaining information is only needed, and required, by some users
+    # of the file.  Errors are raised when it is asked for.
+    for key, func, args in (
+        ("core files", _core_files, (MaterialModel, fdir)),
+        ("interface files", _payette_interface_files, (MaterialModel, fdir)),
+        ("payette info", _payette_info,
+         (MaterialModel, ModelParameters, fdir))):
+        try:
+            data[key] = func(*args)
+        except _DeferredError as error:
+            data[key] = None
+            data["errors"][key] = error.args[0]
+        continue
+
+    return data
+
+
+def _core_files(MaterialModel, fdir):
+    """Parse MaterialModel for "Core" files"""
+    Files = MaterialModel.getElementsByTagName('Files')
+    if not Files:
+        raise _DeferredError(
+            "Expected 'Files' for the 'MaterialModel'.")
+    Core = Files[0].getElementsByTagName("Core")
+    core_files = [
+        os.path.realpath(os.path.join(fdir, x.strip()))
+        for x in Core[0].firstChild.data.split()]
+    return core_files
+
+
+def _payette_interface_files(MaterialModel, fdir):
+    """Parse MaterialModel for "Interface" files"""
+    Files = MaterialModel.getElementsByTagName('Files')
+    if not Files:
+        raise _DeferredError(
+            "Expected 'Files' for the 'MaterialModel'.")
+    Interface = Files[0].getElementsByTagName("Interface")
+    for idx, item in enumerate(Interface):
+        if item.attributes.item(0).value.lower() == "payette":
+            payette_interface = Interface[idx]
+            break
+        continue
+    else:
+        # not a Payette interface
+        return None
+
+    payette_interface_files = [
+        os.path.realpath(os.path.join(fdir, x.strip()))
+        for x in payette_interface.firstChild.data.split()]
+
+    return payette_interface_files
+
+
+def _payette_info(MaterialModel, ModelParameters, fdir):
+    """Parse MaterialModel for information needed by Payette"""
+
+    # Material type
+    Type = MaterialModel.getElementsByTagName("Type")
+    if not Type:
+        material_type = None
+#        raise XMLParserError(
+#            "Expected a 'Type' for the 'MaterialModel'.")
+    else:
+        material_type = str(Type[0].firstChild.data).strip()
+
+    # model keyword
+    Key = ModelParameters.getElementsByTagName('Key')
+    if not Key:
+        raise _DeferredError(
+            "Expected a 'Key' in the 'ModelParameters' element.")
+    model_key = str(Key[0].firstChild.data).strip()
+
+    # model keyword aliases
+    Aliases = ModelParameters.getElementsByTagName('Aliases')
+    if not Aliases:
+        model_aliases = []
+    elif Aliases[0].firstChild is None:
+        model_aliases = []
+    else:
+        model_aliases = [x.strip().replace(" ", "_")
+                         for x in Aliases[0].firstChild.data.split(",")]
+
+    core_files = _core_files(MaterialModel, fdir)
+    source_types = []
+    for core_file in reversed(core_files):
+        if core_file.endswith((".h", ".H", ".Blk")):
+            continue
+        elif core_file.endswith((".f90", ".f", ".F")):
+            source_types.append("fortran")
+        elif core_file.endswith(".py"):
+            source_types.append("python")
         else:
-            model_aliases = [x.strip().replace(" ", "_")
-                             for x in Aliases[0].firstChild.data.split(",")]
-
-        core_files = self.get_core_files()
-        source_types = []
-        for core_file in reversed(core_files):
-            if core_file.endswith((".h", ".H", ".Blk")):
-                continue
-            elif core_file.endswith((".f90", ".f", ".F")):
-                source_types.append("fortran")
-            elif core_file.endswith(".py"):
-                source_types.append("python")
-            else:
-                source_types.append(os.path.splitext(core_file)[1])
+            source_types.append(os.path.splitext(core_file)[1])
 
-        return model_key, model_aliases, material_type, source_types
+    return model_key, model_aliases, material_type, source_types
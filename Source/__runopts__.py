@@ -19,11 +19,22 @@ RESTART_TIME = 0.
 NOWRITEPROPS = False
 USE_TABLE = False
 KEEP = False
+RESUME = False
 WRITE_VANDD_TABLE = False
 TESTRESTART = False
 PROPORTIONAL = False
+CHECK_TANGENT = False
+INSTRUMENT = False
+ADAPTIVE = False
+ADAPTIVE_TOL = 1.e-3
+OUTPUT_CHUNK = 256
+OUTPUT_FORMAT = None
+IN_MEMORY = False
+HISTORY = "full"
+SNAPSHOT_INTERVAL = 0
 NPROC = 1
 CHECK_SETUP = False
+XML_CACHE = False
 WRITE_INPUT = False
 WARNING = "warn"
 ERROR = "stop"
@@ -180,6 +191,36 @@ def restore_default_options():
     return
 
 
+def save_options():
+    """Return the current global and default options
+
+    The returned state can be passed to load_options to restore the options
+    after running simulations in the current process.
+
+    """
+    return get_global_options(), dict(get_default_options())
+
+
+def load_options(state):
+    """Restore the global and default options saved by save_options"""
+    module = sys.modules[__name__]
+    options, defaults = state
+
+    default_options = get_default_options()
+    default_options.clear()
+    default_options.update(defaults)
+
+    set_number_of_steps(reset=True)
+    for key in [x for x in get_global_options() if x not in options]:
+        delattr(module, key)
+        continue
+    for key, val in options.items():
+        setattr(module, key, val)
+        continue
+
+    return
+
+
 def _register_default_option(opt, val, inquire=False, options={}):
     if inquire:
         return options
@@ -69,9 +69,16 @@ def postprocess(file_list,verbosity=1):
     for myfile in file_list:
 
         info("Processing file {0}".format(myfile))
-        headers = linecache.getline(myfile,1).split()
-        f = open(myfile,"r")
-        data = (np.loadtxt(f,skiprows=1)).transpose()
+        if os.path.isfile(myfile+".npy"):
+            # binary output written alongside the text output
+            records = np.load(myfile+".npy",mmap_mode="r")
+            headers = list(records.dtype.names)
+            data = records.view(np.float64).reshape(-1,len(headers))
+            data = data.transpose()
+        else:
+            headers = linecache.getline(myfile,1).split()
+            f = open(myfile,"r")
+            data = (np.loadtxt(f,skiprows=1)).transpose()
         cols, rows = np.shape(data)
         if len(headers) != cols:
             error("Number of headers does not match number of columns")